@@ -1,6 +1,13 @@
 """
 DATCOM Tool Agent Package
 """
-from datcom_tool_agent.agent import datcom_tool_agent, app
 
 __all__ = ["datcom_tool_agent", "app"]
+
+
+def __getattr__(name):
+    # 只有使用 graph 時才 import agent（只用 run_generator 等模組時不載入 LangGraph / LLM）
+    if name in __all__:
+        from datcom_tool_agent import agent
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
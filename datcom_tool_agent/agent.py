@@ -2,322 +2,187 @@
 DATCOM Tool Agent - LLM-driven parsing + simple file writing tool
 職責：解析文字內容 → 填充 Pydantic models → 呼叫 tool 寫檔
 """
-import os
+import json
+import uuid
+from typing import Annotated, Optional
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from dotenv import load_dotenv
+from langgraph.graph import END, START, StateGraph
+from langgraph.prebuilt import InjectedState, create_react_agent
 
 # 導入 Pydantic models 和 generator
-from datcom_tool_agent.data_model import (
-    DatcomInput, FLTCON, SYNTHS, BODY,
-    WGPLNF, HTPLNF, VTPLNF
+from datcom_tool_agent.data_model import DatcomInput
+from datcom_tool_agent.codec import encode_datcom_input_text
+from datcom_tool_agent.consistency import check_consistency
+from datcom_tool_agent.deck_cache import datcom_input_key, get_default_deck_cache
+from datcom_tool_agent.extraction import ExtractionResult, apply_overrides, extract_datcom_input, request_overrides
+from datcom_tool_agent.extraction_cache import ExtractionCache, extraction_fingerprint
+from datcom_tool_agent.output_reader import attach_results
+from datcom_tool_agent.output_store import maybe_collect_garbage, session_output_path
+from datcom_tool_agent.section_extraction import (
+    extract_by_sections, repair_cards, repair_max_retries, section_extraction_min_chars
 )
-from datcom_tool_agent.run_generator import DatcomGenerator
+from datcom_tool_agent.tool_schema import build_datcom_input, card_errors, datcom_tool_schema
 
+from supervisor_agent.utils.lazy import LazyAttributes, load_environment
+from supervisor_agent.utils.memory_manager import SessionManager
 # Import SupervisorState for state sharing
 from supervisor_agent.utils.state import SupervisorState
 
-# Load environment from read_file_agent directory
-env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "read_file_agent", ".env")
-load_dotenv(env_path)
 
-
-@tool
+def _parameters_summary(datcom_input: DatcomInput) -> dict:
+    """latest_datcom 中可讀的主要參數（可 JSON 序列化）"""
+    flight = datcom_input.flight_conditions
+    wing = datcom_input.wing_planform
+    htail = datcom_input.horizontal_tail_planform
+    vtail = datcom_input.vertical_tail_planform
+    return {
+        "flight_conditions": {
+            "nalpha": flight.NALPHA,
+            "alschd": list(flight.ALSCHD),
+            "nmach": flight.NMACH,
+            "mach": list(flight.MACH),
+            "nalt": flight.NALT,
+            "alt": list(flight.ALT),
+            "wt": flight.WT,
+        },
+        "wing": {"naca": wing.NACA_W, "chrdtp": wing.CHRDTP, "sspn": wing.SSPN, "chrdr": wing.CHRDR},
+        "htail": {"naca": htail.NACA_H, "chrdtp": htail.CHRDTP, "sspn": htail.SSPN},
+        "vtail": {"naca": vtail.NACA_V, "chrdtp": vtail.CHRDTP, "sspn": vtail.SSPN},
+    }
+
+
+def _generate_datcom(datcom_input: DatcomInput, case_id: str, conversation_id: Optional[str]) -> str:
+    """一致性檢查 → 產生 / 取得 for005.dat → 記錄 summary，回傳給 LLM 的訊息"""
+    # 跨卡片幾何一致性檢查：不一致的設定直接退回，不產生檔案
+    violations = check_consistency(datcom_input)
+    if violations:
+        details = "; ".join(f"{v.rule}: {v.message} {v.values}" for v in violations)
+        return f"❌ Inconsistent DATCOM geometry: {details}"
+
+    # Generate file in a per-session / per-case output directory
+    # (concurrent sessions never write to the same file)
+    case_key = datcom_input_key(datcom_input, case_id)
+    output_path = session_output_path(conversation_id, case_key)
+    maybe_collect_garbage()
+
+    # 相同設定已產生過時直接從快取取得，不需重新格式化
+    _, cache_hit = get_default_deck_cache().get_or_generate(
+        datcom_input, case_id, output_path, key=case_key
+    )
+
+    # 📝 準備 DATCOM 資料結構（用於 state.latest_datcom）
+    datcom_summary = {
+        "case_id": case_id,
+        "output_path": output_path,
+        "generated_at": __import__('datetime').datetime.now().isoformat(),
+        "cache_hit": cache_hit,
+        # 主要參數（可讀；supervisor 與 UI 直接顯示）
+        "parameters": _parameters_summary(datcom_input),
+        # 完整的 DatcomInput（二進位編碼的 base64 文字，以 codec.decode_datcom_input 還原）
+        "datcom_input": encode_datcom_input_text(datcom_input),
+        # 衍生幾何量（翼面積、展弦比、MAC、尾翼容積係數、細長比），後續提問不需再計算
+        "derived": {name: round(value, 4) for name, value in datcom_input.metrics.items()},
+    }
+
+    # Store in global for state update (workaround for tool limitation)
+    # Keyed by conversation_id so concurrent sessions don't pick up each other's summary
+    _last_datcom_summary[conversation_id] = datcom_summary
+
+    # Tools must return strings for create_react_agent
+    metrics = datcom_input.metrics
+    return (
+        f"✅ Successfully wrote DATCOM file to: {output_path}\n"
+        f"Derived: wing area={metrics['wing.area']:.4g}, AR={metrics['wing.aspect_ratio']:.4g}, "
+        f"taper={metrics['wing.taper_ratio']:.4g}, MAC={metrics['wing.mac']:.4g}, "
+        f"V_H={metrics['horizontal_tail_volume']:.4g}, V_V={metrics['vertical_tail_volume']:.4g}, "
+        f"body fineness={metrics['body.fineness_ratio']:.4g}"
+    )
+
+
+@tool(args_schema=datcom_tool_schema())
 def write_datcom_file(
-    # Flight Conditions
-    nalpha: int,
-    alschd: str,  # comma-separated values
-    nmach: int,
-    mach: str,
-    nalt: int,
-    alt: str,
-    wt: float,
-    # Synthesis
-    xcg: float,
-    zcg: float,
-    xw: float,
-    zw: float,
-    aliw: float,
-    xh: float,
-    zh: float,
-    alih: float,
-    xv: float,
-    zv: float,
-    # Body
-    nx: int,
-    x_coords: str,
-    r_coords: str,
-    zu_coords: str,
-    zl_coords: str,
-    itype: int,
-    method: int,
-    # Wing Planform
-    wing_naca: str,
-    wing_chrdtp: float,
-    wing_sspn: float,
-    wing_sspne: float,
-    wing_chrdr: float,
-    wing_savsi: float,
-    wing_chstat: float,
-    wing_twista: float,
-    wing_dhdadi: float,
-    wing_type: int,
-    # Horizontal Tail
-    htail_naca: str,
-    htail_chrdtp: float,
-    htail_sspn: float,
-    htail_sspne: float,
-    htail_chrdr: float,
-    htail_savsi: float,
-    htail_chstat: float,
-    htail_twista: float,
-    htail_dhdadi: float,
-    htail_type: int,
-    # Vertical Tail
-    vtail_naca: str,
-    vtail_chrdtp: float,
-    vtail_sspn: float,
-    vtail_sspne: float,
-    vtail_chrdr: float,
-    vtail_savsi: float,
-    vtail_chstat: float,
-    vtail_type: int,
-    # Output config
-    case_id: str = "PC-9"
+    flight_conditions: dict,
+    synthesis: dict,
+    body: dict,
+    wing_planform: dict,
+    horizontal_tail_planform: dict,
+    vertical_tail_planform: dict,
+    case_id: str = "PC-9",
+    # Injected from SupervisorState (not visible to the LLM)；注入整個 state：
+    # InjectedState("file_content") 在 state 沒有該 key 時（只有對話、沒有檔案）會讓 ToolNode 拋出 KeyError
+    state: Annotated[Optional[dict], InjectedState()] = None,
 ) -> str:
     """
-    Write DATCOM input file (for005.dat) to output directory.
-
-    This tool takes all required DATCOM parameters and generates a properly formatted
-    for005.dat file in the datcom_tool_agent/output/ directory.
-
-    Args:
-        Flight Conditions (FLTCON):
-            nalpha: Number of angles of attack (max 20)
-            alschd: Angles of attack values, comma-separated (e.g., "1.0,2.0,3.0")
-            nmach: Number of mach numbers (max 20)
-            mach: Mach number values, comma-separated
-            nalt: Number of altitudes (max 20)
-            alt: Altitude values in feet, comma-separated
-            wt: Vehicle weight
-
-        Synthesis (SYNTHS):
-            xcg, zcg: CG location (x, z)
-            xw, zw: Wing apex location (x, z)
-            aliw: Wing incidence angle
-            xh, zh: Horizontal tail apex location (x, z)
-            alih: Horizontal tail incidence angle
-            xv, zv: Vertical tail apex location (x, z)
-
-        Body (BODY):
-            nx: Number of body stations (max 20)
-            x_coords: X coordinates, comma-separated
-            r_coords: Radius values, comma-separated
-            zu_coords: Upper Z coordinates, comma-separated
-            zl_coords: Lower Z coordinates, comma-separated
-            itype: 1=straight wing, 2=swept wing
-            method: Calculation method (1=Default, 2=Jorgensen)
-
-        Wing Planform (WGPLNF):
-            wing_naca: NACA airfoil (e.g., "6-63-415")
-            wing_chrdtp: Tip chord
-            wing_sspn: Semi-span theoretical
-            wing_sspne: Semi-span exposed
-            wing_chrdr: Root chord
-            wing_savsi: Sweep angle
-            wing_chstat: Reference chord station
-            wing_twista: Twist angle
-            wing_dhdadi: Dihedral angle
-            wing_type: 1=straight tapered planform
-
-        Horizontal Tail (HTPLNF):
-            htail_naca: NACA airfoil (e.g., "4-0012")
-            htail_chrdtp: Tip chord
-            htail_sspn: Semi-span theoretical
-            htail_sspne: Semi-span exposed
-            htail_chrdr: Root chord
-            htail_savsi: Sweep angle
-            htail_chstat: Reference chord station
-            htail_twista: Twist angle
-            htail_dhdadi: Dihedral angle
-            htail_type: 1=straight tapered planform
-
-        Vertical Tail (VTPLNF):
-            vtail_naca: NACA airfoil (e.g., "4-0012")
-            vtail_chrdtp: Tip chord
-            vtail_sspn: Semi-span theoretical
-            vtail_sspne: Semi-span exposed
-            vtail_chrdr: Root chord
-            vtail_savsi: Sweep angle
-            vtail_chstat: Reference chord station
-            vtail_type: 1=straight tapered planform
-
-        case_id: Case identifier (default: "PC-9")
-
-    Returns:
-        Success message with output file path
+    Write DATCOM input file (for005.dat) to a per-session output directory.
+
+    Provide one object per DATCOM namelist card; list fields are JSON number arrays.
+    Tail planform fields have the same meaning as in wing_planform.
+    Counts (NALPHA, NMACH, NALT, NX) are filled in from the list lengths.
     """
+    # 參數 schema 由 data_model 產生（tool_schema.datcom_tool_schema），驗證交給 DatcomInput
+    cards = {
+        "flight_conditions": flight_conditions,
+        "synthesis": synthesis,
+        "body": body,
+        "wing_planform": wing_planform,
+        "horizontal_tail_planform": horizontal_tail_planform,
+        "vertical_tail_planform": vertical_tail_planform,
+    }
+    state = state or {}
+    conversation_id = state.get("conversation_id")
     try:
-        # Parse comma-separated strings to lists
-        def parse_floats(s: str):
-            return [float(x.strip()) for x in s.split(',')]
-
-        # Build Pydantic models
-        flight_conditions = FLTCON(
-            NALPHA=nalpha,
-            ALSCHD=parse_floats(alschd),
-            NMACH=nmach,
-            MACH=parse_floats(mach),
-            NALT=nalt,
-            ALT=parse_floats(alt),
-            WT=wt
-        )
-
-        synthesis = SYNTHS(
-            XCG=xcg, ZCG=zcg,
-            XW=xw, ZW=zw, ALIW=aliw,
-            XH=xh, ZH=zh, ALIH=alih,
-            XV=xv, ZV=zv
-        )
-
-        body = BODY(
-            NX=nx,
-            X=parse_floats(x_coords),
-            R=parse_floats(r_coords),
-            ZU=parse_floats(zu_coords),
-            ZL=parse_floats(zl_coords),
-            ITYPE=itype,
-            METHOD=method
-        )
-
-        wing = WGPLNF(
-            NACA_W=wing_naca,
-            CHRDTP=wing_chrdtp,
-            SSPN=wing_sspn,
-            SSPNE=wing_sspne,
-            CHRDR=wing_chrdr,
-            SAVSI=wing_savsi,
-            CHSTAT=wing_chstat,
-            TWISTA=wing_twista,
-            DHDADI=wing_dhdadi,
-            TYPE=wing_type
-        )
-
-        htail = HTPLNF(
-            NACA_H=htail_naca,
-            CHRDTP=htail_chrdtp,
-            SSPN=htail_sspn,
-            SSPNE=htail_sspne,
-            CHRDR=htail_chrdr,
-            SAVSI=htail_savsi,
-            CHSTAT=htail_chstat,
-            TWISTA=htail_twista,
-            DHDADI=htail_dhdadi,
-            TYPE=htail_type
-        )
-
-        vtail = VTPLNF(
-            NACA_V=vtail_naca,
-            CHRDTP=vtail_chrdtp,
-            SSPN=vtail_sspn,
-            SSPNE=vtail_sspne,
-            CHRDR=vtail_chrdr,
-            SAVSI=vtail_savsi,
-            CHSTAT=vtail_chstat,
-            TYPE=vtail_type
-        )
-
-        # Create complete input
-        datcom_input = DatcomInput(
-            flight_conditions=flight_conditions,
-            synthesis=synthesis,
-            body=body,
-            wing_planform=wing,
-            horizontal_tail_planform=htail,
-            vertical_tail_planform=vtail
-        )
-
-        # Generate file in output directory
-        output_dir = os.path.join(os.path.dirname(__file__), "output")
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "for005.dat")
-
-        generator = DatcomGenerator()
-        generator.generate_file(datcom_input, case_id, output_path)
-
-        # 📝 準備 DATCOM 資料結構（用於 state.latest_datcom）
-        datcom_summary = {
-            "case_id": case_id,
-            "output_path": output_path,
-            "generated_at": __import__('datetime').datetime.now().isoformat(),
-            "parameters": {
-                "flight_conditions": {
-                    "nalpha": nalpha,
-                    "alschd": alschd,
-                    "nmach": nmach,
-                    "mach": mach,
-                    "nalt": nalt,
-                    "alt": alt,
-                    "wt": wt
-                },
-                "wing": {
-                    "naca": wing_naca,
-                    "chrdtp": wing_chrdtp,
-                    "sspn": wing_sspn,
-                    "chrdr": wing_chrdr
-                },
-                "htail": {
-                    "naca": htail_naca,
-                    "chrdtp": htail_chrdtp,
-                    "sspn": htail_sspn
-                },
-                "vtail": {
-                    "naca": vtail_naca,
-                    "chrdtp": vtail_chrdtp,
-                    "sspn": vtail_sspn
-                }
+        repair = None
+        errors = card_errors(cards)
+        if errors and repair_max_retries() <= 0:
+            # 不做卡片修復時不需要建立 model（也不需要 LLM 憑證）
+            details = "; ".join(f"{card}: {error}" for card, error in errors.items())
+            return f"❌ Validation failed for {', '.join(errors)}: {details}"
+        if errors:
+            # 只重新抽取驗證失敗的卡片（附上 Pydantic 錯誤），不讓 ReAct 重新產生全部參數
+            source = state.get("file_content") or _last_user_text(state.get("messages"))
+            repair = repair_cards(_lazy.get("model"), cards, source=source)
+            if repair.datcom_input is None:
+                details = "; ".join(f"{card}: {error}" for card, error in repair.errors.items())
+                failed_calls = "".join(
+                    f" (repair call for {card} failed: {reason})" for card, reason in repair.failures.items()
+                )
+                return (
+                    f"❌ Validation failed for {', '.join(repair.errors)} after {repair.attempts} repair attempt(s)"
+                    f"{failed_calls}: {details}"
+                )
+            datcom_input = repair.datcom_input
+        else:
+            datcom_input = build_datcom_input(cards)
+        reply = _generate_datcom(datcom_input, case_id, conversation_id)
+        if repair is not None and conversation_id in _last_datcom_summary:
+            _last_datcom_summary[conversation_id]["repair"] = {
+                "attempts": repair.attempts,
+                "cards": repair.repaired,
+                "token_usage": repair.token_usage,
             }
-        }
-
-        # Store in global for state update (workaround for tool limitation)
-        global _last_datcom_summary
-        _last_datcom_summary = datcom_summary
-
-        # Tools must return strings for create_react_agent
-        return f"✅ Successfully wrote DATCOM file to: {output_path}"
-
+        return reply
     except Exception as e:
         return f"❌ Error writing DATCOM file: {str(e)}"
 
 
-# Global storage for datcom summary (to be picked up by wrapper node)
-_last_datcom_summary = None
-
+def _last_user_text(messages: Optional[list]) -> Optional[str]:
+    """最後一則使用者訊息（略過 agent_node 加入的抽取提示）"""
+    for message in reversed(messages or []):
+        if getattr(message, "type", None) != "human" or (message.id or "").startswith(_HINT_ID_PREFIX):
+            continue
+        return message.content if isinstance(message.content, str) else None
+    return None
 
-# Custom ChatOpenAI that doesn't send parallel_tool_calls parameter
-class CustomChatOpenAI(ChatOpenAI):
-    """Custom ChatOpenAI that doesn't send parallel_tool_calls parameter"""
 
-    def bind_tools(self, tools, **kwargs):
-        kwargs.pop("parallel_tool_calls", None)
-        return super().bind_tools(tools, **kwargs)
+# agent_node 加入的抽取提示訊息的 id 前綴（不寫入對話紀錄）
+_HINT_ID_PREFIX = "datcom-pre-extraction-"
 
+# Global storage for datcom summary (to be picked up by wrapper node), keyed by conversation_id
+_last_datcom_summary = {}
 
-# Initialize model
-model = CustomChatOpenAI(
-    model=os.getenv("DEFAULT_LLM_MODEL", "openai/gpt-oss-20b"),
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE_URL", "http://172.16.120.65:8087/v1"),
-    api_key=os.getenv("OPENAI_API_KEY")  # type: ignore
-)
 
-# Create datcom_tool_agent using prebuilt component
-_base_datcom_agent = create_react_agent(
-    model=model,
-    tools=[write_datcom_file],
-    state_schema=SupervisorState,  # ✅ Use SupervisorState to access file_content
-    prompt="""You are a DATCOM file generation specialist.
+DATCOM_AGENT_PROMPT = """You are a DATCOM file generation specialist.
 
 Your job is to:
 1. Check if there is file content in state.file_content (from read_file_agent)
@@ -335,44 +200,226 @@ IMPORTANT - Data Source Priority:
 - The data source tells you where to find the aircraft configuration
 
 IMPORTANT - Parameter Formatting:
-- For list parameters (alschd, mach, alt, x_coords, r_coords, zu_coords, zl_coords),
-  provide them as comma-separated strings (e.g., "1.0,2.0,3.0")
-- Ensure all required parameters are provided
-- Double-check that list lengths match their corresponding count parameters
-  (e.g., len(alschd) == nalpha)
-""",
-    name="datcom_tool_agent"
-)
+- Pass one object per card: flight_conditions, synthesis, body, wing_planform,
+  horizontal_tail_planform, vertical_tail_planform
+- List fields (ALSCHD, MACH, ALT, X, R, ZU, ZL) are JSON number arrays, e.g. [1.0, 2.0, 3.0]
+- Do NOT provide counts (NALPHA, NMACH, NALT, NX); they are taken from the array lengths
+- Ensure all required fields are provided
+"""
+
+
+def _build_model():
+    """Initialize model（與其他 agent 共用同一 endpoint 的連線池）"""
+    from supervisor_agent.utils.llm_client import get_chat_model
+    return get_chat_model("datcom_tool_agent")
+
+
+def _build_base_agent():
+    """Create datcom_tool_agent using prebuilt component"""
+    return create_react_agent(
+        model=_lazy.get("model"),
+        tools=[write_datcom_file],
+        state_schema=SupervisorState,  # ✅ Use SupervisorState to access file_content
+        prompt=DATCOM_AGENT_PROMPT,
+        name="datcom_tool_agent"
+    )
+
+
+def _build_extraction_cache() -> ExtractionCache:
+    """file_content → LLM 抽取結果的持久快取（模型或 prompt 改變時自動失效）"""
+    return ExtractionCache(extraction_fingerprint(_lazy.get("model").model_name, DATCOM_AGENT_PROMPT))
 
 
 # Wrapper node to add state updates
-from langgraph.graph import StateGraph, START, END
 
-def agent_node(state: SupervisorState) -> dict:
+def _extraction_source(state: SupervisorState) -> Optional[str]:
     """
-    Node that runs the base agent and adds latest_datcom to state
+    確定性抽取的來源：第一次由檔案產生時為 file_content，
+    其他情況（沒有檔案，或已產生過、這次是修改要求）為最後一則使用者訊息
+    """
+    if state.get("file_content") and state.get("latest_datcom") is None:
+        # read_file_node 已判斷檔案內沒有 DATCOM 資料時不需再解析
+        parsed = state.get("parsed_file_data")
+        if parsed is not None and not parsed.get("has_datcom_data"):
+            return None
+        return state["file_content"]
+    return _last_user_text(state.get("messages"))
+
+
+def _complete_cards(extraction: Optional[ExtractionResult]) -> dict:
+    """確定性抽取中沒有缺少或有歧義欄位的卡片"""
+    if extraction is None:
+        return {}
+    incomplete = {name.split(".")[0] for name in extraction.missing + extraction.ambiguous}
+    if "?" in incomplete:
+        return {}
+    return {
+        attribute: card for attribute, card in extraction.cards.items()
+        if attribute not in incomplete
+    }
+
+
+def _pre_extraction_hint(extraction: ExtractionResult, request_changes: bool = False) -> HumanMessage:
     """
-    global _last_datcom_summary
+    部分欄位已確定時，告訴 LLM 只需補齊缺少 / 有歧義的欄位；
+    使用者請求中另有修改時（request_changes）提醒 LLM 套用
+    """
+    lines = [
+        "Pre-extracted DATCOM fields (parsed directly from the input; copy them unchanged "
+        "into the write_datcom_file call):",
+        json.dumps(extraction.cards, ensure_ascii=False, default=float),
+    ]
+    if request_changes:
+        lines[0] = (
+            "Pre-extracted DATCOM fields from the file (copy them into the write_datcom_file call, "
+            "but apply every parameter change the user's request asks for):"
+        )
+    if extraction.missing:
+        lines.append("Still needed from the input: " + ", ".join(extraction.missing))
+    if extraction.ambiguous:
+        lines.append("Ambiguous, resolve from the input: " + ", ".join(extraction.ambiguous))
+    if extraction.error:
+        lines.append(f"Validation error in the parsed values: {extraction.error}")
+    return HumanMessage(content="\n".join(lines), id=f"{_HINT_ID_PREFIX}{uuid.uuid4().hex}")
+
+
+def _generate_without_llm(
+    datcom_input: DatcomInput,
+    case_id: str,
+    conversation_id: Optional[str],
+    source: str,
+    token_usage: Optional[dict] = None,
+) -> dict:
+    """不經 ReAct agent 直接產生檔案（確定性抽取、快取命中或分段抽取）"""
+    reply = _generate_datcom(datcom_input, case_id, conversation_id)
+    result = {"messages": [AIMessage(content=reply, name="datcom_tool_agent")]}
+    datcom_summary = _last_datcom_summary.pop(conversation_id, None)
+    if datcom_summary is not None:
+        datcom_summary["extraction"] = source
+        datcom_summary["token_usage"] = token_usage or {"prompt_tokens": 0, "completion_tokens": 0}
+        result["latest_datcom"] = datcom_summary
+    return result
 
-    # Run the base agent
-    result = _base_datcom_agent.invoke(state)
 
-    # If we have a datcom summary from the tool, add it to result
-    if _last_datcom_summary is not None:
-        result["latest_datcom"] = _last_datcom_summary
-        _last_datcom_summary = None  # Reset for next run
+def _cache_extraction(file_content: str, request: Optional[str], datcom_summary: dict):
+    """
+    記錄 LLM 抽取結果；依提示補齊（partial）或經過卡片修復（repair）的結果
+    不是乾淨的抽取，不寫入快取
+    """
+    if datcom_summary.get("extraction") == "partial" or "repair" in datcom_summary:
+        return
+    _lazy.get("_extraction_cache").put(file_content, datcom_summary["datcom_input"], datcom_summary["case_id"], request)
+
 
+def agent_node(state: SupervisorState) -> dict:
+    """
+    Node that runs the base agent and adds latest_datcom to state
+
+    輸入已是完整的結構化資料（for005.dat 或 KEY=value / 標籤格式）、且請求中的修改
+    也能確定解析時直接產生檔案，不呼叫 LLM；同一份 file_content 與請求已由 LLM 抽取過時使用快取結果；
+    長文件改為每張卡片平行抽取；其餘情況（缺少或有歧義的欄位）才交給 ReAct agent。
+    """
+    # 沒有 conversation_id 的呼叫者（腳本、直接 invoke）各自取得一個 session，
+    # 不共用 _last_datcom_summary 與 anonymous 輸出目錄；回傳到 state 供之後的對話使用
+    conversation_id = state.get("conversation_id")
+    update = {}
+    if not conversation_id:
+        conversation_id = SessionManager.generate_session_id()
+        state = {**state, "conversation_id": conversation_id}
+        update["conversation_id"] = conversation_id
+    result = {**_run_agent_node(state, conversation_id), **update}
+    # 同一設定的輸出目錄中已有 DATCOM 執行結果（for006.dat）時附上係數表摘要
+    if result.get("latest_datcom") is not None:
+        result["latest_datcom"] = attach_results(result["latest_datcom"])
     return result
 
 
-# Create a wrapper graph
-wrapper_graph = StateGraph(SupervisorState)
-wrapper_graph.add_node("agent", agent_node)
-wrapper_graph.add_edge(START, "agent")
-wrapper_graph.add_edge("agent", END)
+def _run_agent_node(state: SupervisorState, conversation_id: str) -> dict:
+    content = _extraction_source(state)
+    extraction = extract_datcom_input(content) if content else None
+    request = _last_user_text(state.get("messages"))
+    # 由檔案抽取時請求中可能另有修改（「重量 WT 改成 6000」）：KEY=value / 標籤格式的修改
+    # 直接合併，無法確定解析時（None）交給 LLM
+    overrides = request_overrides(request) if content is not None and content != request else {}
+
+    if extraction is not None and extraction.complete and overrides is not None:
+        datcom_input = apply_overrides(extraction, overrides) if overrides else extraction.datcom_input
+        if datcom_input is not None:
+            return _generate_without_llm(
+                datcom_input, extraction.case_id or "PC-9", conversation_id, "deterministic"
+            )
+
+    # 同一份檔案內容以相同的請求由 LLM 抽取過時直接使用快取結果
+    # （只在第一次由檔案產生時使用；之後的修改要求取決於對話內容）
+    file_content = state.get("file_content") if state.get("latest_datcom") is None else None
+    if file_content:
+        cached = _lazy.get("_extraction_cache").get(file_content, request)
+        if cached is not None:
+            return _generate_without_llm(*cached, conversation_id, "cache")
+
+        # 長文件：每張卡片一次較小的 LLM 呼叫同時抽取，確定性抽取已完整的卡片不再呼叫
+        # （分段抽取只看檔案內容，請求中有修改時交給 ReAct agent）
+        if overrides == {} and len(file_content) >= section_extraction_min_chars():
+            sections = extract_by_sections(_lazy.get("model"), file_content, known_cards=_complete_cards(extraction))
+            if sections.datcom_input is not None:
+                result = _generate_without_llm(
+                    sections.datcom_input, (extraction and extraction.case_id) or "PC-9",
+                    conversation_id, "sections", sections.token_usage,
+                )
+                if "latest_datcom" in result:
+                    _cache_extraction(file_content, request, result["latest_datcom"])
+                return result
+
+    # Run the base agent（有部分確定的欄位時附上提示，不寫入對話紀錄）
+    hint = (
+        _pre_extraction_hint(extraction, request_changes=overrides != {})
+        if extraction is not None and extraction.cards else None
+    )
+    agent_input = state if hint is None else {**state, "messages": [*state["messages"], hint]}
+    result = _lazy.get("_base_datcom_agent").invoke(agent_input)
+
+    # 本次執行新增的 AI 訊息的 token 用量（比較 tool schema 的成本）
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    for message in result["messages"][len(agent_input["messages"]):]:
+        metadata = getattr(message, "usage_metadata", None) or {}
+        usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+        usage["completion_tokens"] += metadata.get("output_tokens", 0)
+    if hint is not None:
+        result["messages"] = [message for message in result["messages"] if message.id != hint.id]
+
+    # If we have a datcom summary from the tool, add it to result (and reset for next run)
+    datcom_summary = _last_datcom_summary.pop(conversation_id, None)
+    if datcom_summary is not None:
+        datcom_summary["extraction"] = "llm" if hint is None else "partial"
+        datcom_summary["token_usage"] = usage
+        result["latest_datcom"] = datcom_summary
+        if file_content:
+            _cache_extraction(file_content, request, datcom_summary)
 
-datcom_tool_agent = wrapper_graph.compile()
-datcom_tool_agent.name = "datcom_tool_agent"
+    return result
 
-# Export as app
-app = datcom_tool_agent
+
+def _build_graph():
+    """Create a wrapper graph"""
+    load_environment()
+    wrapper_graph = StateGraph(SupervisorState)
+    wrapper_graph.add_node("agent", agent_node)
+    wrapper_graph.add_edge(START, "agent")
+    wrapper_graph.add_edge("agent", END)
+
+    graph = wrapper_graph.compile()
+    graph.name = "datcom_tool_agent"
+    return graph
+
+
+# model、ReAct agent、抽取快取與 graph 都在第一次使用時才建立（import 時不載入 langchain_openai）
+# Export datcom_tool_agent / app（同一個已編譯的 graph）
+_lazy = LazyAttributes(
+    globals(),
+    model=_build_model,
+    _base_datcom_agent=_build_base_agent,
+    _extraction_cache=_build_extraction_cache,
+    datcom_tool_agent=_build_graph,
+    app=lambda: _lazy.get("datcom_tool_agent"),
+)
+__getattr__ = _lazy.module_getattr
@@ -0,0 +1,186 @@
+"""
+Compact binary encoding of DatcomInput
+用於 state（latest_datcom，以 base64 文字保存）、deck 快取 key 與其他需要保存 / 傳輸
+DatcomInput 的地方。
+
+格式（little-endian）：
+    header  : b"DCIB" + version (u8) + layout fingerprint (u32)
+    head    : 所有卡片的數值純量（float64，依 DatcomInput 欄位順序）
+              + 每個清單 / 字串欄位的長度（u16）
+    payload : 清單欄位的 float64 陣列與字串欄位的 UTF-8 bytes，依序串接
+
+資料模型欄位改變時 fingerprint 會不同，舊資料解碼時會明確報錯而不是讀錯欄位。
+"""
+import base64
+import binascii
+import struct
+import zlib
+from operator import attrgetter
+from typing import List, Literal, Tuple, Union, get_args, get_origin
+
+import numpy as np
+
+from datcom_tool_agent.data_model import DatcomInput
+
+# 編碼格式改變（不只是欄位改變）時遞增
+CODEC_VERSION = 1
+
+_MAGIC = b"DCIB"
+_HEADER = struct.Struct("<4sBI")
+
+
+def _field_kind(annotation) -> str:
+    """欄位型別 → 編碼方式：'f' 浮點純量、'i' 整數純量、'l' 浮點清單、's' 字串"""
+    origin = get_origin(annotation)
+    if origin in (list, List) or annotation is np.ndarray:
+        return "l"
+    if annotation is str:
+        return "s"
+    if annotation is int or (origin is Literal and all(isinstance(arg, int) for arg in get_args(annotation))):
+        return "i"
+    if annotation is float:
+        return "f"
+    raise TypeError(f"Unsupported field type for binary encoding: {annotation!r}")
+
+
+class _Layout:
+    """
+    DatcomInput 的編碼計畫（欄位分類與 struct 只建立一次）
+
+    所有卡片的數值純量與可變長度欄位的數量放在固定長度的 head，
+    可變長度欄位的內容接在後面，編碼 / 解碼各只需兩次 struct 呼叫。
+    """
+
+    __slots__ = ("cards", "scalars", "variable", "head_struct", "card_scalars", "_payload_structs")
+
+    def __init__(self):
+        self.cards = []  # (DatcomInput 屬性, 取出該卡片所有純量的 attrgetter)
+        self.scalars = []  # (DatcomInput 屬性, 欄位)
+        self.variable = []  # (DatcomInput 屬性, 欄位, 'l' 或 's')
+        for attribute, card_field in DatcomInput.model_fields.items():
+            model_class = card_field.annotation
+            names = []
+            for name, field in model_class.model_fields.items():
+                kind = _field_kind(field.annotation)
+                if kind in "fi":
+                    names.append(name)
+                    self.scalars.append((attribute, name))
+                else:
+                    self.variable.append((attribute, name, kind))
+            getter = attrgetter(*names)
+            self.cards.append((attribute, getter if len(names) > 1 else (lambda model, g=getter: (g(model),))))
+        self.head_struct = struct.Struct("<" + "d" * len(self.scalars) + "H" * len(self.variable))
+        # 每張卡片的純量在 head 中的範圍：(DatcomInput 屬性, 欄位名稱, start, end)
+        self.card_scalars = []
+        start = 0
+        for attribute, _ in self.cards:
+            names = tuple(name for card, name in self.scalars if card == attribute)
+            self.card_scalars.append((attribute, names, start, start + len(names)))
+            start += len(names)
+        # 各種長度組合的 payload struct（同一批設定的長度組合通常很少）
+        self._payload_structs = {}
+
+    def describe(self) -> str:
+        scalars = ",".join(f"{attribute}.{name}" for attribute, name in self.scalars)
+        variable = ",".join(f"{attribute}.{name}:{kind}" for attribute, name, kind in self.variable)
+        return f"{scalars}|{variable}"
+
+    def encode(self, datcom_input: DatcomInput) -> bytes:
+        head = []
+        for attribute, get_scalars in self.cards:
+            head.extend(get_scalars(getattr(datcom_input, attribute)))
+
+        payload = []
+        for attribute, name, kind in self.variable:
+            value = getattr(getattr(datcom_input, attribute), name)
+            if kind == "s":
+                data = value.encode("utf-8")
+                head.append(len(data))
+                payload.append(data)
+            elif isinstance(value, np.ndarray):
+                head.append(value.size)
+                payload.append(np.asarray(value, dtype="<f8").tobytes())
+            else:
+                head.append(len(value))
+                payload.append(struct.pack(f"<{len(value)}d", *value))
+        return self.head_struct.pack(*head) + b"".join(payload)
+
+    def decode(self, buffer: bytes, offset: int) -> Tuple[dict, int]:
+        head = self.head_struct.unpack_from(buffer, offset)
+        offset += self.head_struct.size
+
+        cards = {
+            attribute: dict(zip(names, head[start:end]))
+            for attribute, names, start, end in self.card_scalars
+        }
+
+        counts = head[len(self.scalars):]
+        payload_struct = self._payload_structs.get(counts)
+        if payload_struct is None:
+            payload_struct = struct.Struct("<" + "".join(
+                f"{count}{'s' if kind == 's' else 'd'}" for (_, _, kind), count in zip(self.variable, counts)
+            ))
+            if len(self._payload_structs) < 1024:
+                self._payload_structs[counts] = payload_struct
+        payload = payload_struct.unpack_from(buffer, offset)
+        offset += payload_struct.size
+
+        position = 0
+        for (attribute, name, kind), count in zip(self.variable, counts):
+            if kind == "s":
+                cards[attribute][name] = payload[position].decode("utf-8")
+                position += 1
+            else:
+                cards[attribute][name] = list(payload[position:position + count])
+                position += count
+        return cards, offset
+
+
+_LAYOUT = _Layout()
+LAYOUT_FINGERPRINT = zlib.crc32(_LAYOUT.describe().encode("ascii"))
+_HEADER_BYTES = _HEADER.pack(_MAGIC, CODEC_VERSION, LAYOUT_FINGERPRINT)
+
+
+def encode_datcom_input(datcom_input: DatcomInput) -> bytes:
+    """將 DatcomInput 編碼成 bytes（BODY 與 BODYArray 的編碼相同）"""
+    return _HEADER_BYTES + _LAYOUT.encode(datcom_input)
+
+
+def encode_datcom_input_text(datcom_input: DatcomInput) -> str:
+    """encode_datcom_input 的 base64 文字，可直接放入 JSON（state、checkpoint、API 回應）"""
+    return base64.b64encode(encode_datcom_input(datcom_input)).decode("ascii")
+
+
+def decode_datcom_input(data: Union[bytes, str]) -> DatcomInput:
+    """
+    解碼 encode_datcom_input（bytes）或 encode_datcom_input_text（base64 str）的輸出
+
+    Raises:
+        ValueError: 不是 DatcomInput 編碼、版本或資料模型欄位不同、資料被截斷
+            （內容不符合 data_model 規則時為 pydantic.ValidationError，也是 ValueError）
+    """
+    if isinstance(data, str):
+        try:
+            data = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            raise ValueError("Text is not a base64-encoded DatcomInput") from None
+    if len(data) < _HEADER.size:
+        raise ValueError("Data is too short to be an encoded DatcomInput")
+    magic, version, fingerprint = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError("Data is not an encoded DatcomInput")
+    if version != CODEC_VERSION or fingerprint != LAYOUT_FINGERPRINT:
+        raise ValueError(
+            f"Encoded DatcomInput has version {version} / layout {fingerprint:08x}, "
+            f"expected version {CODEC_VERSION} / layout {LAYOUT_FINGERPRINT:08x}"
+        )
+
+    try:
+        cards, offset = _LAYOUT.decode(data, _HEADER.size)
+    except struct.error as e:
+        raise ValueError(f"Encoded DatcomInput is truncated: {e}") from None
+    if offset != len(data):
+        raise ValueError(f"Encoded DatcomInput has {len(data) - offset} trailing bytes")
+    # 整個 DatcomInput 一次交給 Pydantic 驗證：整數欄位由 float64 轉回 int，
+    # 且比逐一 model_construct 更快
+    return DatcomInput.model_validate(cards)
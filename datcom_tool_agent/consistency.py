@@ -0,0 +1,156 @@
+"""
+Cross-card geometric consistency checks for DatcomInput
+每張卡片各自的 Pydantic 驗證看不到其他卡片；這裡的規則橫跨多張卡片，
+對一批設定以 NumPy 欄位陣列一次計算，只替違規的 case 建立紀錄。
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from datcom_tool_agent.data_model import DatcomInput, field_column
+
+# 翼面卡片：(DatcomInput 屬性, 規則名稱前綴)
+_SURFACES = (
+    ("wing_planform", "wing"),
+    ("horizontal_tail_planform", "htail"),
+    ("vertical_tail_planform", "vtail"),
+)
+
+
+class Violation(BaseModel):
+    """一筆違反一致性規則的紀錄"""
+    index: int  # case 在批次中的索引
+    rule: str
+    message: str
+    values: Dict[str, float]
+
+
+def _padded_stations(bodies) -> Dict[str, np.ndarray]:
+    """將長度不一的站位補齊成 (n, max NX) 陣列：X 以 inf 補齊，ZU / ZL 以最後一個值補齊"""
+    nx = np.fromiter((len(body.X) for body in bodies), dtype=np.intp, count=len(bodies))
+    shape = (len(bodies), max(int(nx.max()), 2))
+    X, ZU, ZL = np.full(shape, np.inf), np.zeros(shape), np.zeros(shape)
+    for row, body in enumerate(bodies):
+        count = nx[row]
+        X[row, :count] = body.X
+        ZU[row, :count] = body.ZU
+        ZL[row, :count] = body.ZL
+        if count:
+            ZU[row, count:] = ZU[row, count - 1]
+            ZL[row, count:] = ZL[row, count - 1]
+    return {"X": X, "ZU": ZU, "ZL": ZL, "NX": nx}
+
+
+def _interpolate_at(x: np.ndarray, stations: Dict[str, np.ndarray]):
+    """
+    在每個 case 的機身站位上線性內插 ZU / ZL
+
+    Returns:
+        (zu, zl, inside)；x 不在機身範圍內的 case 其 inside 為 False
+    """
+    X = stations["X"]
+    rows = np.arange(X.shape[0])
+    # 站位數 <= x 的數量，即 x 所在區段的右端點
+    upper = np.sum(X <= x[:, None], axis=1)
+    upper = np.where(X[rows, np.clip(stations["NX"] - 1, 0, None)] == x, stations["NX"] - 1, upper)
+    inside = (upper >= 1) & (upper < stations["NX"])
+    i1 = np.clip(upper, 1, X.shape[1] - 1)
+    i0 = i1 - 1
+
+    x0, x1 = X[rows, i0], X[rows, i1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(inside, (x - x0) / (x1 - x0), 0.0)
+    zu = stations["ZU"][rows, i0] + t * (stations["ZU"][rows, i1] - stations["ZU"][rows, i0])
+    zl = stations["ZL"][rows, i0] + t * (stations["ZL"][rows, i1] - stations["ZL"][rows, i0])
+    return zu, zl, inside
+
+
+def check_batch(datcom_inputs: Sequence[DatcomInput]) -> List[Violation]:
+    """
+    對整批 DatcomInput 檢查跨卡片一致性
+
+    規則：
+    - {wing,htail,vtail}.SSPNE <= SSPN、CHRDTP <= CHRDR
+    - XCG 位於機身長度內（X[0] <= XCG <= X[-1]）
+    - XH、XV 在 XW 之後
+    - ZW 位於 XW 處機身的 ZL 與 ZU 之間（XW 在機身範圍外時不檢查）
+
+    Returns:
+        依 (index, 規則順序) 排列的 Violation 列表；空列表表示全部通過
+    """
+    if not datcom_inputs:
+        return []
+
+    checks = []  # (rule, 違規 mask, message, {名稱: 欄位陣列})
+
+    for attribute, prefix in _SURFACES:
+        surfaces = [getattr(d, attribute) for d in datcom_inputs]
+        sspn, sspne = field_column(surfaces, "SSPN"), field_column(surfaces, "SSPNE")
+        chrdr, chrdtp = field_column(surfaces, "CHRDR"), field_column(surfaces, "CHRDTP")
+        checks.append((
+            f"{prefix}.sspne_le_sspn", sspne > sspn,
+            f"{prefix} exposed semi-span SSPNE exceeds theoretical semi-span SSPN",
+            {"SSPNE": sspne, "SSPN": sspn},
+        ))
+        checks.append((
+            f"{prefix}.chrdtp_le_chrdr", chrdtp > chrdr,
+            f"{prefix} tip chord CHRDTP exceeds root chord CHRDR",
+            {"CHRDTP": chrdtp, "CHRDR": chrdr},
+        ))
+
+    synthesis = [d.synthesis for d in datcom_inputs]
+    xcg, xw, zw = field_column(synthesis, "XCG"), field_column(synthesis, "XW"), field_column(synthesis, "ZW")
+    xh, xv = field_column(synthesis, "XH"), field_column(synthesis, "XV")
+
+    stations = _padded_stations([d.body for d in datcom_inputs])
+    rows = np.arange(len(datcom_inputs))
+    body_start = stations["X"][:, 0]
+    body_end = stations["X"][rows, stations["NX"] - 1]
+    checks.append((
+        "xcg_within_body", (xcg < body_start) | (xcg > body_end),
+        "XCG lies outside the body length",
+        {"XCG": xcg, "X_first": body_start, "X_last": body_end},
+    ))
+    checks.append((
+        "xh_aft_of_xw", xh <= xw,
+        "horizontal tail apex XH is not aft of wing apex XW",
+        {"XH": xh, "XW": xw},
+    ))
+    checks.append((
+        "xv_aft_of_xw", xv <= xw,
+        "vertical tail apex XV is not aft of wing apex XW",
+        {"XV": xv, "XW": xw},
+    ))
+
+    zu, zl, inside = _interpolate_at(xw, stations)
+    checks.append((
+        "zw_within_body", inside & ((zw > zu) | (zw < zl)),
+        "wing apex ZW is not between the body surfaces ZL and ZU at XW",
+        {"ZW": zw, "ZL_at_XW": zl, "ZU_at_XW": zu},
+    ))
+
+    violations = []
+    for rule_order, (rule, mask, message, values) in enumerate(checks):
+        for index in np.flatnonzero(mask):
+            violations.append((int(index), rule_order, Violation(
+                index=int(index),
+                rule=rule,
+                message=message,
+                values={name: float(column[index]) for name, column in values.items()},
+            )))
+    violations.sort(key=lambda item: item[:2])
+    return [violation for _, _, violation in violations]
+
+
+def check_consistency(datcom_input: DatcomInput) -> List[Violation]:
+    """檢查單一 DatcomInput（等同 check_batch([datcom_input])）"""
+    return check_batch([datcom_input])
+
+
+def valid_mask(datcom_inputs: Sequence[DatcomInput]) -> np.ndarray:
+    """回傳每個 case 是否通過所有一致性規則的 bool 陣列"""
+    mask = np.ones(len(datcom_inputs), dtype=bool)
+    for violation in check_batch(datcom_inputs):
+        mask[violation.index] = False
+    return mask
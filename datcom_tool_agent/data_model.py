@@ -1,6 +1,11 @@
 # data_model.py
-from typing import List, Literal
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from functools import cached_property, lru_cache
+from typing import Any, ClassVar, Dict, Iterable, List, Literal, Mapping, Sequence
+import numpy as np
+from pydantic import (
+    BaseModel, Field, field_validator, field_serializer, model_validator,
+    ConfigDict, PrivateAttr, SerializeAsAny, TypeAdapter, ValidationError
+)
 
 class FLTCON(BaseModel):
     """
@@ -81,7 +86,149 @@ class SYNTHS(BaseModel):
     ZV: float = Field(..., description="Vertical location of theoretical vertical tail apex (Z向垂尾位置)")
 
 
-class WGPLNF(BaseModel):
+# --- Derived geometry ---
+# 以下公式同時適用於單一數值與 NumPy 陣列（批次計算見 metrics.py）
+
+def planform_geometry(chrdr, chrdtp, sspn, savsi, chstat, panels: int) -> Dict[str, Any]:
+    """
+    直線漸縮翼面的幾何量
+
+    Args:
+        panels: 2 = 左右對稱的主翼 / 水平尾，1 = 垂直尾（單一翼面）
+
+    Returns:
+        area、span、aspect_ratio、taper_ratio、mac，以及 MAC 的展向位置 y_mac
+        與 MAC 前緣相對翼根前緣的 X 距離 x_mac_le
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taper = np.divide(chrdtp, chrdr)
+        span = panels * np.asarray(sspn, dtype=np.float64)
+        area = panels * 0.5 * (np.add(chrdr, chrdtp)) * sspn
+        # SAVSI 為 CHSTAT 弦長位置的後掠角，換算成前緣後掠角
+        tan_le = np.tan(np.radians(savsi)) + np.divide(np.multiply(chstat, np.subtract(chrdr, chrdtp)), sspn)
+        y_mac = np.divide(sspn, 3.0) * (1 + 2 * taper) / (1 + taper)
+        return {
+            "area": area,
+            "span": span,
+            "aspect_ratio": span ** 2 / area,
+            "taper_ratio": taper,
+            "mac": 2.0 / 3.0 * np.multiply(chrdr, (1 + taper + taper ** 2) / (1 + taper)),
+            "y_mac": y_mac,
+            "x_mac_le": y_mac * tan_le,
+        }
+
+
+def body_geometry(x_first, x_last, r, zu, zl) -> Dict[str, Any]:
+    """
+    機身幾何量；r / zu / zl 的最後一軸為站位（補齊的站位請填 0）
+
+    截面視為半軸 R 與 (ZU - ZL) / 2 的橢圓，等效直徑 = 2 * sqrt(R * (ZU - ZL) / 2)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        semi_height = np.maximum(np.subtract(zu, zl), 0.0) / 2.0
+        equivalent_diameter = 2.0 * np.sqrt(np.maximum(r, 0.0) * semi_height)
+        max_diameter = np.max(equivalent_diameter, axis=-1)
+        length = np.subtract(x_last, x_first)
+        return {
+            "length": length,
+            "max_equivalent_diameter": max_diameter,
+            "max_cross_section_area": np.pi * (max_diameter / 2.0) ** 2,
+            "fineness_ratio": length / max_diameter,
+        }
+
+
+def tail_volumes(xcg, wing: Dict[str, Any], xw, htail: Dict[str, Any], xh, vtail: Dict[str, Any], xv) -> Dict[str, Any]:
+    """
+    水平尾 / 垂直尾容積係數（力臂 = 尾翼 MAC 1/4 弦點到重心的距離）
+
+    V_H = S_H * l_H / (S_W * MAC_W)，V_V = S_V * l_V / (S_W * b_W)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        arm_h = np.add(xh, htail["x_mac_le"] + 0.25 * htail["mac"]) - xcg
+        arm_v = np.add(xv, vtail["x_mac_le"] + 0.25 * vtail["mac"]) - xcg
+        return {
+            "horizontal_tail_arm": arm_h,
+            "vertical_tail_arm": arm_v,
+            "horizontal_tail_volume": htail["area"] * arm_h / (wing["area"] * wing["mac"]),
+            "vertical_tail_volume": vtail["area"] * arm_v / (wing["area"] * wing["span"]),
+        }
+
+
+def _as_floats(values: Dict[str, Any]) -> Dict[str, float]:
+    return {name: float(value) for name, value in values.items()}
+
+
+class _DerivedMetricsModel(BaseModel):
+    """
+    以 cached_property 快取衍生幾何量的卡片基底
+
+    快取值存在 __dict__，欄位被重新賦值或 model_copy(update=...) 時會清除。
+    清單欄位原地修改（body.X[0] = ...）無法偵測，請改為重新賦值。
+    """
+
+    def _clear_derived(self):
+        for name in _cached_property_names(type(self)):
+            self.__dict__.pop(name, None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._clear_derived()
+
+    def model_copy(self, *, update=None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            copied._clear_derived()
+        return copied
+
+
+_CACHED_PROPERTY_NAMES = {}
+
+
+def _cached_property_names(model_class) -> tuple:
+    names = _CACHED_PROPERTY_NAMES.get(model_class)
+    if names is None:
+        names = _CACHED_PROPERTY_NAMES[model_class] = tuple(
+            name for klass in model_class.__mro__ for name, value in vars(klass).items()
+            if isinstance(value, cached_property)
+        )
+    return names
+
+
+class _PlanformMetrics(_DerivedMetricsModel):
+    """翼面卡片共用的衍生幾何量（子類別以 _PANELS 指定翼面數）"""
+
+    _PANELS: ClassVar[int] = 2
+
+    @cached_property
+    def planform_metrics(self) -> Dict[str, float]:
+        """area、span、aspect_ratio、taper_ratio、mac、y_mac、x_mac_le（只計算一次）"""
+        return _as_floats(planform_geometry(
+            self.CHRDR, self.CHRDTP, self.SSPN, self.SAVSI, self.CHSTAT, self._PANELS
+        ))
+
+    @property
+    def area(self) -> float:
+        return self.planform_metrics["area"]
+
+    @property
+    def span(self) -> float:
+        return self.planform_metrics["span"]
+
+    @property
+    def aspect_ratio(self) -> float:
+        return self.planform_metrics["aspect_ratio"]
+
+    @property
+    def taper_ratio(self) -> float:
+        return self.planform_metrics["taper_ratio"]
+
+    @property
+    def mac(self) -> float:
+        return self.planform_metrics["mac"]
+
+
+class WGPLNF(_PlanformMetrics):
     """
     Wing Planform Card
     """
@@ -99,7 +246,7 @@ class WGPLNF(BaseModel):
     NACA_W: str = Field(..., alias="NACA-W-", description="Airfoil (主翼剖面型號), e.g., 6-63-415")
 
 
-class HTPLNF(BaseModel):
+class HTPLNF(_PlanformMetrics):
     """
     Horizontal Tail Planform Card
     """
@@ -117,12 +264,14 @@ class HTPLNF(BaseModel):
     NACA_H: str = Field(..., alias="NACA-H-", description="Airfoil (水平尾翼剖面型號), e.g., 4-0012")
         
 
-class VTPLNF(BaseModel):
+class VTPLNF(_PlanformMetrics):
     """
     Vertical Tail Planform Card
     """
     model_config = ConfigDict(str_strip_whitespace=True, populate_by_name=True)
 
+    _PANELS: ClassVar[int] = 1  # 單一翼面：span = SSPN
+
     CHRDTP: float = Field(..., description="Tip chord (翼尖弦長)")
     SSPN: float = Field(..., description="Semi-span theoretical panel from theoretical root chord (半翼展)")
     SSPNE: float = Field(..., description="Semi-span exposed panel (外露半翼展)")
@@ -133,7 +282,7 @@ class VTPLNF(BaseModel):
     NACA_V: str = Field(..., alias="NACA-V-", description="Airfoil (垂直尾翼剖面型號), e.g., 4-0008")
 
 
-class BODY(BaseModel):
+class BODY(_DerivedMetricsModel):
     """
     Body Geometry Card - Revised to match DATCOM's parallel list structure.
     """
@@ -183,6 +332,134 @@ class BODY(BaseModel):
             )
         return v
 
+    @cached_property
+    def body_metrics(self) -> Dict[str, float]:
+        """length、max_equivalent_diameter、max_cross_section_area、fineness_ratio（只計算一次）"""
+        if not len(self.X):
+            return _as_floats(body_geometry(0.0, 0.0, [0.0], [0.0], [0.0]))
+        return _as_floats(body_geometry(self.X[0], self.X[-1], self.R, self.ZU, self.ZL))
+
+    @property
+    def length(self) -> float:
+        return self.body_metrics["length"]
+
+    @property
+    def fineness_ratio(self) -> float:
+        return self.body_metrics["fineness_ratio"]
+
+
+# BODY 站位資料的列順序
+_STATION_ROWS = ("X", "R", "ZU", "ZL")
+
+
+def _check_station_geometry(stations: np.ndarray):
+    """以向量化方式檢查 (4, NX) 站位陣列，錯誤訊息列出出問題的站位索引"""
+    x, r, zu, zl = stations
+    errors = []
+    bad = np.flatnonzero(~np.isfinite(stations).all(axis=0))
+    if bad.size:
+        errors.append(f"non-finite values at stations {bad.tolist()}")
+    bad = np.flatnonzero(~(np.diff(x) > 0)) + 1
+    if bad.size:
+        errors.append(f"X must be strictly increasing (stations {bad.tolist()})")
+    bad = np.flatnonzero(~(r >= 0))
+    if bad.size:
+        errors.append(f"R must be >= 0 (stations {bad.tolist()})")
+    bad = np.flatnonzero(~(zu >= zl))
+    if bad.size:
+        errors.append(f"ZU must be >= ZL (stations {bad.tolist()})")
+    if errors:
+        raise ValueError("Invalid body geometry: " + "; ".join(errors))
+
+
+class BODYArray(BODY):
+    """
+    Body Geometry Card backed by one contiguous NumPy array.
+
+    X / R / ZU / ZL 是同一個唯讀 (4, NX) float64 陣列的列 view，產生器直接
+    以向量化格式化讀取，不需轉回 list；建立時一次檢查所有站位：
+    X 遞增、R >= 0、ZU >= ZL、沒有 NaN / inf。輸出（deck、model_dump）與 BODY 相同。
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    X: np.ndarray = Field(..., description="Longitudinal distance measured from arbitrary location (依序站位之 X 位置)")
+    R: np.ndarray = Field(..., description="Planform half width at station Xi (依序佔位之半徑)")
+    ZU: np.ndarray = Field(..., description="Z coordinate at upper body surface at station Xi (依序基準點向上距離)")
+    ZL: np.ndarray = Field(..., description="Z coordinate at lower body surface at station Xi (依序基準點向下距離)")
+
+    _stations: np.ndarray = PrivateAttr()
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def pack_stations(cls, data, handler):
+        """將 X / R / ZU / ZL（或 stations）整理成一個唯讀的連續陣列並檢查幾何"""
+        if isinstance(data, BODYArray):
+            return data
+        if isinstance(data, BODY):
+            data = {name: getattr(data, name) for name in BODY.model_fields}
+        if not isinstance(data, dict):
+            return handler(data)
+
+        data = dict(data)
+        if "stations" in data:
+            stations = np.ascontiguousarray(data.pop("stations"), dtype=np.float64)
+        else:
+            rows = [np.asarray(data.get(name, ()), dtype=np.float64) for name in _STATION_ROWS]
+            if len({row.shape for row in rows}) > 1:
+                raise ValueError(
+                    "X, R, ZU and ZL must have the same length "
+                    f"(got {[row.size for row in rows]})"
+                )
+            stations = np.stack(rows)
+        if stations.ndim != 2 or stations.shape[0] != len(_STATION_ROWS):
+            raise ValueError(f"stations must have shape (4, NX) (got {stations.shape})")
+
+        # 唯讀 view：不影響呼叫端原本的陣列
+        stations = stations.view()
+        stations.flags.writeable = False
+        _check_station_geometry(stations)
+
+        data.setdefault("NX", stations.shape[1])
+        data.update(zip(_STATION_ROWS, stations))
+        body = handler(data)
+        body._stations = stations
+        return body
+
+    @classmethod
+    def from_stations(cls, stations, ITYPE: int, METHOD: int = 1) -> "BODYArray":
+        """由 (4, NX) 陣列（X, R, ZU, ZL 各一列）建立；陣列已是連續 float64 時不複製"""
+        return cls.model_validate({"stations": stations, "ITYPE": ITYPE, "METHOD": METHOD})
+
+    @property
+    def stations(self) -> np.ndarray:
+        """唯讀 (4, NX) 站位陣列"""
+        return self._stations
+
+    def model_copy(self, *, update=None, deep: bool = False):
+        """更新 X / R / ZU / ZL（或 deep copy）時重新組成站位陣列；與 model_copy 相同不檢查幾何"""
+        copied = super().model_copy(update=update, deep=deep)
+        if deep or (update and any(name in update for name in _STATION_ROWS)):
+            rows = [np.asarray(getattr(copied, name), dtype=np.float64) for name in _STATION_ROWS]
+            if len({row.shape for row in rows}) > 1:
+                raise ValueError(f"X, R, ZU and ZL must have the same length (got {[row.size for row in rows]})")
+            stations = np.stack(rows)
+            stations.flags.writeable = False
+            copied.__dict__.update(zip(_STATION_ROWS, stations))
+            copied._stations = stations
+        return copied
+
+    @field_serializer(*_STATION_ROWS)
+    def serialize_station_row(self, value: np.ndarray) -> List[float]:
+        return value.tolist()
+
+    def __eq__(self, other):
+        if not isinstance(other, BODY):
+            return NotImplemented
+        return (
+            self.NX == other.NX and self.ITYPE == other.ITYPE and self.METHOD == other.METHOD
+            and all(np.array_equal(getattr(self, name), getattr(other, name)) for name in _STATION_ROWS)
+        )
+
 
 class DatcomInput(BaseModel):
     """
@@ -193,4 +470,191 @@ class DatcomInput(BaseModel):
     wing_planform: WGPLNF
     horizontal_tail_planform: HTPLNF
     vertical_tail_planform: VTPLNF
-    body: BODY
\ No newline at end of file
+    body: SerializeAsAny[BODY]
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        """
+        各卡片的衍生幾何量與尾翼容積係數，key 為 "wing.area"、"body.fineness_ratio"、
+        "horizontal_tail_volume" 等
+
+        每次存取時由各卡片的快取組成（不在 DatcomInput 上快取），卡片被修改、替換
+        或 deep copy 後修改都會反映在結果中。
+        """
+        wing = self.wing_planform.planform_metrics
+        htail = self.horizontal_tail_planform.planform_metrics
+        vtail = self.vertical_tail_planform.planform_metrics
+        synthesis = self.synthesis
+        metrics = {}
+        for prefix, values in (("wing", wing), ("htail", htail), ("vtail", vtail), ("body", self.body.body_metrics)):
+            metrics.update((f"{prefix}.{name}", value) for name, value in values.items())
+        metrics.update(_as_floats(tail_volumes(
+            synthesis.XCG, wing, synthesis.XW, htail, synthesis.XH, vtail, synthesis.XV
+        )))
+        return metrics
+
+    @property
+    def horizontal_tail_volume(self) -> float:
+        return self.metrics["horizontal_tail_volume"]
+
+    @property
+    def vertical_tail_volume(self) -> float:
+        return self.metrics["vertical_tail_volume"]
+
+
+# --- Bulk construction ---
+#
+# 逐一 DatcomInput(**data) 每次都重新驗證六張卡片。以下的批次路徑只驗證有變化的卡片，
+# 沒有變化的卡片直接沿用已驗證的實例；組成 DatcomInput 時傳入卡片實例，
+# 編譯好的 validator 不會重新驗證它們（revalidate_instances="never"）。
+# 同一批結果中相同的卡片共用同一個實例（與 derive_trusted 沿用 base 的卡片相同），
+# 要修改單一變化請使用 model_copy。
+
+# 整批驗證用的 TypeAdapter（schema 只編譯一次）；失敗時以它重新驗證以取得完整的錯誤位置
+_DATCOM_INPUT_LIST = TypeAdapter(List[DatcomInput])
+
+# 卡片屬性 → 卡片類別
+CARD_CLASSES = {name: field.annotation for name, field in DatcomInput.model_fields.items()}
+
+# 清單欄位 → 對應的數量欄位（trusted 更新與 tool 參數會由清單長度自動填入）
+COUNT_FIELDS = {
+    "flight_conditions": {"ALSCHD": "NALPHA", "MACH": "NMACH", "ALT": "NALT"},
+    "body": {"X": "NX"},
+}
+
+
+def _card_values(card: BaseModel) -> Dict[str, Any]:
+    return {name: getattr(card, name) for name in type(card).model_fields}
+
+
+@lru_cache(maxsize=None)
+def _card_list_adapter(model_class) -> TypeAdapter:
+    """每種卡片一個 TypeAdapter(List[卡片])：整欄卡片在一次呼叫中驗證"""
+    return TypeAdapter(List[model_class])
+
+
+def _assemble(rows: List[Dict[str, BaseModel]]) -> List[DatcomInput]:
+    """由已驗證的卡片實例組成 DatcomInput（卡片不會重新驗證）"""
+    return _DATCOM_INPUT_LIST.validate_python(rows)
+
+
+def validate_many(items: Iterable[Mapping[str, Any]]) -> List[DatcomInput]:
+    """
+    一次呼叫驗證整批 DatcomInput（與逐一 DatcomInput(**item) 的規則相同）
+
+    每種卡片整欄驗證一次；多個 item 共用同一個卡片 dict 物件時
+    （例如 {**base_cards, "synthesis": {...}}），該卡片只驗證一次。
+
+    Raises:
+        pydantic.ValidationError: 錯誤位置以 (索引, 卡片, 欄位) 表示
+    """
+    items = list(items)
+    try:
+        columns = {}
+        for name, model_class in CARD_CLASSES.items():
+            unique = {}
+            for item in items:
+                data = item[name]
+                unique.setdefault(id(data), data)
+            cards = dict(zip(unique, _card_list_adapter(model_class).validate_python(list(unique.values()))))
+            columns[name] = [cards[id(item[name])] for item in items]
+    except (KeyError, TypeError, ValidationError):
+        # 錯誤（或不是 dict 的 item）交給整批 TypeAdapter，錯誤位置包含 item 索引
+        return _DATCOM_INPUT_LIST.validate_python(items)
+    return _assemble([dict(zip(columns, row)) for row in zip(*columns.values())])
+
+
+def field_column(models: Sequence[BaseModel], name: str) -> np.ndarray:
+    """一批卡片中同一個純量欄位的 float64 欄位陣列（批次 metrics / 一致性檢查共用）"""
+    return np.fromiter((getattr(model, name) for model in models), dtype=np.float64, count=len(models))
+
+
+def _column_items(base: DatcomInput, columns: Mapping[str, Sequence[Any]], count: int) -> List[dict]:
+    base_data = base.model_dump()
+    paths = [(path, *path.split(".", 1)) for path in columns]
+    items = []
+    for i in range(count):
+        item = {card: dict(fields) for card, fields in base_data.items()}
+        for path, card, field in paths:
+            item[card][field] = columns[path][i]
+        items.append(item)
+    return items
+
+
+def validate_columns(base: DatcomInput, columns: Mapping[str, Sequence[Any]]) -> List[DatcomInput]:
+    """
+    以欄位為單位（columnar）產生並驗證一批變化
+
+    只有 columns 涉及的卡片會驗證（每種卡片一次呼叫，含 NALPHA 等跨欄位檢查），
+    其餘卡片沿用 base 的實例。
+
+    Args:
+        base: 其餘欄位沿用的 DatcomInput
+        columns: {"卡片.欄位": 每個變化的值}，例如
+            {"synthesis.XCG": [11.0, 11.2], "flight_conditions.WT": [5000.0, 5200.0]}；
+            所有欄位長度必須相同
+
+    Returns:
+        len(values) 個 DatcomInput
+
+    Raises:
+        ValueError: 欄位長度不同或欄位名稱不存在
+        pydantic.ValidationError: 錯誤位置以 (索引, 卡片, 欄位) 表示
+    """
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"All columns must have the same length (got {sorted(lengths)})")
+    count = lengths.pop() if lengths else 0
+
+    by_card: Dict[str, Dict[str, Sequence[Any]]] = {}
+    for path, values in columns.items():
+        card, _, field = path.partition(".")
+        if card not in CARD_CLASSES or field not in CARD_CLASSES[card].model_fields:
+            raise ValueError(f"Unknown column '{path}' (expected 'card.FIELD', e.g. 'synthesis.XCG')")
+        by_card.setdefault(card, {})[field] = values
+
+    varied = {}
+    try:
+        for card, fields in by_card.items():
+            base_card = getattr(base, card)
+            base_values = _card_values(base_card)
+            rows = []
+            for row in zip(*fields.values()):
+                values = base_values.copy()
+                values.update(zip(fields, row))
+                rows.append(values)
+            varied[card] = _card_list_adapter(type(base_card)).validate_python(rows)
+    except ValidationError:
+        # 以整批驗證重新執行，錯誤位置與 validate_many 相同
+        return _DATCOM_INPUT_LIST.validate_python(_column_items(base, columns, count))
+
+    cards = {name: getattr(base, name) for name in CARD_CLASSES}
+    items = []
+    for i in range(count):
+        item = cards.copy()
+        for card, rows in varied.items():
+            item[card] = rows[i]
+        items.append(item)
+    return _assemble(items)
+
+
+def derive_trusted(base: DatcomInput, **card_updates: Dict[str, Any]) -> DatcomInput:
+    """
+    由已驗證的 base 快速衍生新的 DatcomInput（不執行 Pydantic 驗證）
+
+    只適合值來自可信來源的情況（例如 sweep 產生器）；清單長度改變時
+    NALPHA / NMACH / NALT / NX 會自動同步，其餘限制（如 le=20）由呼叫端負責。
+    沒有更新的卡片與 base 共用同一個實例。
+
+    Example:
+        derive_trusted(base, flight_conditions={"ALSCHD": [0.0, 2.0], "WT": 5000.0})
+    """
+    cards = {name: getattr(base, name) for name in CARD_CLASSES}
+    for card, fields in card_updates.items():
+        fields = dict(fields)
+        for list_field, count_field in COUNT_FIELDS.get(card, {}).items():
+            if list_field in fields and count_field not in fields:
+                fields[count_field] = len(fields[list_field])
+        cards[card] = cards[card].model_copy(update=fields)
+    # 卡片實例不會重新驗證，只組成 DatcomInput
+    return DatcomInput.model_validate(cards)
@@ -0,0 +1,207 @@
+"""
+Content-addressed cache for generated DATCOM decks
+以 DatcomInput 內容的 hash 為 key，將產生過的 for005.dat 存在磁碟上；
+重複的設定只需查表並以 hardlink（或複製）放到輸出位置。
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from datcom_tool_agent.codec import encode_datcom_input
+from datcom_tool_agent.data_model import DatcomInput
+from datcom_tool_agent.output_store import atomic_write
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+# 產生器輸出格式或 key 的計算方式改變時需遞增，讓舊的快取自動失效
+DECK_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "output", ".deck_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def datcom_input_key(datcom_input: DatcomInput, case_id: str) -> str:
+    """計算 DatcomInput + case_id 的標準化 hash（sha256 hex，以二進位編碼計算）"""
+    digest = hashlib.sha256(f"{DECK_FORMAT_VERSION}\0{case_id}\0".encode("utf-8"))
+    digest.update(encode_datcom_input(datcom_input))
+    return digest.hexdigest()
+
+
+class DeckCache:
+    """
+    磁碟上的 content-addressed deck 快取
+
+    - 每個 deck 存成 <root>/<key[:2]>/<key>.dat
+    - 總大小超過 max_bytes 時依 LRU（最近使用時間）刪除最舊的 deck
+    - 最近使用時間以檔案 mtime 記錄，重啟後仍保留 LRU 順序
+
+    注意：輸出檔案可能是快取檔案的 hardlink，請以「寫入暫存檔後 rename」的方式
+    覆寫輸出位置，不要直接以 'w' 模式開啟寫入，否則會一併改到快取內容。
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = root or os.getenv("DATCOM_DECK_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("DATCOM_DECK_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None  # OrderedDict[key, size]，最舊的在前面
+        self._total_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        """第一次使用時掃描快取目錄，依 mtime 建立 LRU 順序"""
+        entries = []
+        if os.path.isdir(self.root):
+            for shard in os.listdir(self.root):
+                shard_dir = os.path.join(self.root, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    if not name.endswith(".dat"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(shard_dir, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-len(".dat")], stat.st_size))
+
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._load_index()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.dat")
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        """查詢快取；命中時更新最近使用時間並回傳快取檔案路徑"""
+        path = self.path_for(key)
+        with self._lock:
+            self._ensure_index()
+            if key not in self._index:
+                self.misses += 1
+                return None
+            try:
+                os.utime(path)
+            except OSError:
+                # 檔案已被其他 process 刪除
+                self._total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, content: str) -> str:
+        """寫入一個 deck（暫存檔 + rename），並在超過大小上限時淘汰舊的 deck"""
+        path = self.path_for(key)
+        data = content.encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, data)
+
+        with self._lock:
+            self._ensure_index()
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str):
+        """刪除最久未使用的 deck，直到總大小不超過 max_bytes（呼叫端需持有 lock）"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = next(iter(self._index.items()))
+            if key == keep:
+                break
+            del self._index[key]
+            self._total_bytes -= size
+            try:
+                os.unlink(self.path_for(key))
+            except OSError:
+                pass
+
+    @staticmethod
+    def materialize(cached_path: str, dest: str):
+        """將快取檔案放到輸出位置：優先使用 hardlink，跨檔案系統時改為複製
+
+        先建立在目標目錄的暫存名稱再 rename，不會修改 dest 原本指向的檔案。
+        """
+        # dest 已經是同一個快取檔案的 hardlink（rename 在這種情況下不會做任何事）
+        if os.path.exists(dest) and os.path.samefile(cached_path, dest):
+            return
+
+        dest_dir = os.path.dirname(os.path.abspath(dest))
+        fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".tmp")
+        os.close(fd)
+        os.unlink(tmp_path)
+        try:
+            try:
+                os.link(cached_path, tmp_path)
+            except OSError:
+                shutil.copyfile(cached_path, tmp_path)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_or_generate(
+        self,
+        datcom_input: DatcomInput,
+        case_id: str,
+        dest: str,
+        generator: Optional[DatcomGenerator] = None,
+        key: Optional[str] = None,
+    ) -> Tuple[str, bool]:
+        """將 deck 放到 dest；快取未命中時才產生
+
+        Args:
+            key: 已計算好的 datcom_input_key（省略時自動計算）
+
+        Returns:
+            (dest, 是否命中快取)
+        """
+        key = key or datcom_input_key(datcom_input, case_id)
+        cached_path = self.get(key)
+        hit = cached_path is not None
+        if not hit:
+            generator = generator or DatcomGenerator()
+            cached_path = self.put(key, generator.render(datcom_input, case_id))
+        self.materialize(cached_path, dest)
+        return dest, hit
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._ensure_index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_default_cache = None
+
+
+def get_default_deck_cache() -> DeckCache:
+    """取得共用的 DeckCache（位置與大小上限可由環境變數設定）"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DeckCache()
+    return _default_cache
@@ -0,0 +1,247 @@
+"""
+DATCOM for005.dat reader
+將既有的 for005.dat（單一或多個 case）直接解析回 DatcomInput，不需要 LLM。
+
+支援的格式：
+- CASEID <名稱>
+- $FLTCON NALPHA=6.0,ALSCHD=1.0,2.0,...$（可跨多行，以 $ 結束）
+- NACA-W-6-63-415 / NACA W 4 0012 / NACA-H-... / NACA-V-...
+- SAVE / NEXT CASE（多個 case，SAVE 會將卡片帶到下一個 case）
+- Fortran 風格數字：2.97310e1、1.0D0、6.、重複寫法 3*0.0、索引起點 ALSCHD(3)=...
+  （索引賦值只覆寫指定的元素，SAVE 帶入或同一 case 先前的值保留）
+- DAMP、BUILD 等控制卡片與 * 註解行；其他無法辨識的行記錄在 ParsedCase.ignored_lines
+"""
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from datcom_tool_agent.data_model import (
+    DatcomInput, FLTCON, SYNTHS, BODY,
+    WGPLNF, HTPLNF, VTPLNF
+)
+
+# Namelist 名稱 → (DatcomInput 屬性, model class)
+_NAMELISTS = {
+    "FLTCON": ("flight_conditions", FLTCON),
+    "SYNTHS": ("synthesis", SYNTHS),
+    "BODY": ("body", BODY),
+    "WGPLNF": ("wing_planform", WGPLNF),
+    "HTPLNF": ("horizontal_tail_planform", HTPLNF),
+    "VTPLNF": ("vertical_tail_planform", VTPLNF),
+}
+
+# 翼型卡片 → (Namelist 名稱, 欄位名稱)
+_AIRFOIL_CARDS = {
+    "W": ("WGPLNF", "NACA_W"),
+    "H": ("HTPLNF", "NACA_H"),
+    "V": ("VTPLNF", "NACA_V"),
+}
+
+_NAMELIST_START = re.compile(r"^\s*\$\s*([A-Za-z]+)\b")
+_AIRFOIL_CARD = re.compile(r"^\s*NACA[-\s]+([A-Za-z])[-\s]+(\S.*?)\s*$", re.IGNORECASE)
+# 不影響 DatcomInput 的控制卡片
+_CONTROL_CARDS = ("DAMP", "BUILD", "PART", "DUMP", "DERIV", "DIM", "TRIM", "PLOT", "PRINT", "WRITE", "NAMELIST")
+_ASSIGNMENT = re.compile(r"([A-Za-z][A-Za-z0-9_]*)\s*(?:\(\s*(\d+)\s*\))?\s*=")
+_VALUE_SEPARATOR = re.compile(r"[,\s]+")
+
+
+class ParsedCase(BaseModel):
+    """for005.dat 中的一個 case"""
+    case_id: Optional[str] = None
+    datcom_input: DatcomInput
+    ignored_keys: List[str] = Field(
+        default_factory=list,
+        description="Namelist 中出現但 data_model 沒有定義的變數（例如 LOOP、SREF）"
+    )
+    ignored_lines: List[str] = Field(
+        default_factory=list,
+        description="無法辨識的行（不是 Namelist、翼型、CASEID 或控制卡片），格式為 'Line n: 內容'"
+    )
+
+
+def _parse_number(token: str) -> float:
+    """解析 Fortran 風格數字（支援 D 指數與結尾小數點）"""
+    return float(token.replace("D", "E").replace("d", "e"))
+
+
+def _parse_values(text: str, line_number: int) -> List[float]:
+    """解析一個變數的值，支援 n*value 重複寫法"""
+    values = []
+    for token in _VALUE_SEPARATOR.split(text.strip()):
+        if not token:
+            continue
+        try:
+            if "*" in token:
+                count, value = token.split("*", 1)
+                values.extend([_parse_number(value)] * int(count))
+            else:
+                values.append(_parse_number(token))
+        except ValueError:
+            raise ValueError(f"Line {line_number}: cannot parse value '{token}'") from None
+    return values
+
+
+def _parse_namelist_body(
+    body: str,
+    line_number: int,
+    assignments: Optional[Dict[str, List[float]]] = None,
+) -> Dict[str, List[float]]:
+    """
+    將 Namelist 內容（不含 $NAME 與結尾 $）解析成 {變數: 值列表}
+
+    assignments 為目前已有的值（SAVE 帶入或重複的 Namelist）時，結果合併到新的 dict：
+    沒有索引的賦值取代整個變數，ALSCHD(3)=... 只覆寫從第 3 個開始的元素。
+    """
+    assignments = dict(assignments or {})
+    matches = list(_ASSIGNMENT.finditer(body))
+    if not matches and body.strip():
+        raise ValueError(f"Line {line_number}: namelist body has no KEY=VALUE assignment")
+
+    for i, match in enumerate(matches):
+        key = match.group(1).upper()
+        start_index = int(match.group(2)) - 1 if match.group(2) else 0
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        values = _parse_values(body[match.end():end], line_number)
+
+        if start_index:
+            # ALSCHD(3)=... 只覆寫從第 3 個開始的值
+            existing = list(assignments.get(key, []))
+            existing.extend([0.0] * max(0, start_index - len(existing)))
+            existing[start_index:start_index + len(values)] = values
+            values = existing
+        assignments[key] = values
+    return assignments
+
+
+def _build_case(
+    namelists: Dict[str, Dict[str, List[float]]],
+    airfoils: Dict[str, str],
+    case_id: Optional[str],
+    ignored_lines: List[str],
+) -> ParsedCase:
+    """將累積的 Namelist 資料組成 DatcomInput"""
+    data = {}
+    ignored = []
+    for namelist_name, (attribute, model_class) in _NAMELISTS.items():
+        card = {}
+        for key, values in namelists.get(namelist_name, {}).items():
+            field = model_class.model_fields.get(key)
+            if field is None:
+                ignored.append(f"{namelist_name}.{key}")
+                continue
+            is_list = getattr(field.annotation, "__origin__", None) is list
+            if not is_list and not values:
+                raise ValueError(f"${namelist_name} {key}: assignment has no value")
+            card[key] = values if is_list else values[0]
+        data[attribute] = card
+
+    for _, (namelist_name, field_name) in _AIRFOIL_CARDS.items():
+        if namelist_name in airfoils:
+            data[_NAMELISTS[namelist_name][0]][field_name] = airfoils[namelist_name]
+
+    return ParsedCase(
+        case_id=case_id,
+        datcom_input=DatcomInput.model_validate(data),
+        ignored_keys=ignored,
+        ignored_lines=ignored_lines,
+    )
+
+
+def parse_deck(text: str) -> List[ParsedCase]:
+    """
+    解析 for005.dat 內容（單次掃描）
+
+    Returns:
+        每個 case 一個 ParsedCase；SAVE 的 case 其卡片會帶到下一個 case，
+        下一個 case 只需寫入變更的變數。
+    """
+    cases = []
+    namelists: Dict[str, Dict[str, List[float]]] = {}
+    airfoils: Dict[str, str] = {}
+    case_id = None
+    save = False
+    has_content = False
+    ignored_lines: List[str] = []
+
+    pending_name = None  # 跨行 Namelist 的名稱
+    pending_body = []
+    pending_line = 0
+
+    def finish_case():
+        nonlocal namelists, airfoils, case_id, save, has_content, ignored_lines
+        if has_content:
+            cases.append(_build_case(namelists, airfoils, case_id, ignored_lines))
+        if save:
+            namelists = {name: dict(values) for name, values in namelists.items()}
+            airfoils = dict(airfoils)
+        else:
+            namelists, airfoils = {}, {}
+        case_id, save, has_content, ignored_lines = None, False, False, []
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if pending_name is not None:
+            # 繼續讀取跨行的 Namelist，直到遇到結尾的 $
+            if "$" in line:
+                pending_body.append(line[:line.index("$")])
+                namelists[pending_name] = _parse_namelist_body(
+                    " ".join(pending_body), pending_line, namelists.get(pending_name)
+                )
+                pending_name = None
+            else:
+                pending_body.append(line)
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            continue
+        upper = stripped.upper()
+
+        match = _NAMELIST_START.match(line)
+        if match:
+            name = match.group(1).upper()
+            if name not in _NAMELISTS:
+                raise ValueError(f"Line {line_number}: unsupported namelist ${name}")
+            rest = line[match.end():]
+            has_content = True
+            if "$" in rest:
+                namelists[name] = _parse_namelist_body(rest[:rest.index("$")], line_number, namelists.get(name))
+            else:
+                pending_name, pending_body, pending_line = name, [rest], line_number
+            continue
+
+        match = _AIRFOIL_CARD.match(stripped)
+        if match:
+            surface = match.group(1).upper()
+            if surface not in _AIRFOIL_CARDS:
+                raise ValueError(f"Line {line_number}: unsupported airfoil card NACA-{surface}")
+            # 以空白分隔的寫法（NACA W 4 0012）與 NACA-W-4-0012 相同
+            airfoils[_AIRFOIL_CARDS[surface][0]] = re.sub(r"\s+", "-", match.group(2))
+            has_content = True
+            continue
+        if upper.startswith("NACA"):
+            raise ValueError(f"Line {line_number}: cannot parse airfoil card '{stripped}'")
+
+        if upper.startswith("CASEID"):
+            case_id = stripped[len("CASEID"):].strip() or None
+        elif upper == "SAVE":
+            save = True
+        elif upper == "NEXT CASE":
+            finish_case()
+        elif stripped.startswith("*") or upper.split()[0] in _CONTROL_CARDS:
+            # 註解與 DAMP、BUILD 等控制卡片不影響 DatcomInput
+            pass
+        else:
+            ignored_lines.append(f"Line {line_number}: {stripped}")
+
+    if pending_name is not None:
+        raise ValueError(f"Line {pending_line}: namelist ${pending_name} is not terminated by '$'")
+
+    finish_case()
+    return cases
+
+
+def read_deck(path: str) -> List[ParsedCase]:
+    """讀取並解析 for005.dat 檔案"""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_deck(f.read())
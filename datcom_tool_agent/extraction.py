@@ -0,0 +1,353 @@
+"""
+Deterministic DATCOM parameter extraction
+file_content（或使用者訊息）已經是結構化資料時，不需要 LLM 就能組成 DatcomInput：
+
+- 原始 for005.dat（$FLTCON ... $）交給 deck_reader.parse_deck
+- Markdown / 條列文字：依章節標題（FLTCON、## 主翼 (WGPLNF) ...）判斷卡片，
+  讀取 KEY=value 以及「攻角值: 1.0, 2.0」這類中文 / 英文標籤
+
+所有必填欄位都找到且沒有衝突時 datcom_input 會是驗證過的 DatcomInput；
+否則列出缺少 / 有歧義的欄位，由 LLM 補齊。
+"""
+import re
+from typing import Any, Dict, List, Literal, Optional, Tuple, get_origin
+
+from pydantic import BaseModel, Field, ValidationError
+
+from datcom_tool_agent.data_model import COUNT_FIELDS, BODYArray, DatcomInput
+from datcom_tool_agent.deck_reader import parse_deck
+from datcom_tool_agent.run_generator import DatcomGenerator
+from datcom_tool_agent.tool_schema import build_datcom_input
+
+# 章節標題中的關鍵字 → DatcomInput 屬性（依序比對，尾翼要在 wing 之前）
+_SECTION_LABELS = (
+    ("flight_conditions", ("FLTCON", "飛行條件", "FLIGHT CONDITION")),
+    ("synthesis", ("SYNTHS", "合成", "SYNTHESIS")),
+    ("body", ("BODY", "機身", "FUSELAGE")),
+    ("horizontal_tail_planform", ("HTPLNF", "水平尾", "HORIZONTAL TAIL")),
+    ("vertical_tail_planform", ("VTPLNF", "垂直尾", "VERTICAL TAIL")),
+    ("wing_planform", ("WGPLNF", "主翼", "WING")),
+)
+
+# 「標籤: 值」的標籤 → 欄位（NACA 依所在章節對應到 NACA_W / NACA_H / NACA_V）
+_FIELD_LABELS = {
+    "攻角數量": "NALPHA", "攻角數": "NALPHA", "攻角值": "ALSCHD", "攻角": "ALSCHD",
+    "馬赫數組數": "NMACH", "馬赫數": "MACH", "高度組數": "NALT", "高度": "ALT", "重量": "WT",
+    "ANGLES OF ATTACK": "ALSCHD", "MACH": "MACH", "ALTITUDE": "ALT", "WEIGHT": "WT",
+    "NACA": "NACA", "AIRFOIL": "NACA", "翼型": "NACA",
+}
+_NACA_FIELDS = {
+    "wing_planform": "NACA_W",
+    "horizontal_tail_planform": "NACA_H",
+    "vertical_tail_planform": "NACA_V",
+}
+
+# 數值後面可以接的單位
+_UNITS = {"FT", "FEET", "DEG", "LB", "LBS", "M"}
+
+_DECK_NAMELIST = re.compile(r"^\s*\$\s*(FLTCON|SYNTHS|BODY|WGPLNF|HTPLNF|VTPLNF)\b", re.MULTILINE | re.IGNORECASE)
+_ASSIGNMENT = re.compile(r"\b([A-Z][A-Z0-9_]*)\s*=\s*")
+_LABEL = re.compile(r"^[\s\-*•]*([^:：=]+?)\s*[:：]\s*(.+)$")
+_CASE_ID = re.compile(r"^\s*CASEID\s+(.+?)\s*$", re.MULTILINE | re.IGNORECASE)
+_AIRCRAFT_HEADING = re.compile(r"^#\s+(.+?)\s*$")
+# `#` 以外的章節標題：整行粗體，或以冒號結尾（前面可有清單符號）
+_HEADING_LINE = re.compile(r"^[\-*•\s]*(\*\*[^*]+\*\*|__[^_]+__|[^:：]+[:：])$")
+_VALUE_SEPARATOR = re.compile(r"[,\s]+")
+# 請求中表示修改參數的字詞與單獨的數值（PC-9、for005 中的數字不算）
+_CHANGE_REQUEST = re.compile(
+    r"改|換成|換為|變更|設為|設成|設定為|調整|\b(change|changed|modify|override|instead|replace)\b|\bset\b.*\bto\b",
+    re.IGNORECASE,
+)
+_STANDALONE_NUMBER = re.compile(r"(?<![\w.\-])[-+]?\d+(?:\.\d+)?(?![\w.\-])")
+
+
+class ExtractionResult(BaseModel):
+    """確定性抽取的結果"""
+    source: Literal["deck", "text"]
+    case_id: Optional[str] = None
+    cards: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="已抽取的欄位（DatcomInput 屬性 → {欄位: 值}），格式與 write_datcom_file 的參數相同"
+    )
+    missing: List[str] = Field(default_factory=list, description="缺少的必填欄位，例如 wing_planform.CHRDTP")
+    ambiguous: List[str] = Field(default_factory=list, description="出現多個不同值或無法判斷卡片的欄位")
+    error: Optional[str] = None
+    datcom_input: Optional[DatcomInput] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.datcom_input is not None and not self.ambiguous
+
+
+def _field_kind(annotation) -> str:
+    """'l' 清單、's' 字串、'i' 整數、'f' 浮點"""
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        return "l"
+    if annotation is str:
+        return "s"
+    if annotation is int or origin is Literal:
+        return "i"
+    return "f"
+
+
+def _card_fields(attribute: str) -> Dict[str, str]:
+    model_class = DatcomInput.model_fields[attribute].annotation
+    return {name: _field_kind(field.annotation) for name, field in model_class.model_fields.items()}
+
+
+_FIELDS = {attribute: _card_fields(attribute) for attribute in DatcomInput.model_fields}
+
+
+def _parse_value(text: str, kind: str):
+    """將文字轉成欄位值；無法轉換時回傳 None"""
+    text = text.strip().rstrip(",;")
+    if kind == "s":
+        return text.split()[0] if text else None
+    tokens = [token for token in _VALUE_SEPARATOR.split(text) if token]
+    while tokens and tokens[-1].upper() in _UNITS:
+        tokens.pop()
+    try:
+        values = [float(token.replace("D", "E")) for token in tokens]
+    except ValueError:
+        return None
+    if kind == "l":
+        return values or None
+    if len(values) != 1:
+        return None
+    if kind == "i":
+        return int(values[0]) if values[0].is_integer() else None
+    return values[0]
+
+
+def section_of(line: str) -> Optional[str]:
+    """
+    章節標題行 → DatcomInput 屬性；不是標題時回傳 None
+
+    只有 `#` 標題、整行粗體（**主翼**）或以冒號結尾的行（Wing:）是標題；
+    「The wing is mid-mounted」之類提到卡片名稱的說明文字不會切換目前的卡片
+    """
+    stripped = line.strip()
+    if not stripped or "=" in stripped:
+        return None
+    if not stripped.startswith("#"):
+        if not _HEADING_LINE.match(stripped) or re.search(r"\d", stripped):
+            return None
+    upper = stripped.upper()
+    for attribute, labels in _SECTION_LABELS:
+        if any(label in upper for label in labels):
+            return attribute
+    return None
+
+
+def _extract_deck(content: str) -> ExtractionResult:
+    try:
+        cases = parse_deck(content)
+    except (ValueError, ValidationError) as e:
+        return ExtractionResult(source="deck", error=str(e))
+    if not cases:
+        return ExtractionResult(source="deck", error="Deck contains no DATCOM case")
+    case = cases[0]
+    try:
+        # 與 tool 相同，以 BODYArray 檢查機身站位幾何
+        datcom_input = case.datcom_input.model_copy(
+            update={"body": BODYArray.model_validate(case.datcom_input.body)}
+        )
+    except ValidationError as e:
+        return ExtractionResult(source="deck", case_id=case.case_id, error=str(e))
+    result = ExtractionResult(
+        source="deck",
+        case_id=case.case_id,
+        cards=case.datcom_input.model_dump(),
+        datcom_input=datcom_input,
+    )
+    # Namelist 外的 KEY=value 行可能是寫錯位置的參數，不能直接忽略
+    result.ambiguous.extend(f"deck ({line})" for line in case.ignored_lines if "=" in line)
+    if len(cases) > 1:
+        # write_datcom_file 一次只寫一個 case，其餘 case 需要使用者確認
+        result.ambiguous.append(f"case ({len(cases)} cases in deck, using the first)")
+    return result
+
+
+def _extract_text(content: str) -> ExtractionResult:
+    cards: Dict[str, Dict[str, Any]] = {}
+    ambiguous = set()
+
+    def assign(section: Optional[str], key: str, text: str):
+        if key == "NACA":
+            if section not in _NACA_FIELDS:
+                ambiguous.add("?.NACA")
+                return
+            key = _NACA_FIELDS[section]
+        if section is not None and key in _FIELDS[section]:
+            attribute = section
+        else:
+            owners = [attribute for attribute, fields in _FIELDS.items() if key in fields]
+            if not owners:
+                return  # 與 DATCOM 無關的 KEY=value
+            if len(owners) > 1:
+                ambiguous.add(f"?.{key}")
+                return
+            attribute = owners[0]
+        value = _parse_value(text, _FIELDS[attribute][key])
+        name = f"{attribute}.{key}"
+        if value is None:
+            ambiguous.add(name)
+            return
+        card = cards.setdefault(attribute, {})
+        if key in card and card[key] != value:
+            ambiguous.add(name)
+        card[key] = value
+
+    section = None
+    for line in content.splitlines():
+        heading = section_of(line)
+        if heading is not None:
+            section = heading
+            continue
+
+        matches = list(_ASSIGNMENT.finditer(line))
+        if matches:
+            for i, match in enumerate(matches):
+                end = matches[i + 1].start() if i + 1 < len(matches) else len(line)
+                assign(section, match.group(1), line[match.end():end])
+            continue
+
+        label = _LABEL.match(line)
+        if label:
+            key = _FIELD_LABELS.get(label.group(1).strip().upper())
+            if key is not None:
+                assign(section, key, label.group(2))
+
+    # 數量欄位：有給就必須與清單長度一致，沒給由清單長度填入
+    for attribute, counts in COUNT_FIELDS.items():
+        card = cards.get(attribute, {})
+        for list_field, count_field in counts.items():
+            if count_field in card and list_field in card and card[count_field] != len(card[list_field]):
+                ambiguous.add(f"{attribute}.{count_field}")
+            card.pop(count_field, None)
+
+    missing = []
+    for attribute, field in DatcomInput.model_fields.items():
+        derived = set(COUNT_FIELDS.get(attribute, {}).values())
+        for name, card_field in field.annotation.model_fields.items():
+            if card_field.is_required() and name not in derived and name not in cards.get(attribute, {}):
+                missing.append(f"{attribute}.{name}")
+
+    match = _CASE_ID.search(content)
+    result = ExtractionResult(
+        source="text",
+        case_id=match.group(1) if match else None,
+        cards=cards,
+        missing=missing,
+        ambiguous=sorted(ambiguous),
+    )
+    if not missing and not ambiguous:
+        try:
+            result.datcom_input = build_datcom_input(cards)
+        except ValidationError as e:
+            result.error = str(e)
+    return result
+
+
+def request_overrides(request: Optional[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    使用者請求中對檔案參數的修改（「請產生 DATCOM 檔案，WT=6000」）
+
+    Returns:
+        {}：請求沒有修改參數；{DatcomInput 屬性: {欄位: 值}}：所有修改都是 KEY=value /
+        標籤格式；None：請求中有無法確定解析的修改（「重量改成 6000」），需要交給 LLM
+    """
+    request = request or ""
+    overrides = _extract_text(request)
+    if overrides.ambiguous:
+        return None
+    for line in request.splitlines():
+        # KEY=value / 標籤行的值已由 _extract_text 檢查，只看前面的文字
+        match = _ASSIGNMENT.search(line)
+        label = _LABEL.match(line)
+        if match:
+            rest = line[:match.start()]
+        elif label and label.group(1).strip().upper() in _FIELD_LABELS:
+            rest = ""
+        else:
+            rest = line
+        if _CHANGE_REQUEST.search(rest) or _STANDALONE_NUMBER.search(rest):
+            return None
+    return overrides.cards
+
+
+def apply_overrides(
+    extraction: ExtractionResult, overrides: Dict[str, Dict[str, Any]]
+) -> Optional[DatcomInput]:
+    """將請求中的修改合併到抽取結果；合併後不符合 data_model 時回傳 None"""
+    cards = {attribute: dict(card) for attribute, card in extraction.cards.items()}
+    for attribute, fields in overrides.items():
+        card = cards.setdefault(attribute, {})
+        # 修改清單時由新的長度重新填入數量欄位
+        for list_field, count_field in COUNT_FIELDS.get(attribute, {}).items():
+            if list_field in fields:
+                card.pop(count_field, None)
+        card.update(fields)
+    try:
+        return build_datcom_input(cards)
+    except ValidationError:
+        return None
+
+
+def extract_datcom_input(content: str) -> ExtractionResult:
+    """
+    不經 LLM 從文字抽取 DatcomInput
+
+    Returns:
+        ExtractionResult；complete 為 True 時可直接產生 for005.dat
+    """
+    if _DECK_NAMELIST.search(content or ""):
+        return _extract_deck(content)
+    return _extract_text(content or "")
+
+
+def split_aircraft(content: str) -> List[Tuple[Optional[str], str]]:
+    """
+    將描述多架飛機（多個 case）的文件切成每架一份內容
+
+    - for005.dat：每個 case 重新輸出成獨立的 deck（SAVE 帶到下一個 case 的卡片也會寫入）
+    - 文字：以第一層標題（`# PC-9`，不是章節標題）或 CASEID 行分段；
+      第一段之前的內容（例如說明）加在每一段前面，標題名稱寫成該段的 CASEID
+
+    Returns:
+        [(case_id 或 None, 內容)]；只有一架時回傳整份內容
+    """
+    content = content or ""
+    if _DECK_NAMELIST.search(content):
+        try:
+            cases = parse_deck(content)
+        except (ValueError, ValidationError):
+            return [(None, content)]
+        if len(cases) <= 1:
+            return [(cases[0].case_id if cases else None, content)]
+        generator = DatcomGenerator()
+        return [
+            (case.case_id, generator.render(case.datcom_input, case.case_id or f"CASE {i}"))
+            for i, case in enumerate(cases, 1)
+        ]
+
+    lines = content.splitlines()
+    for pattern in (_AIRCRAFT_HEADING, _CASE_ID):
+        starts = [
+            i for i, line in enumerate(lines)
+            if pattern.match(line) and section_of(line) is None
+        ]
+        if len(starts) < 2:
+            continue
+        preamble = lines[:starts[0]]
+        items = []
+        for start, end in zip(starts, starts[1:] + [len(lines)]):
+            block = lines[start:end]
+            name = pattern.match(lines[start]).group(1)
+            if pattern is _AIRCRAFT_HEADING and not _CASE_ID.search("\n".join(block)):
+                block = [f"CASEID {name}", *block]
+            items.append((name, "\n".join(preamble + block).strip()))
+        return items
+    match = _CASE_ID.search(content)
+    return [(match.group(1) if match else None, content)]
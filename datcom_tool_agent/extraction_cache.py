@@ -0,0 +1,120 @@
+"""
+Persistent cache for LLM extraction results
+同一份 file_content 以相同的請求再次送入時，直接取回上次 LLM 抽取並驗證過的
+DatcomInput，不需要再跑一次 ReAct agent。
+
+key = sha256(fingerprint + 請求 + file_content)。請求是正規化後的使用者訊息
+（「…，MACH 改成 0.5」這類附帶修改的請求不會取回未修改的抽取結果）；
+fingerprint 包含模型名稱、prompt、tool schema 與 DatcomInput 編碼格式，
+任何一項改變時舊資料自動失效並在開啟時清除。
+"""
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional, Tuple, Union
+
+from datcom_tool_agent.codec import CODEC_VERSION, LAYOUT_FINGERPRINT, decode_datcom_input
+from datcom_tool_agent.data_model import DatcomInput
+from datcom_tool_agent.tool_schema import datcom_tool_schema
+
+# 快取格式或 key 的計算方式改變時需遞增
+EXTRACTION_CACHE_VERSION = 2
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "output", ".extraction_cache.sqlite3")
+
+
+def extraction_fingerprint(model_name: str, prompt: str) -> str:
+    """模型、prompt 與資料模型的識別碼（sha256 hex）"""
+    digest = hashlib.sha256(
+        f"{EXTRACTION_CACHE_VERSION}\0{model_name}\0{CODEC_VERSION}:{LAYOUT_FINGERPRINT:08x}\0".encode("utf-8")
+    )
+    digest.update(prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(datcom_tool_schema(), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def normalize_request(request: Optional[str]) -> str:
+    """快取 key 中的請求：忽略大小寫與空白的差異"""
+    return " ".join((request or "").split()).casefold()
+
+
+class ExtractionCache:
+    """
+    SQLite 上的 (請求, file_content) → DatcomInput 快取
+
+    每次操作各自開啟連線，多個 process / thread 可共用同一個檔案。
+    """
+
+    def __init__(self, fingerprint: str, path: Optional[str] = None):
+        self.fingerprint = fingerprint
+        self.path = path or os.getenv("DATCOM_EXTRACTION_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS extractions ("
+                    " key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, case_id TEXT NOT NULL,"
+                    " datcom_input BLOB NOT NULL, created_at REAL NOT NULL)"
+                )
+                # prompt / 模型 / 資料模型已改變的舊資料不會再命中，直接清除
+                conn.execute("DELETE FROM extractions WHERE fingerprint != ?", (self.fingerprint,))
+            self._initialized = True
+        return conn
+
+    def key_for(self, content: str, request: Optional[str] = None) -> str:
+        digest = hashlib.sha256(f"{self.fingerprint}\0{normalize_request(request)}\0".encode("utf-8"))
+        digest.update(content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, content: str, request: Optional[str] = None) -> Optional[Tuple[DatcomInput, str]]:
+        """查詢快取；命中時回傳 (DatcomInput, case_id)"""
+        key = self.key_for(content, request)
+        with self._lock, closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT case_id, datcom_input FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                try:
+                    datcom_input = decode_datcom_input(row[1])
+                except ValueError:
+                    # 無法解碼的資料視為未命中並刪除
+                    with conn:
+                        conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return datcom_input, row[0]
+
+    def put(self, content: str, encoded_input: Union[bytes, str], case_id: str, request: Optional[str] = None):
+        """
+        記錄一次 LLM 抽取結果（encoded_input 為 encode_datcom_input 的 bytes，
+        或 latest_datcom 中 encode_datcom_input_text 的 base64 文字）
+        """
+        if isinstance(encoded_input, str):
+            encoded_input = base64.b64decode(encoded_input)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?)",
+                (self.key_for(content, request), self.fingerprint, case_id, encoded_input, time.time()),
+            )
+
+    def stats(self) -> dict:
+        with self._lock, closing(self._connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
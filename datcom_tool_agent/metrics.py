@@ -0,0 +1,68 @@
+"""
+Batch derived metrics for DatcomInput
+與 DatcomInput.metrics 相同的衍生幾何量（翼面積、展弦比、漸縮比、MAC、
+尾翼容積係數、機身細長比），對一批設定以 NumPy 一次計算。
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+
+from datcom_tool_agent.data_model import (
+    DatcomInput, body_geometry, field_column, planform_geometry, tail_volumes
+)
+
+# (DatcomInput 屬性, key 前綴, 翼面數)
+_SURFACES = (
+    ("wing_planform", "wing", 2),
+    ("horizontal_tail_planform", "htail", 2),
+    ("vertical_tail_planform", "vtail", 1),
+)
+
+
+def _body_columns(bodies):
+    """將長度不一的站位補齊成 (n, max NX) 陣列（補齊的站位為 0，不影響最大直徑）"""
+    width = max(max(len(body.X) for body in bodies), 1)
+    R, ZU, ZL = (np.zeros((len(bodies), width)) for _ in range(3))
+    x_first, x_last = np.zeros(len(bodies)), np.zeros(len(bodies))
+    for row, body in enumerate(bodies):
+        count = len(body.X)
+        if not count:
+            continue
+        R[row, :count] = body.R
+        ZU[row, :count] = body.ZU
+        ZL[row, :count] = body.ZL
+        x_first[row], x_last[row] = body.X[0], body.X[-1]
+    return x_first, x_last, R, ZU, ZL
+
+
+def compute_metrics(datcom_inputs: Sequence[DatcomInput]) -> Dict[str, np.ndarray]:
+    """
+    一次計算整批設定的衍生幾何量
+
+    Returns:
+        與 DatcomInput.metrics 相同的 key，每個值為長度 len(datcom_inputs) 的陣列
+    """
+    metrics = {}
+    surfaces = {}
+    for attribute, prefix, panels in _SURFACES:
+        cards = [getattr(d, attribute) for d in datcom_inputs]
+        surfaces[prefix] = planform_geometry(
+            field_column(cards, "CHRDR"), field_column(cards, "CHRDTP"), field_column(cards, "SSPN"),
+            field_column(cards, "SAVSI"), field_column(cards, "CHSTAT"), panels,
+        )
+        metrics.update((f"{prefix}.{name}", values) for name, values in surfaces[prefix].items())
+
+    if datcom_inputs:
+        body = body_geometry(*_body_columns([d.body for d in datcom_inputs]))
+    else:
+        body = body_geometry(np.zeros(0), np.zeros(0), *(np.zeros((0, 1)) for _ in range(3)))
+    metrics.update((f"body.{name}", values) for name, values in body.items())
+
+    synthesis = [d.synthesis for d in datcom_inputs]
+    metrics.update(tail_volumes(
+        field_column(synthesis, "XCG"),
+        surfaces["wing"], field_column(synthesis, "XW"),
+        surfaces["htail"], field_column(synthesis, "XH"),
+        surfaces["vtail"], field_column(synthesis, "XV"),
+    ))
+    return metrics
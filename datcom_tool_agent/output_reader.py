@@ -0,0 +1,245 @@
+"""
+DATCOM for006.dat output reader
+以 mmap 逐行掃描 DATCOM 輸出檔，只解碼需要的行，將每個攻角的係數表
+（CD、CL、CM、CN、CA、XCP、CLA、CMA、CYB、CNB、CLB 以及 DAMP 的動態導數）
+轉成 NumPy 陣列，依 (case, configuration, Mach, altitude) 分組。
+"""
+import mmap
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# (case_id, configuration, mach, altitude)
+TableKey = Tuple[Optional[str], Optional[str], float, float]
+
+# DATCOM 以這些字串表示沒有資料
+_MISSING_VALUES = {"NDM", "NA", "N/A"}
+
+
+class CoefficientTable:
+    """一組飛行條件下、隨攻角變化的係數表（每個欄位一個 NumPy 陣列）"""
+
+    __slots__ = ("alpha", "columns")
+
+    def __init__(self, alpha: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.alpha = alpha
+        self.columns = columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.alpha if name == "ALPHA" else self.columns[name]
+
+    def merge(self, other: "CoefficientTable") -> bool:
+        """
+        合併同一飛行條件的另一張表（例如 DAMP 的動態導數表）
+
+        Returns:
+            攻角不同時不合併並回傳 False（兩張表各自保留）
+        """
+        if not np.array_equal(self.alpha, other.alpha):
+            return False
+        for name, values in other.columns.items():
+            self.columns.setdefault(name, values)
+        return True
+
+
+def _strip_carriage_control(line: str) -> str:
+    """去除 Fortran 輸出第一欄的換頁控制字元（'0'、'1'、'+'）"""
+    if line[:1] in ("0", "1", "+") and line[1:2] in ("", " ", "\n", "\r"):
+        return " " + line[1:]
+    return line
+
+
+def _to_float(token: str) -> float:
+    if token.upper() in _MISSING_VALUES or token.startswith("*"):
+        return np.nan
+    return float(token.replace("D", "E"))
+
+
+def _numeric_tokens(line: str) -> Optional[List[float]]:
+    """整行皆為數字時回傳數值列表，否則回傳 None"""
+    tokens = line.split()
+    if not tokens:
+        return None
+    try:
+        return [_to_float(token) for token in tokens]
+    except ValueError:
+        return None
+
+
+def _header_columns(header: str) -> List[Tuple[str, float]]:
+    """表頭中每個欄位名稱及其中心位置"""
+    columns = []
+    position = 0
+    for name in header.split():
+        start = header.index(name, position)
+        position = start + len(name)
+        columns.append((name, (start + position - 1) / 2.0))
+    return columns
+
+
+def _assign_row(line: str, columns: List[Tuple[str, float]]) -> List[float]:
+    """依位置把一行數值對應到表頭欄位（中間空白的欄位保留為 NaN）"""
+    row = [np.nan] * len(columns)
+    centers = np.array([center for _, center in columns])
+    position = 0
+    for token in line.split():
+        start = line.index(token, position)
+        position = start + len(token)
+        index = int(np.argmin(np.abs(centers - (start + position - 1) / 2.0)))
+        row[index] = _to_float(token)
+    return row
+
+
+def iter_coefficient_tables(path: str) -> Iterator[Tuple[TableKey, CoefficientTable]]:
+    """
+    串流讀取 for006.dat，每讀完一張係數表就 yield (key, table)
+
+    - case_id 取自 DATCOM 回顯的輸入卡片 "CASEID ..."
+    - configuration 取自 "... CONFIGURATION" / "... ALONE" 標題行
+    - Mach / altitude 取自 FLIGHT CONDITIONS 表的數值列
+    """
+    if os.path.getsize(path) == 0:
+        return
+
+    case_id = None
+    configuration = None
+    mach = altitude = np.nan
+    expecting_conditions = False
+    columns = None  # 目前正在讀取的係數表表頭
+    rows: List[List[float]] = []
+
+    def finish_table():
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), len(columns))
+        table = CoefficientTable(
+            alpha=data[:, 0].copy(),
+            columns={name: data[:, i].copy() for i, (name, _) in enumerate(columns) if i > 0},
+        )
+        return (case_id, configuration, float(mach), float(altitude)), table
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for raw in iter(mm.readline, b""):
+            if columns is not None:
+                line = _strip_carriage_control(raw.decode("ascii", "replace").rstrip("\r\n"))
+                if not line.strip():
+                    continue
+                if _numeric_tokens(line) is not None:
+                    rows.append(_assign_row(line, columns))
+                    continue
+                # 表格結束
+                if rows:
+                    yield finish_table()
+                columns, rows = None, []
+
+            # 只對含有標記的行做解碼
+            if b"CASEID" in raw:
+                text = raw.decode("ascii", "replace").strip()
+                if text.upper().startswith("CASEID"):
+                    case_id = text[len("CASEID"):].strip() or None
+                    configuration = None
+            elif b"CONFIGURATION" in raw or b" ALONE" in raw:
+                configuration = " ".join(raw.decode("ascii", "replace").split())
+            elif b"MACH" in raw and b"ALTITUDE" in raw:
+                expecting_conditions = True
+            elif expecting_conditions:
+                values = _numeric_tokens(_strip_carriage_control(raw.decode("ascii", "replace")))
+                if values is not None and len(values) >= 2:
+                    mach, altitude = values[0], values[1]
+                    expecting_conditions = False
+            elif b"ALPHA" in raw:
+                line = _strip_carriage_control(raw.decode("ascii", "replace").rstrip("\r\n"))
+                header = _header_columns(line)
+                if len(header) > 1 and header[0][0] == "ALPHA":
+                    columns, rows = header, []
+
+        if columns is not None and rows:
+            yield finish_table()
+
+
+class For006Results:
+    """
+    for006.dat 中所有係數表，依 (case_id, configuration, mach, altitude) 索引
+
+    同一條件但攻角不同、無法合併的表放在 unmerged（依讀取順序），get / summary 也會列出
+    """
+
+    def __init__(
+        self,
+        tables: Dict[TableKey, CoefficientTable],
+        unmerged: Optional[List[Tuple[TableKey, CoefficientTable]]] = None,
+    ):
+        self.tables = tables
+        self.unmerged = unmerged or []
+
+    def _items(self) -> List[Tuple[TableKey, CoefficientTable]]:
+        return [*self.tables.items(), *self.unmerged]
+
+    def get(
+        self,
+        case_id: Optional[str],
+        mach: float,
+        altitude: float,
+        configuration: Optional[str] = None,
+    ) -> CoefficientTable:
+        """取得指定條件的係數表；未指定 configuration 時取該 case 最後一個（完整構型）"""
+        matches = [
+            table for (c, config, m, alt), table in self._items()
+            if c == case_id and np.isclose(m, mach) and np.isclose(alt, altitude)
+            and (configuration is None or config == configuration)
+        ]
+        if not matches:
+            raise KeyError((case_id, configuration, mach, altitude))
+        return matches[-1]
+
+    def summary(self, case_id: Optional[str] = None) -> List[dict]:
+        """每張表的簡短描述（可放進 state）"""
+        return [
+            {
+                "case_id": c,
+                "configuration": config,
+                "mach": m,
+                "altitude": alt,
+                "n_alpha": int(table.alpha.size),
+                "columns": list(table.columns),
+            }
+            for (c, config, m, alt), table in self._items()
+            if case_id is None or c == case_id
+        ]
+
+
+def read_for006(path: str) -> For006Results:
+    """讀取整個 for006.dat（同一條件、相同攻角的多張表會合併欄位）"""
+    tables: Dict[TableKey, CoefficientTable] = {}
+    unmerged: List[Tuple[TableKey, CoefficientTable]] = []
+    for key, table in iter_coefficient_tables(path):
+        if key not in tables:
+            tables[key] = table
+        elif not tables[key].merge(table):
+            unmerged.append((key, table))
+    return For006Results(tables, unmerged)
+
+
+def find_for006(latest_datcom: dict) -> Optional[str]:
+    """DATCOM 在 for005.dat 所在目錄執行時，for006.dat 會在同一目錄"""
+    path = os.path.join(os.path.dirname(latest_datcom["output_path"]), "for006.dat")
+    return path if os.path.exists(path) else None
+
+
+def attach_results(latest_datcom: dict, path: Optional[str] = None) -> dict:
+    """
+    將 for006.dat 的係數表摘要加入 latest_datcom（回傳新的 dict）
+
+    只列出與 latest_datcom["case_id"] 相同 case 的表；陣列本身不放進 state，
+    需要時再以 read_for006(results["for006_path"]) 讀取。
+    """
+    path = path or find_for006(latest_datcom)
+    if path is None:
+        return latest_datcom
+    results = read_for006(path)
+    return {
+        **latest_datcom,
+        "results": {
+            "for006_path": path,
+            "tables": results.summary(case_id=latest_datcom.get("case_id")),
+        },
+    }
@@ -0,0 +1,127 @@
+"""
+Per-session output storage for generated DATCOM files
+每個對話（conversation_id）與每個設定（case hash）都有自己的輸出目錄，
+檔案一律先寫入暫存檔再以 atomic rename 取代，並定期清除過期的輸出。
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional
+
+DEFAULT_OUTPUT_ROOT = os.path.join(os.path.dirname(__file__), "output", "sessions")
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 3600
+# 兩次垃圾回收之間的最短間隔，避免每次寫檔都掃描整個輸出目錄
+GC_INTERVAL_SECONDS = 600
+
+ANONYMOUS_SESSION = "anonymous"
+
+_gc_lock = threading.Lock()
+_last_gc = 0.0
+
+# mkstemp 建立的檔案權限是 0600；取代目標前改回 open(..., "w") 依 umask 的預設權限
+# （DATCOM 或 web server 可能以其他使用者讀取輸出）。umask 只能以設定的方式讀取，在 import 時讀一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path: str, data: bytes):
+    """寫入暫存檔後以 os.replace 取代目標檔案，讀取端不會看到寫到一半的內容"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_text(path: str, text: str):
+    atomic_write(path, text.encode("utf-8"))
+
+
+def get_output_root() -> str:
+    return os.getenv("DATCOM_OUTPUT_DIR", DEFAULT_OUTPUT_ROOT)
+
+
+def _safe_component(value: str) -> str:
+    """
+    將 conversation_id 轉成安全的目錄名稱；替換字元與截斷可能讓不同的 ID 得到相同的名稱，
+    因此加上原始 ID 的短 hash
+    """
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:8]
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", value).strip(".")[:64] or ANONYMOUS_SESSION
+    return f"{name}-{digest}"
+
+
+def session_output_path(
+    conversation_id: Optional[str],
+    case_key: str,
+    filename: str = "for005.dat",
+    root: Optional[str] = None,
+) -> str:
+    """
+    取得（並建立）某個 session / case 專屬的輸出路徑：
+    <root>/<conversation_id>/<case hash 前 16 碼>/<filename>
+
+    沒有 conversation_id 時歸到 "anonymous" session。
+    """
+    root = root or get_output_root()
+    session_dir = os.path.join(root, _safe_component(conversation_id or ANONYMOUS_SESSION))
+    case_dir = os.path.join(session_dir, case_key[:16])
+    os.makedirs(case_dir, exist_ok=True)
+    # 更新 session 目錄的 mtime，讓仍在使用中的 session 不會被清除
+    os.utime(session_dir)
+    return os.path.join(case_dir, filename)
+
+
+def collect_garbage(
+    root: Optional[str] = None,
+    retention_seconds: Optional[float] = None,
+    now: Optional[float] = None,
+) -> int:
+    """
+    刪除超過保留時間未使用的 session 目錄
+
+    Returns:
+        刪除的 session 數量
+    """
+    root = root or get_output_root()
+    if retention_seconds is None:
+        retention_seconds = float(os.getenv("DATCOM_OUTPUT_RETENTION_SECONDS", DEFAULT_RETENTION_SECONDS))
+    now = time.time() if now is None else now
+
+    if not os.path.isdir(root):
+        return 0
+
+    removed = 0
+    for name in os.listdir(root):
+        session_dir = os.path.join(root, name)
+        try:
+            if not os.path.isdir(session_dir):
+                continue
+            if now - os.stat(session_dir).st_mtime <= retention_seconds:
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(session_dir, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def maybe_collect_garbage(root: Optional[str] = None) -> int:
+    """距離上次清除超過 GC_INTERVAL_SECONDS 時才執行 collect_garbage"""
+    global _last_gc
+    now = time.time()
+    with _gc_lock:
+        if now - _last_gc < GC_INTERVAL_SECONDS:
+            return 0
+        _last_gc = now
+    return collect_garbage(root=root, now=now)
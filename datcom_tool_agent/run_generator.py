@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
+import io
+import logging
 import os
-from pydantic import ValidationError
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, get_args, get_origin
+import numpy as np
+from pydantic import BaseModel, ValidationError
 
 # 從 data_model.py 匯入我們定義好的資料模型
 from datcom_tool_agent.data_model import (
     DatcomInput, FLTCON, SYNTHS, BODY,
     WGPLNF, HTPLNF, VTPLNF
 )
+from datcom_tool_agent.output_store import atomic_write_text
+
+logger = logging.getLogger(__name__)
 
 # ==============================================================================
 # DATCOM 檔案生成器
@@ -20,6 +29,8 @@ def _format_value_for_datcom(value):
     - 整數 → 一位小數 (例如 6 → 6.0)
     - 浮點數 → 最多四位小數，去除尾部零 (例如 0.5489 → 0.5489, 10000.0 → 10000.0)
     """
+    if isinstance(value, np.ndarray):
+        return _format_array_for_datcom(value)
     if isinstance(value, list):
         # 列表中的每個數字都轉換為浮點數格式
         formatted_items = []
@@ -46,53 +57,352 @@ def _format_single_number(num):
             formatted += '.0'
         return formatted
 
+
+# 向量化格式化只在這個範圍內使用整數運算；超出範圍（或非有限值）改走 _format_single_number
+_VECTOR_INT_LIMIT = 2.0 ** 53
+_VECTOR_FRACTION_LIMIT = 1e9
+_UNIT_POWERS = 10 ** np.arange(1, 16, dtype=np.int64)  # 2**53 < 10**16
+
+# 0000-9999 的四位 ASCII 數字表，以及去除尾部零後的小數位數（0 → "0" 仍保留一位）
+_DIGIT_TABLE = np.array([list(f"{i:04d}".encode("ascii")) for i in range(10000)], dtype=np.uint8)
+_DECIMAL_LENGTH = np.array([max(len(f"{i:04d}".rstrip("0")), 1) for i in range(10000)], dtype=np.int64)
+
+
+def _format_array_for_datcom(values, separator: str = ",") -> str:
+    """向量化版本的 _format_value_for_datcom（list 分支），適用於整個 NumPy 陣列
+
+    輸出與逐一呼叫 _format_single_number 再以逗號連接完全相同。
+
+    做法：
+    - 整數值 → 整數位數字 + ".0"
+    - 非整數 → 以 x * 10^4 四捨五入成整數，拆成整數部分與四位小數並去除尾部零
+    - 每個數字展開成固定寬度的 ASCII 字元列 [符號][整數位][.][小數位][分隔符]
+      （以四位一組查表），再用遮罩挑出有效字元後一次轉成字串
+    - x * 10^4 的浮點誤差可能在 .5 附近改變捨入方向；這些值（以及非有限值、
+      超出範圍的大數）退回 _format_single_number 後再拼接
+    """
+    x = np.asarray(values, dtype=np.float64).ravel()
+    n = x.size
+    if n == 0:
+        return ""
+
+    finite = np.isfinite(x)
+    magnitude = np.abs(np.where(finite, x, 0.0))
+
+    is_integer = finite & (x == np.trunc(x)) & (magnitude < _VECTOR_INT_LIMIT)
+    is_fraction = finite & ~is_integer & (magnitude < _VECTOR_FRACTION_LIMIT)
+
+    # 非整數：四位小數四捨五入（排除可能受乘法誤差影響的 .5 附近值）
+    scaled = np.where(is_fraction, magnitude * 10000.0, 0.0)
+    rounded = np.rint(scaled)
+    is_fraction &= np.abs(scaled - np.floor(scaled) - 0.5) > 1e-9 + scaled * 4.5e-16
+    vectorized = is_integer | is_fraction
+
+    # rounded < 10^13，浮點除法與相減皆為精確值
+    fraction_units = np.floor(rounded / 10000.0)
+    units = np.where(is_integer, magnitude, np.where(is_fraction, fraction_units, 0.0)).astype(np.int64)
+    decimals = np.where(is_fraction, rounded - fraction_units * 10000.0, 0.0).astype(np.intp)
+
+    unit_digits = np.searchsorted(_UNIT_POWERS, units, side="right") + 1
+    groups = (int(unit_digits.max()) + 3) // 4
+    width = groups * 4
+
+    # 固定寬度字元矩陣：[符號] + 整數位（四位一組） + [.] + 4 小數位 + [分隔符]
+    chars = np.empty((n, width + 7), dtype=np.uint8)
+    chars[:, 0] = ord("-")
+    remaining = units
+    for group in range(groups - 1, -1, -1):
+        remaining, group_value = np.divmod(remaining, 10000) if group else (None, remaining)
+        chars[:, 1 + group * 4:5 + group * 4] = _DIGIT_TABLE[group_value]
+    chars[:, width + 1] = ord(".")
+    chars[:, width + 2:width + 6] = _DIGIT_TABLE[decimals]
+    chars[:, width + 6] = ord(separator)
+
+    valid = np.empty(chars.shape, dtype=bool)
+    valid[:, 0] = np.signbit(x) & vectorized
+    valid[:, 1:width + 1] = (np.arange(width, 0, -1) <= unit_digits[:, None]) & vectorized[:, None]
+    valid[:, width + 1] = vectorized
+    valid[:, width + 2:width + 6] = (np.arange(4) < _DECIMAL_LENGTH[decimals][:, None]) & vectorized[:, None]
+    valid[:, width + 6] = True
+    valid[-1, width + 6] = False
+
+    text = chars[valid].tobytes().decode("ascii")
+
+    fallback = np.flatnonzero(~vectorized)
+    if fallback.size == 0:
+        return text
+
+    # 將退回逐一格式化的數字插回對應位置
+    row_lengths = valid.sum(axis=1)
+    offsets = (np.cumsum(row_lengths) - row_lengths)[fallback].tolist()
+    pieces = []
+    previous = 0
+    for index, offset in zip(fallback.tolist(), offsets):
+        pieces.append(text[previous:offset])
+        pieces.append(_format_single_number(float(x[index])))
+        previous = offset
+    pieces.append(text[previous:])
+    return "".join(pieces)
+
+
+def _format_number_list(values) -> str:
+    """List 欄位：逐一格式化後以逗號連接（與 _format_value_for_datcom 的 list 分支相同）"""
+    return ",".join(
+        _format_single_number(item) if isinstance(item, (int, float)) else str(item)
+        for item in values
+    )
+
+
+def _resolve_formatter(annotation):
+    """依欄位型別選擇格式化函式；無法判斷時使用通用的 _format_value_for_datcom"""
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        return _format_number_list
+    if annotation is np.ndarray:
+        return _format_array_for_datcom
+    if annotation in (int, float) or (
+        origin is Literal and all(isinstance(arg, (int, float)) for arg in get_args(annotation))
+    ):
+        return _format_value_for_datcom
+    if annotation is str:
+        return str
+    return _format_value_for_datcom
+
+
+class _NamelistPlan:
+    """一個 Namelist 卡片的寫入計畫
+
+    欄位順序、大寫的 key、各欄位的格式化函式以及排除的欄位在建立時解析一次，
+    之後每次產生只需依序讀取屬性並格式化，不再經過 model_dump。
+    """
+
+    __slots__ = ("header", "fields")
+
+    def __init__(self, model_class, namelist_name: str, exclude_fields: frozenset):
+        self.header = f"${namelist_name} "
+        self.fields = tuple(
+            (name, f"{name.upper()}=", _resolve_formatter(field.annotation))
+            for name, field in model_class.model_fields.items()
+            if name not in exclude_fields
+        )
+
+    def render(self, model) -> str:
+        """格式化成單行：$NAMELIST key1=val1,key2=val2,...,keyN=valN$"""
+        pairs = []
+        for name, key, formatter in self.fields:
+            value = getattr(model, name)
+            if value is None:
+                continue
+            pairs.append(key + formatter(value))
+        if not pairs:
+            return ""
+        return self.header + ",".join(pairs) + "$\n"
+
+
+_PLAN_CACHE = {}
+
+
+def _get_namelist_plan(model_class, namelist_name: str, exclude_fields: frozenset = frozenset()) -> _NamelistPlan:
+    """取得（必要時建立）model class 對應的寫入計畫"""
+    key = (model_class, namelist_name, exclude_fields)
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = _PLAN_CACHE[key] = _NamelistPlan(model_class, namelist_name, exclude_fields)
+    return plan
+
+
+# 卡片寫入順序：(DatcomInput 屬性, Namelist 名稱, 翼型欄位, 翼型卡片前綴)
+# 翼型卡片需在對應的 Planform 卡片之前
+_DECK_BLOCKS = (
+    ("flight_conditions", "FLTCON", None, None),
+    ("synthesis", "SYNTHS", None, None),
+    ("body", "BODY", None, None),
+    ("wing_planform", "WGPLNF", "NACA_W", "NACA-W-"),
+    ("horizontal_tail_planform", "HTPLNF", "NACA_H", "NACA-H-"),
+    ("vertical_tail_planform", "VTPLNF", "NACA_V", "NACA-V-"),
+)
+
+
 class DatcomGenerator:
     """接收一個 DatcomInput 物件，並產生格式化的 for005.dat 檔案"""
 
     def _write_namelist(self, file_handle, model, namelist_name: str, exclude_fields: set = None):
         """寫入一個標準的 NAMELIST 區塊（單行格式）"""
-        if exclude_fields is None:
-            exclude_fields = set()
+        plan = _get_namelist_plan(type(model), namelist_name, frozenset(exclude_fields or ()))
+        file_handle.write(plan.render(model))
 
-        # 將 Pydantic 模型轉換為字典，並排除不需要的欄位
-        data = model.model_dump(exclude=exclude_fields, exclude_none=True)
-        if not data:
-            return
+    def _render_blocks(self, datcom_input: DatcomInput) -> List[str]:
+        """將每個 Namelist 區塊（含對應的翼型卡片）分別格式化成文字
 
-        # 建立 key=value 對的列表
-        pairs = []
-        for key, value in data.items():
-            pairs.append(f"{key.upper()}={_format_value_for_datcom(value)}")
+        區塊順序即寫入順序；multi-case 寫檔時以區塊為單位比較差異。
+        """
+        blocks = []
+        for attribute, namelist_name, naca_field, naca_prefix in _DECK_BLOCKS:
+            model = getattr(datcom_input, attribute)
+            if naca_field is None:
+                blocks.append(_get_namelist_plan(type(model), namelist_name).render(model))
+            else:
+                plan = _get_namelist_plan(type(model), namelist_name, frozenset((naca_field,)))
+                blocks.append(f"{naca_prefix}{getattr(model, naca_field)}\n" + plan.render(model))
+        return blocks
+
+    def render(self, datcom_input: DatcomInput, case_id: str) -> str:
+        """將一個完整的 case 格式化成 for005.dat 文字（含 CASEID 與結尾指令），不寫檔"""
+        return f"CASEID {case_id}\n" + "".join(self._render_blocks(datcom_input)) + "DAMP\nBUILD\n"
+
+    def render_bytes(self, datcom_input: DatcomInput, case_id: str, encoding: str = "utf-8") -> bytes:
+        """與 render 相同，但回傳編碼後的 bytes"""
+        return self.render(datcom_input, case_id).encode(encoding)
+
+    def render_multi_case(
+        self,
+        datcom_inputs: Sequence[DatcomInput],
+        case_ids: Optional[Sequence[str]] = None,
+    ) -> str:
+        """將多個 case 格式化成一份 for005.dat 文字
 
-        # 組合成單行：$NAMELIST key1=val1,key2=val2,...,keyN=valN$
-        namelist_line = f"${namelist_name} {','.join(pairs)}$\n"
-        file_handle.write(namelist_line)
+        第一個 case 寫入完整的卡片；之後每個 case 只寫入與前一個 case
+        不同的 Namelist 區塊，未變更的卡片由 SAVE 帶到下一個 case。
+        各 case 之間以 NEXT CASE 分隔。
+
+        Args:
+            datcom_inputs: 依序排列的 DatcomInput 物件
+            case_ids: 每個 case 的 CASEID（預設為 CASE 1, CASE 2, ...）
+        """
+        if not datcom_inputs:
+            raise ValueError("datcom_inputs must contain at least one case")
+        if case_ids is None:
+            case_ids = [f"CASE {i + 1}" for i in range(len(datcom_inputs))]
+        if len(case_ids) != len(datcom_inputs):
+            raise ValueError(
+                f"The number of case ids ({len(case_ids)}) "
+                f"must match the number of cases ({len(datcom_inputs)})"
+            )
+
+        parts = []
+        previous_blocks = None
+        last_index = len(datcom_inputs) - 1
+        for index, (datcom_input, case_id) in enumerate(zip(datcom_inputs, case_ids)):
+            blocks = self._render_blocks(datcom_input)
+            parts.append(f"CASEID {case_id}\n")
+            if previous_blocks is None:
+                parts.extend(blocks)
+            else:
+                # 只寫入與前一個 case 不同的區塊
+                parts.extend(
+                    block for block, previous in zip(blocks, previous_blocks)
+                    if block != previous
+                )
+            previous_blocks = blocks
+
+            parts.append("DAMP\nBUILD\n")
+            if index < last_index:
+                parts.append("SAVE\nNEXT CASE\n")
+
+        return "".join(parts)
+
+    def write_to(self, stream, datcom_input: DatcomInput, case_id: str, encoding: str = "utf-8"):
+        """將 deck 以單次 write 寫入任意 file-like 物件（文字或二進位串流皆可）"""
+        text = self.render(datcom_input, case_id)
+        if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(stream, "mode", ""):
+            stream.write(text.encode(encoding))
+        else:
+            stream.write(text)
 
     def generate_file(self, datcom_input: DatcomInput, case_id: str, filename: str = "for005.dat"):
-        """產生完整的 for005.dat 檔案"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"CASEID {case_id}\n")
+        """產生完整的 for005.dat 檔案（寫入暫存檔後以 atomic rename 取代）"""
+        atomic_write_text(filename, self.render(datcom_input, case_id))
+        logger.info("DATCOM file '%s' generated", filename)
+
+    def generate_multi_case_file(
+        self,
+        datcom_inputs: Sequence[DatcomInput],
+        case_ids: Optional[Sequence[str]] = None,
+        filename: str = "for005.dat",
+    ):
+        """產生包含多個 case 的 for005.dat 檔案（格式見 render_multi_case）"""
+        atomic_write_text(filename, self.render_multi_case(datcom_inputs, case_ids))
+        logger.info("DATCOM file '%s' generated (%d cases)", filename, len(datcom_inputs))
+
+    def generate_batch(
+        self,
+        jobs: Iterable[Tuple[DatcomInput, str, str]],
+        max_workers: Optional[int] = None,
+        chunk_size: int = 64,
+    ) -> Iterator["BatchResult"]:
+        """平行產生多個 for005.dat 檔案
+
+        Args:
+            jobs: (DatcomInput, case_id, path) 的 iterable，會以 lazy 方式逐批讀取
+            max_workers: process pool 大小（預設為 CPU 數量）
+            chunk_size: 每個 worker 任務處理的 case 數量
+
+        Yields:
+            每個 case 完成時回傳一個 BatchResult（依完成順序，而非輸入順序）。
+            單一 case 失敗只會反映在其 BatchResult.error，不會中斷整個批次。
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1 (got {chunk_size})")
+
+        jobs = iter(jobs)
+        max_workers = max_workers or os.cpu_count() or 1
+        # 同時在途的 chunk 數量有上限，讓記憶體用量維持固定
+        max_in_flight = max_workers * 2
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+
+            def submit_next() -> bool:
+                chunk = list(islice(jobs, chunk_size))
+                if not chunk:
+                    return False
+                pending[executor.submit(_generate_batch_chunk, chunk)] = chunk
+                return True
+
+            while len(pending) < max_in_flight and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # worker 本身失敗（例如無法 pickle），整個 chunk 標記為失敗
+                        error = f"{type(e).__name__}: {e}"
+                        results = [
+                            BatchResult(case_id=case_id, path=path, error=error)
+                            for _, case_id, path in chunk
+                        ]
+                    yield from results
 
-            # 依序寫入各個 Namelist 區塊
-            self._write_namelist(f, datcom_input.flight_conditions, "FLTCON")
-            self._write_namelist(f, datcom_input.synthesis, "SYNTHS")
-            self._write_namelist(f, datcom_input.body, "BODY")
+                while len(pending) < max_in_flight and submit_next():
+                    pass
 
-            # 處理翼型卡片 (需在對應的 Planform 卡片之前)
-            f.write(f"NACA-W-{datcom_input.wing_planform.NACA_W}\n")
-            self._write_namelist(f, datcom_input.wing_planform, "WGPLNF", exclude_fields={'NACA_W'})
 
-            f.write(f"NACA-H-{datcom_input.horizontal_tail_planform.NACA_H}\n")
-            self._write_namelist(f, datcom_input.horizontal_tail_planform, "HTPLNF", exclude_fields={'NACA_H'})
+class BatchResult(BaseModel):
+    """批次產生中單一 case 的結果"""
+    case_id: str
+    path: str
+    error: Optional[str] = None
 
-            f.write(f"NACA-V-{datcom_input.vertical_tail_planform.NACA_V}\n")
-            self._write_namelist(f, datcom_input.vertical_tail_planform, "VTPLNF", exclude_fields={'NACA_V'})
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
-            # 寫入結尾的指令
-            f.write("DAMP\n")
-            f.write("BUILD\n")
 
-        print(f"✅ DATCOM 檔案 '{filename}' 已成功產生在 '{os.getcwd()}' 目錄下！")
+def _generate_batch_chunk(chunk: List[Tuple[DatcomInput, str, str]]) -> List[BatchResult]:
+    """在 worker process 中產生一個 chunk 的檔案，逐 case 捕捉錯誤"""
+    generator = DatcomGenerator()
+    results = []
+    for datcom_input, case_id, path in chunk:
+        try:
+            atomic_write_text(path, generator.render(datcom_input, case_id))
+            results.append(BatchResult(case_id=case_id, path=path))
+        except Exception as e:
+            results.append(BatchResult(case_id=case_id, path=path, error=f"{type(e).__name__}: {e}"))
+    return results
 
 
 # ==============================================================================
@@ -166,6 +476,7 @@ if __name__ == "__main__":
             case_id="PC-9",
             filename="for005.dat"
         )
+        print(f"✅ DATCOM 檔案 'for005.dat' 已成功產生在 '{os.getcwd()}' 目錄下！")
 
     except ValidationError as e:
         print("❌ 資料驗證失敗！請檢查您的輸入參數。")
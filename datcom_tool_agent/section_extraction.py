@@ -0,0 +1,233 @@
+"""
+Section-parallel LLM extraction for long specification documents
+長文件一次抽取全部參數時，LLM 要讀完整份文件並一次輸出所有卡片，延遲隨文件長度增加。
+這裡依章節標題把文件切成各卡片相關的區段（飛行條件、合成參數、機身站位、主翼、
+水平尾翼、垂直尾翼），每張卡片以一次較小的 structured output 呼叫同時抽取，
+最後合併成一個 DatcomInput 驗證。
+
+驗證失敗時（例如 len(ALSCHD) != NALPHA、BODY 清單長度與 NX 不符），
+repair_cards 保留通過驗證的卡片，只針對失敗的卡片附上 Pydantic 錯誤重新抽取。
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field, ValidationError
+
+from datcom_tool_agent.data_model import DatcomInput
+from datcom_tool_agent.extraction import section_of
+from datcom_tool_agent.tool_schema import build_datcom_input, card_errors, card_tool_schema
+
+# file_content 至少這麼長時才改用分段抽取（短文件一次呼叫即可）
+DEFAULT_MIN_CHARS = 6000
+
+_CARD_PROMPT = (
+    "Extract the DATCOM {card} card from the text below. Use only values stated in the text. "
+    "List fields are JSON number arrays; do not provide counts."
+)
+
+
+def section_extraction_min_chars() -> int:
+    return int(os.getenv("DATCOM_SECTION_EXTRACTION_MIN_CHARS", DEFAULT_MIN_CHARS))
+
+
+class SectionExtraction(BaseModel):
+    """分段抽取的結果"""
+    cards: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    failed: List[str] = Field(default_factory=list, description="LLM 呼叫失敗或輸出無法解析的卡片")
+    token_usage: Dict[str, int] = Field(default_factory=lambda: {"prompt_tokens": 0, "completion_tokens": 0})
+    error: Optional[str] = None
+    datcom_input: Optional[DatcomInput] = None
+
+
+def split_sections(content: str) -> Dict[str, str]:
+    """
+    將文件切成每張卡片的區段
+
+    第一個章節標題之前的內容（通常是機型說明）會加在每個區段前面；
+    找不到標題的卡片使用整份文件。
+    """
+    preamble: List[str] = []
+    regions: Dict[str, List[str]] = {}
+    current = None
+    for line in content.splitlines():
+        heading = section_of(line)
+        if heading is not None:
+            current = regions.setdefault(heading, [])
+        if current is None:
+            preamble.append(line)
+        else:
+            current.append(line)
+
+    sections = {}
+    for attribute in DatcomInput.model_fields:
+        if attribute in regions:
+            sections[attribute] = "\n".join(preamble + regions[attribute]).strip()
+        else:
+            sections[attribute] = content
+    return sections
+
+
+def _call_cards(model, prompts: Dict[str, List], max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    每張卡片一次 structured output 呼叫，同時進行
+
+    Returns:
+        {DatcomInput 屬性: with_structured_output(include_raw=True) 的輸出或呼叫時的例外}
+    """
+    def call(attribute: str):
+        structured = model.with_structured_output(
+            card_tool_schema(attribute), method="function_calling", include_raw=True
+        )
+        return structured.invoke(prompts[attribute])
+
+    outputs = {}
+    if not prompts:
+        return outputs
+    with ThreadPoolExecutor(max_workers=max_workers or len(prompts)) as executor:
+        futures = {attribute: executor.submit(call, attribute) for attribute in prompts}
+        for attribute, future in futures.items():
+            try:
+                outputs[attribute] = future.result()
+            except Exception as e:
+                outputs[attribute] = e
+    return outputs
+
+
+def _collect(outputs: Dict[str, Any], cards: Dict[str, Dict[str, Any]], token_usage: Dict[str, int]) -> Dict[str, str]:
+    """把成功的輸出寫入 cards、累加 token 用量，回傳失敗的卡片及原因"""
+    failures = {}
+    for attribute, output in outputs.items():
+        if isinstance(output, Exception):
+            failures[attribute] = f"{type(output).__name__}: {output}"
+            continue
+        usage = getattr(output.get("raw"), "usage_metadata", None) or {}
+        token_usage["prompt_tokens"] += usage.get("input_tokens", 0)
+        token_usage["completion_tokens"] += usage.get("output_tokens", 0)
+        if not isinstance(output.get("parsed"), dict):
+            failures[attribute] = f"could not parse output: {output.get('parsing_error')}"
+            continue
+        cards[attribute] = output["parsed"]
+    return failures
+
+
+def extract_by_sections(
+    model,
+    content: str,
+    known_cards: Optional[Dict[str, Dict[str, Any]]] = None,
+    max_workers: Optional[int] = None,
+) -> SectionExtraction:
+    """
+    每張卡片一個同時進行的 LLM 呼叫，合併後驗證成 DatcomInput
+
+    驗證失敗的卡片以 repair_cards 單獨重新抽取（其他卡片保留）。
+
+    Args:
+        model: 支援 with_structured_output 的 chat model
+        known_cards: 已確定的卡片（例如確定性抽取已完整的卡片），不再呼叫 LLM
+
+    Returns:
+        SectionExtraction；datcom_input 為 None 時 failed / error 說明原因
+    """
+    result = SectionExtraction(cards=dict(known_cards or {}))
+    sections = split_sections(content)
+    prompts = {
+        attribute: [
+            SystemMessage(content=_CARD_PROMPT.format(card=attribute)),
+            HumanMessage(content=sections[attribute]),
+        ]
+        for attribute in DatcomInput.model_fields if attribute not in result.cards
+    }
+    failures = _collect(_call_cards(model, prompts, max_workers), result.cards, result.token_usage)
+    result.failed = list(failures)
+    if failures:
+        result.error = "; ".join(f"{attribute}: {reason}" for attribute, reason in failures.items())
+        return result
+
+    repair = repair_cards(model, result.cards, source=content, max_workers=max_workers)
+    result.cards = repair.cards
+    for name, count in repair.token_usage.items():
+        result.token_usage[name] += count
+    result.datcom_input = repair.datcom_input
+    if repair.errors:
+        result.failed = [attribute for attribute in repair.errors if attribute in DatcomInput.model_fields]
+        result.error = "; ".join(f"{attribute}: {error}" for attribute, error in repair.errors.items())
+    return result
+
+
+# ----------------------------------------------------------------------
+# Card-scoped repair
+# ----------------------------------------------------------------------
+DEFAULT_MAX_REPAIR_RETRIES = 2
+
+_REPAIR_PROMPT = (
+    "The DATCOM {card} card below failed validation. Return the corrected {card} card, "
+    "using the source text when it is given. Change only what the error requires; "
+    "list fields are JSON number arrays and counts are taken from their lengths.\n\n"
+    "Validation error:\n{error}\n\nPrevious values:\n{values}"
+)
+
+
+def repair_max_retries() -> int:
+    return int(os.getenv("DATCOM_REPAIR_MAX_RETRIES", DEFAULT_MAX_REPAIR_RETRIES))
+
+
+class RepairResult(BaseModel):
+    """卡片修復的結果"""
+    cards: Dict[str, Dict[str, Any]]
+    attempts: int = 0
+    repaired: List[str] = Field(default_factory=list, description="經過重新抽取而通過驗證的卡片")
+    errors: Dict[str, str] = Field(default_factory=dict, description="仍未通過驗證的卡片及 Pydantic 錯誤")
+    failures: Dict[str, str] = Field(
+        default_factory=dict, description="最後一輪修復中 LLM 呼叫失敗（例外或無法解析輸出）的卡片及原因"
+    )
+    token_usage: Dict[str, int] = Field(default_factory=lambda: {"prompt_tokens": 0, "completion_tokens": 0})
+    datcom_input: Optional[DatcomInput] = None
+
+
+def repair_cards(
+    model,
+    cards: Dict[str, Dict[str, Any]],
+    source: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> RepairResult:
+    """
+    只重新抽取驗證失敗的卡片
+
+    通過驗證的卡片保持不變；每張失敗的卡片各自以一次小的 structured output 呼叫修正，
+    prompt 附上該卡片的 Pydantic 錯誤、原本的值與來源文件中該卡片的區段。
+    最多重試 max_retries 輪（預設 DATCOM_REPAIR_MAX_RETRIES，2）。
+    """
+    max_retries = repair_max_retries() if max_retries is None else max_retries
+    result = RepairResult(cards=dict(cards))
+    sections = split_sections(source) if source else {}
+    errors = card_errors(result.cards)
+
+    while errors and result.attempts < max_retries:
+        result.attempts += 1
+        prompts = {
+            attribute: [
+                SystemMessage(content=_REPAIR_PROMPT.format(
+                    card=attribute,
+                    error=error,
+                    values=json.dumps(result.cards.get(attribute, {}), ensure_ascii=False, default=str),
+                )),
+                HumanMessage(content=sections.get(attribute) or "(no source text)"),
+            ]
+            for attribute, error in errors.items()
+        }
+        result.failures = _collect(_call_cards(model, prompts, max_workers), result.cards, result.token_usage)
+        remaining = card_errors(result.cards)
+        result.repaired.extend(attribute for attribute in errors if attribute not in remaining)
+        errors = remaining
+
+    result.errors = errors
+    if not errors:
+        try:
+            result.datcom_input = build_datcom_input(result.cards)
+        except ValidationError as e:
+            result.errors = {"datcom_input": str(e)}
+    return result
@@ -0,0 +1,168 @@
+"""
+Flight envelope sweep planner
+FLTCON 的 NALPHA / NMACH / NALT 上限為 20，超過時將攻角與飛行條件切成
+最少數量的合法 case，輸出成 multi-case deck 或多個 deck，並保留
+每個 case 在整個 envelope 中的索引，之後可將 for006.dat 的結果拼回完整網格。
+
+DATCOM 預設 LOOP=1：MACH(i) 與 ALT(i) 成對執行，因此每個 case 的
+NMACH 與 NALT 相等，一個飛行條件 = 一組 (Mach, altitude)。
+"""
+import math
+import os
+from itertools import product
+from typing import List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from datcom_tool_agent.data_model import DatcomInput, derive_trusted
+from datcom_tool_agent.output_reader import For006Results
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+# FLTCON 每個 case 的點數上限（NALPHA、NMACH、NALT 的 le=20）
+MAX_POINTS_PER_CASE = 20
+
+
+def _balanced_chunks(count: int, limit: int) -> List[np.ndarray]:
+    """將 0..count-1 切成最少數量、長度盡量平均且不超過 limit 的連續區段"""
+    return np.array_split(np.arange(count), max(1, math.ceil(count / limit)))
+
+
+class SweepCase(BaseModel):
+    """sweep 中的一個 DATCOM case 及其在 envelope 中的位置"""
+    case_id: str
+    datcom_input: DatcomInput
+    alpha_index: List[int] = Field(description="此 case 的 ALSCHD 在完整攻角表中的索引")
+    condition_index: List[int] = Field(description="此 case 的 (MACH, ALT) 在完整飛行條件表中的索引")
+
+
+class SweepPlan(BaseModel):
+    """切分後的 sweep；alpha × conditions 為完整的 envelope 網格"""
+    alpha: List[float]
+    mach: List[float] = Field(description="每個飛行條件的 Mach（與 altitude 成對）")
+    altitude: List[float] = Field(description="每個飛行條件的高度（與 mach 成對）")
+    grid_shape: Optional[List[int]] = Field(
+        None,
+        description="cartesian sweep 時為 [n_mach, n_altitude]，stitch 會把條件軸展開成這個形狀"
+    )
+    cases: List[SweepCase]
+
+    @property
+    def case_ids(self) -> List[str]:
+        return [case.case_id for case in self.cases]
+
+    def render(self, generator: Optional[DatcomGenerator] = None) -> str:
+        """所有 case 合成一個 multi-case deck（後續 case 只寫入變更的 FLTCON）"""
+        generator = generator or DatcomGenerator()
+        return generator.render_multi_case(
+            [case.datcom_input for case in self.cases], self.case_ids
+        )
+
+    def write_multi_case(self, filename: str, generator: Optional[DatcomGenerator] = None) -> str:
+        """寫出單一 multi-case for005.dat"""
+        generator = generator or DatcomGenerator()
+        generator.generate_multi_case_file(
+            [case.datcom_input for case in self.cases], self.case_ids, filename
+        )
+        return filename
+
+    def write_decks(self, directory: str, generator: Optional[DatcomGenerator] = None) -> List[str]:
+        """每個 case 各寫一個 <directory>/<i>/for005.dat，方便平行執行 DATCOM"""
+        generator = generator or DatcomGenerator()
+        paths = []
+        for i, case in enumerate(self.cases, 1):
+            case_dir = os.path.join(directory, f"{i:03d}")
+            os.makedirs(case_dir, exist_ok=True)
+            path = os.path.join(case_dir, "for005.dat")
+            generator.generate_file(case.datcom_input, case.case_id, path)
+            paths.append(path)
+        return paths
+
+    def stitch(self, results: For006Results, column: str) -> np.ndarray:
+        """
+        將各 case 的係數表拼回完整網格
+
+        Returns:
+            形狀 (n_alpha, n_conditions) 的陣列；cartesian sweep 為
+            (n_alpha, n_mach, n_altitude)。缺少的資料為 NaN。
+        """
+        grid = np.full((len(self.alpha), len(self.mach)), np.nan)
+        for case in self.cases:
+            for condition in case.condition_index:
+                try:
+                    table = results.get(case.case_id, self.mach[condition], self.altitude[condition])
+                except KeyError:
+                    continue
+                if column not in table.columns and column != "ALPHA":
+                    continue
+                grid[case.alpha_index, condition] = table[column][:len(case.alpha_index)]
+        if self.grid_shape is not None:
+            grid = grid.reshape(len(self.alpha), *self.grid_shape)
+        return grid
+
+
+def plan_sweep(
+    base: DatcomInput,
+    alpha: Sequence[float],
+    mach: Sequence[float],
+    altitude: Sequence[float],
+    cartesian: bool = False,
+    case_prefix: str = "SWEEP",
+    max_points: int = MAX_POINTS_PER_CASE,
+) -> SweepPlan:
+    """
+    將任意長度的攻角 / Mach / 高度表切成合法的 DATCOM case
+
+    Args:
+        base: 其他卡片（幾何、重量等）沿用的 DatcomInput
+        alpha: 攻角表
+        mach, altitude: cartesian=False 時成對（長度相同，或其中一個只有一個值）；
+            cartesian=True 時取兩者的所有組合
+        case_prefix: case_id 為 "<case_prefix> <編號>"
+        max_points: 每個 case 的 NALPHA / NMACH 上限
+
+    Returns:
+        SweepPlan，case 數量為 ceil(n_alpha / max_points) × ceil(n_conditions / max_points)
+    """
+    if not 1 <= max_points <= MAX_POINTS_PER_CASE:
+        raise ValueError(f"max_points must be between 1 and {MAX_POINTS_PER_CASE} (got {max_points})")
+    alpha = [float(a) for a in alpha]
+    mach = [float(m) for m in mach]
+    altitude = [float(h) for h in altitude]
+    if not alpha or not mach or not altitude:
+        raise ValueError("alpha, mach and altitude schedules must not be empty")
+
+    grid_shape = None
+    if cartesian:
+        grid_shape = [len(mach), len(altitude)]
+        mach, altitude = map(list, zip(*product(mach, altitude)))
+    elif len(mach) != len(altitude):
+        if len(altitude) == 1:
+            altitude = altitude * len(mach)
+        elif len(mach) == 1:
+            mach = mach * len(altitude)
+        else:
+            raise ValueError(
+                f"Paired sweep needs equal-length MACH ({len(mach)}) and ALT ({len(altitude)}); "
+                "use cartesian=True for all combinations"
+            )
+
+    cases = []
+    for alpha_chunk, condition_chunk in product(
+        _balanced_chunks(len(alpha), max_points),
+        _balanced_chunks(len(mach), max_points),
+    ):
+        # 每個 case 都在上限內，直接由已驗證的 base 衍生，不再逐一驗證
+        datcom_input = derive_trusted(base, flight_conditions={
+            "ALSCHD": [alpha[i] for i in alpha_chunk],
+            "MACH": [mach[i] for i in condition_chunk],
+            "ALT": [altitude[i] for i in condition_chunk],
+        })
+        cases.append(SweepCase(
+            case_id=f"{case_prefix} {len(cases) + 1}",
+            datcom_input=datcom_input,
+            alpha_index=alpha_chunk.tolist(),
+            condition_index=condition_chunk.tolist(),
+        ))
+
+    return SweepPlan(alpha=alpha, mach=mach, altitude=altitude, grid_shape=grid_shape, cases=cases)
@@ -0,0 +1,63 @@
+"""
+Benchmark: DatcomInput 二進位編碼 vs JSON
+比較 encode_datcom_input / decode_datcom_input 與 Pydantic JSON
+（model_dump_json / model_validate_json）的大小與速度，以及 deck 快取 key
+改用二進位編碼前後（排序 JSON + sha256）的計算時間
+"""
+import hashlib
+import json
+import time
+
+from datcom_tool_agent.codec import decode_datcom_input, encode_datcom_input
+from datcom_tool_agent.data_model import DatcomInput
+from datcom_tool_agent.deck_cache import datcom_input_key
+from datcom_tool_agent.test.conftest import make_pc9_input
+
+
+def _json_key(datcom_input: DatcomInput, case_id: str) -> str:
+    """先前的 deck 快取 key：排序後的 JSON 再取 sha256"""
+    payload = json.dumps(
+        {"version": 1, "case_id": case_id, "input": datcom_input.model_dump(mode="json")},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _best(function, n: int, repeat: int) -> float:
+    """回傳單次呼叫的最佳平均時間（微秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def run_benchmark(n: int = 20_000, repeat: int = 3):
+    datcom_input = make_pc9_input()
+    binary = encode_datcom_input(datcom_input)
+    json_text = datcom_input.model_dump_json().encode("utf-8")
+    assert decode_datcom_input(binary) == DatcomInput.model_validate_json(json_text) == datcom_input
+
+    print("=" * 80)
+    print(f"📊 Codec benchmark (PC-9 DatcomInput, {n:,} iterations, best of {repeat})")
+    print("=" * 80)
+    print(f"  Size   binary: {len(binary):5d} bytes   JSON: {len(json_text):5d} bytes"
+          f"   ({len(binary) / len(json_text):.0%})")
+
+    timings = {
+        "encode binary": _best(lambda: encode_datcom_input(datcom_input), n, repeat),
+        "encode JSON": _best(datcom_input.model_dump_json, n, repeat),
+        "decode binary": _best(lambda: decode_datcom_input(binary), n, repeat),
+        "decode JSON": _best(lambda: DatcomInput.model_validate_json(json_text), n, repeat),
+        "cache key JSON": _best(lambda: _json_key(datcom_input, "PC-9"), n, repeat),
+        "cache key binary": _best(lambda: datcom_input_key(datcom_input, "PC-9"), n, repeat),
+    }
+    for name, micros in timings.items():
+        print(f"  {name:<16}: {micros:6.2f} µs")
+
+
+if __name__ == "__main__":
+    run_benchmark()
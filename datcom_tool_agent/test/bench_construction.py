@@ -0,0 +1,87 @@
+"""
+Benchmark: DatcomInput 建構速度
+比較 100k 個變化（不同 XCG / 重量 / 攻角表）以四種方式建立的速度：
+逐一 DatcomInput(**data)、validate_many、validate_columns、derive_trusted
+
+批次路徑只驗證有變化的卡片（FLTCON、SYNTHS），其餘四張卡片沿用已驗證的實例。
+
+    python -m datcom_tool_agent.test.bench_construction [variants]
+"""
+import gc
+import sys
+import time
+
+import numpy as np
+
+from datcom_tool_agent.data_model import DatcomInput, derive_trusted, validate_columns, validate_many
+from datcom_tool_agent.test.conftest import make_pc9_input
+
+
+def run_benchmark(n: int = 100_000):
+    base = make_pc9_input()
+    rng = np.random.default_rng(0)
+    xcg = np.round(rng.uniform(10.5, 12.5, n), 4).tolist()
+    weight = np.round(rng.uniform(4500.0, 5500.0, n), 1).tolist()
+    alpha_start = rng.integers(-4, 4, n).tolist()
+    schedules = [[float(a + i) for i in range(6)] for a in alpha_start]
+
+    base_data = base.model_dump()
+
+    def as_dict(i):
+        # 沒有變化的卡片共用 base 的 dict（一般批次產生變化的寫法）
+        data = dict(base_data)
+        data["synthesis"] = {**base_data["synthesis"], "XCG": xcg[i]}
+        data["flight_conditions"] = {**base_data["flight_conditions"], "WT": weight[i], "ALSCHD": schedules[i]}
+        return data
+
+    items = [as_dict(i) for i in range(n)]
+
+    print("=" * 80)
+    print(f"📊 Construction benchmark ({n:,} DatcomInput variants)")
+    print("=" * 80)
+
+    timings = {}
+    # 與 timeit 相同，計時期間關閉 GC，避免 10^5 個存活物件觸發的 GC 掃描干擾結果
+    gc.collect()
+    gc.disable()
+
+    start = time.perf_counter()
+    per_object = [DatcomInput(**item) for item in items]
+    timings["DatcomInput(**data)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = validate_many(items)
+    timings["validate_many"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar = validate_columns(base, {
+        "synthesis.XCG": xcg,
+        "flight_conditions.WT": weight,
+        "flight_conditions.ALSCHD": schedules,
+    })
+    timings["validate_columns"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trusted = [
+        derive_trusted(
+            base,
+            synthesis={"XCG": xcg[i]},
+            flight_conditions={"WT": weight[i], "ALSCHD": schedules[i]},
+        )
+        for i in range(n)
+    ]
+    timings["derive_trusted"] = time.perf_counter() - start
+
+    gc.enable()
+
+    baseline = timings["DatcomInput(**data)"]
+    for name, seconds in timings.items():
+        print(f"  {name:<22}: {seconds:6.3f} s  {n / seconds:>10,.0f} /s  ({baseline / seconds:.1f}x)")
+
+    sample = range(0, n, max(1, n // 1000))
+    identical = all(per_object[i] == bulk[i] == columnar[i] == trusted[i] for i in sample)
+    print(f"  Identical   : {'✅' if identical else '❌'}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,45 @@
+"""
+Benchmark: 向量化數字格式化 vs 逐一格式化
+比較 _format_array_for_datcom 與 _format_single_number 在 10^6 個數值上的速度，
+並確認兩者輸出完全相同
+"""
+import time
+
+import numpy as np
+
+from datcom_tool_agent.run_generator import _format_array_for_datcom, _format_single_number
+
+
+def run_benchmark(n: int = 10 ** 6, repeat: int = 3):
+    rng = np.random.default_rng(0)
+    # 混合常見的 DATCOM 數值：攻角 / 馬赫數 / 高度 / 機身站位
+    values = np.concatenate([
+        np.round(rng.uniform(-10.0, 20.0, n // 4), 1),
+        np.round(rng.uniform(0.1, 3.0, n // 4), 4),
+        np.round(rng.uniform(0.0, 60000.0, n // 4), 0),
+        rng.uniform(-5.0, 40.0, n - 3 * (n // 4)),
+    ])
+
+    print("=" * 80)
+    print(f"📊 Formatting benchmark ({values.size:,} values, best of {repeat})")
+    print("=" * 80)
+
+    scalar_times, vector_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scalar_text = ",".join(_format_single_number(float(v)) for v in values)
+        scalar_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        vector_text = _format_array_for_datcom(values)
+        vector_times.append(time.perf_counter() - start)
+
+    scalar_best, vector_best = min(scalar_times), min(vector_times)
+    print(f"  Scalar path : {scalar_best:.3f} s")
+    print(f"  Vector path : {vector_best:.3f} s")
+    print(f"  Speed-up    : {scalar_best / vector_best:.1f}x")
+    print(f"  Identical   : {'✅' if scalar_text == vector_text else '❌'}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
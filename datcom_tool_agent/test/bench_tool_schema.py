@@ -0,0 +1,225 @@
+"""
+Benchmark: 巢狀 write_datcom_file schema vs 舊版 57 個平面參數
+比較每次呼叫的 prompt token（送給 LLM 的 tool schema）與 completion token
+（LLM 產生的 PC-9 tool call 參數）。
+
+有 tiktoken 且能載入 o200k_base 時計算實際 token，否則以 4 字元 ≈ 1 token 估算。
+"""
+import json
+
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from datcom_tool_agent.agent import write_datcom_file
+from datcom_tool_agent.test.conftest import make_pc9_input
+from datcom_tool_agent.test.test_tool_schema import PC9_ARGS
+from datcom_tool_agent.tool_schema import build_datcom_input
+
+
+# 舊版（agent 改用巢狀 schema 之前）的平面參數 tool，只用來計算 schema 的 token 數
+@tool
+def write_datcom_file_flat(
+    # Flight Conditions
+    nalpha: int,
+    alschd: str,  # comma-separated values
+    nmach: int,
+    mach: str,
+    nalt: int,
+    alt: str,
+    wt: float,
+    # Synthesis
+    xcg: float,
+    zcg: float,
+    xw: float,
+    zw: float,
+    aliw: float,
+    xh: float,
+    zh: float,
+    alih: float,
+    xv: float,
+    zv: float,
+    # Body
+    nx: int,
+    x_coords: str,
+    r_coords: str,
+    zu_coords: str,
+    zl_coords: str,
+    itype: int,
+    method: int,
+    # Wing Planform
+    wing_naca: str,
+    wing_chrdtp: float,
+    wing_sspn: float,
+    wing_sspne: float,
+    wing_chrdr: float,
+    wing_savsi: float,
+    wing_chstat: float,
+    wing_twista: float,
+    wing_dhdadi: float,
+    wing_type: int,
+    # Horizontal Tail
+    htail_naca: str,
+    htail_chrdtp: float,
+    htail_sspn: float,
+    htail_sspne: float,
+    htail_chrdr: float,
+    htail_savsi: float,
+    htail_chstat: float,
+    htail_twista: float,
+    htail_dhdadi: float,
+    htail_type: int,
+    # Vertical Tail
+    vtail_naca: str,
+    vtail_chrdtp: float,
+    vtail_sspn: float,
+    vtail_sspne: float,
+    vtail_chrdr: float,
+    vtail_savsi: float,
+    vtail_chstat: float,
+    vtail_type: int,
+    # Output config
+    case_id: str = "PC-9",
+) -> str:
+    """
+    Write DATCOM input file (for005.dat) to output directory (flat-parameter version).
+
+    舊版的 57 個平面參數介面，清單以逗號分隔字串傳入（只保留 schema 用於比較）。
+
+    This tool takes all required DATCOM parameters and generates a properly formatted
+    for005.dat file in a per-session directory under datcom_tool_agent/output/sessions/.
+
+    Args:
+        Flight Conditions (FLTCON):
+            nalpha: Number of angles of attack (max 20)
+            alschd: Angles of attack values, comma-separated (e.g., "1.0,2.0,3.0")
+            nmach: Number of mach numbers (max 20)
+            mach: Mach number values, comma-separated
+            nalt: Number of altitudes (max 20)
+            alt: Altitude values in feet, comma-separated
+            wt: Vehicle weight
+
+        Synthesis (SYNTHS):
+            xcg, zcg: CG location (x, z)
+            xw, zw: Wing apex location (x, z)
+            aliw: Wing incidence angle
+            xh, zh: Horizontal tail apex location (x, z)
+            alih: Horizontal tail incidence angle
+            xv, zv: Vertical tail apex location (x, z)
+
+        Body (BODY):
+            nx: Number of body stations (max 20)
+            x_coords: X coordinates, comma-separated
+            r_coords: Radius values, comma-separated
+            zu_coords: Upper Z coordinates, comma-separated
+            zl_coords: Lower Z coordinates, comma-separated
+            itype: 1=straight wing, 2=swept wing
+            method: Calculation method (1=Default, 2=Jorgensen)
+
+        Wing Planform (WGPLNF):
+            wing_naca: NACA airfoil (e.g., "6-63-415")
+            wing_chrdtp: Tip chord
+            wing_sspn: Semi-span theoretical
+            wing_sspne: Semi-span exposed
+            wing_chrdr: Root chord
+            wing_savsi: Sweep angle
+            wing_chstat: Reference chord station
+            wing_twista: Twist angle
+            wing_dhdadi: Dihedral angle
+            wing_type: 1=straight tapered planform
+
+        Horizontal Tail (HTPLNF):
+            htail_naca: NACA airfoil (e.g., "4-0012")
+            htail_chrdtp: Tip chord
+            htail_sspn: Semi-span theoretical
+            htail_sspne: Semi-span exposed
+            htail_chrdr: Root chord
+            htail_savsi: Sweep angle
+            htail_chstat: Reference chord station
+            htail_twista: Twist angle
+            htail_dhdadi: Dihedral angle
+            htail_type: 1=straight tapered planform
+
+        Vertical Tail (VTPLNF):
+            vtail_naca: NACA airfoil (e.g., "4-0012")
+            vtail_chrdtp: Tip chord
+            vtail_sspn: Semi-span theoretical
+            vtail_sspne: Semi-span exposed
+            vtail_chrdr: Root chord
+            vtail_savsi: Sweep angle
+            vtail_chstat: Reference chord station
+            vtail_type: 1=straight tapered planform
+
+        case_id: Case identifier (default: "PC-9")
+
+    Returns:
+        Success message with output file path
+    """
+    raise NotImplementedError("legacy schema, only used for token comparison")
+
+
+def _token_counter():
+    """回傳 (計數函式, 說明)"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return (lambda text: len(encoding.encode(text))), "tiktoken o200k_base"
+    except Exception:
+        return (lambda text: round(len(text) / 4)), "estimated as chars / 4 (tiktoken encoding unavailable)"
+
+
+def _flat_arguments() -> dict:
+    """PC-9 以舊版平面參數表示（清單為逗號分隔字串）"""
+    d = make_pc9_input()
+    fc, syn, body = d.flight_conditions, d.synthesis, d.body
+    wing, htail, vtail = d.wing_planform, d.horizontal_tail_planform, d.vertical_tail_planform
+
+    def joined(values):
+        return ",".join(str(float(v)) for v in values)
+
+    args = {
+        "nalpha": fc.NALPHA, "alschd": joined(fc.ALSCHD), "nmach": fc.NMACH, "mach": joined(fc.MACH),
+        "nalt": fc.NALT, "alt": joined(fc.ALT), "wt": fc.WT,
+        "xcg": syn.XCG, "zcg": syn.ZCG, "xw": syn.XW, "zw": syn.ZW, "aliw": syn.ALIW,
+        "xh": syn.XH, "zh": syn.ZH, "alih": syn.ALIH, "xv": syn.XV, "zv": syn.ZV,
+        "nx": body.NX, "x_coords": joined(body.X), "r_coords": joined(body.R),
+        "zu_coords": joined(body.ZU), "zl_coords": joined(body.ZL), "itype": body.ITYPE, "method": body.METHOD,
+    }
+    for prefix, card, naca in (("wing", wing, wing.NACA_W), ("htail", htail, htail.NACA_H), ("vtail", vtail, vtail.NACA_V)):
+        args[f"{prefix}_naca"] = naca
+        for name in ("CHRDTP", "SSPN", "SSPNE", "CHRDR", "SAVSI", "CHSTAT", "TWISTA", "DHDADI", "TYPE"):
+            if hasattr(card, name):
+                args[f"{prefix}_{name.lower()}"] = getattr(card, name)
+    args["case_id"] = "PC-9"
+    return args
+
+
+def run_benchmark():
+    count, method = _token_counter()
+    flat_args = _flat_arguments()
+    nested_args = {**PC9_ARGS, "case_id": "PC-9"}
+    assert set(flat_args) <= set(write_datcom_file_flat.args)
+    assert build_datcom_input(PC9_ARGS) == make_pc9_input()
+
+    rows = []
+    for label, tool, args in (
+        ("flat (57 params)", write_datcom_file_flat, flat_args),
+        ("nested (per card)", write_datcom_file, nested_args),
+    ):
+        schema = json.dumps(convert_to_openai_tool(tool), ensure_ascii=False)
+        arguments = json.dumps(args, ensure_ascii=False)
+        rows.append((label, count(schema), count(arguments)))
+
+    print("=" * 80)
+    print(f"📊 write_datcom_file token cost (PC-9, {method})")
+    print("=" * 80)
+    print(f"  {'schema':20s} {'prompt':>8s} {'completion':>11s} {'total':>8s}")
+    for label, prompt, completion in rows:
+        print(f"  {label:20s} {prompt:8d} {completion:11d} {prompt + completion:8d}")
+    (_, p0, c0), (_, p1, c1) = rows
+    print(f"  saved per call: prompt {p0 - p1} ({(p0 - p1) / p0:.0%}), "
+          f"completion {c0 - c1} ({(c0 - c1) / c0:.0%})")
+    print("  (實際用量見 latest_datcom['token_usage'])")
+
+
+if __name__ == "__main__":
+    run_benchmark()
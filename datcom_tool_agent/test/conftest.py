@@ -0,0 +1,59 @@
+"""
+Shared fixtures for datcom_tool_agent tests
+"""
+import pytest
+
+from datcom_tool_agent.data_model import (
+    DatcomInput, FLTCON, SYNTHS, BODY,
+    WGPLNF, HTPLNF, VTPLNF
+)
+
+
+def make_pc9_input() -> DatcomInput:
+    """建立 PC-9 範例資料（與 run_generator.py 主程式相同）"""
+    return DatcomInput(
+        flight_conditions=FLTCON(
+            NALPHA=6,
+            ALSCHD=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            NMACH=1,
+            MACH=[0.5489],
+            NALT=1,
+            ALT=[10000.0],
+            WT=5180.0
+        ),
+        synthesis=SYNTHS(
+            XCG=11.3907, ZCG=0.0,
+            XW=11.1070, ZW=-1.6339, ALIW=1.0,
+            XH=29.1178, ZH=0.7940, ALIH=-2.0,
+            XV=26.4633, ZV=1.3615
+        ),
+        body=BODY(
+            NX=9,
+            X=[0.0, 2.2428, 2.5098, 8.4711, 14.4619, 16.8209, 20.4396, 2.97310e1, 3.14337e1],
+            R=[0.0, 0.7710, 0.8990, 1.6010, 1.6010, 1.6010, 1.4797, 0.5906, 0.0000],
+            ZU=[0.0, 0.8629, 0.9613, 1.7028, 3.6385, 3.5531, 2.4508, 1.3519, 1.3451],
+            ZL=[0.0, -0.7546, -1.3123, -1.9727, -1.9783, -1.7487, -1.3615, -0.2625, 0.7054],
+            ITYPE=2, METHOD=1
+        ),
+        wing_planform=WGPLNF(
+            NACA_W="6-63-415",
+            CHRDTP=3.7402, SSPN=16.6076, SSPNE=15.0131,
+            CHRDR=6.2336, CHSTAT=0.0, SAVSI=4.0,
+            TWISTA=-2.0, DHDADI=7.0, TYPE=1
+        ),
+        horizontal_tail_planform=HTPLNF(
+            NACA_H="4-0012",
+            CHRDTP=2.1325, SSPN=6.0105, SSPNE=6.0105,
+            CHRDR=4.2651, SAVSI=13.0, TWISTA=-2.0, DHDADI=7.0, CHSTAT=0.0, TYPE=1
+        ),
+        vertical_tail_planform=VTPLNF(
+            NACA_V="4-0012",
+            CHRDTP=2.3734, SSPN=5.3642, SSPNE=5.3642,
+            CHRDR=4.6916, SAVSI=12.2, CHSTAT=0.0, TYPE=1
+        ),
+    )
+
+
+@pytest.fixture
+def pc9_input() -> DatcomInput:
+    return make_pc9_input()
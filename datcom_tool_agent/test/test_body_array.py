@@ -0,0 +1,61 @@
+"""
+Tests for the array-backed BODY card
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from datcom_tool_agent.data_model import BODYArray
+from datcom_tool_agent.deck_cache import datcom_input_key
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+
+def test_stations_are_one_read_only_contiguous_array(pc9_input):
+    body = BODYArray.model_validate(pc9_input.body)
+
+    assert body.stations.shape == (4, 9)
+    assert body.stations.flags.c_contiguous
+    assert np.shares_memory(body.X, body.stations) and np.shares_memory(body.ZL, body.stations)
+    with pytest.raises(ValueError, match="read-only"):
+        body.R[0] = 1.0
+
+
+def test_from_stations_does_not_copy_or_freeze_caller_array(pc9_input):
+    source = pc9_input.body
+    stations = np.array([source.X, source.R, source.ZU, source.ZL])
+    body = BODYArray.from_stations(stations, ITYPE=2)
+
+    assert body.NX == 9
+    assert np.shares_memory(body.stations, stations)
+    assert stations.flags.writeable
+    assert body == source
+
+
+def test_deck_and_cache_key_match_list_backed_body(pc9_input):
+    array_input = pc9_input.model_copy(update={"body": BODYArray.model_validate(pc9_input.body)})
+    generator = DatcomGenerator()
+
+    assert generator.render(array_input, "PC-9") == generator.render(pc9_input, "PC-9")
+    assert array_input.model_dump() == pc9_input.model_dump()
+    assert datcom_input_key(array_input, "PC-9") == datcom_input_key(pc9_input, "PC-9")
+
+
+@pytest.mark.parametrize("field, values, message", [
+    ("X", [0.0, 2.0, 2.0], "strictly increasing"),
+    ("R", [0.0, -0.1, 0.0], "R must be >= 0"),
+    ("ZU", [0.0, -2.0, 0.0], "ZU must be >= ZL"),
+    ("ZL", [0.0, float("nan"), 0.0], "non-finite"),
+])
+def test_rejects_bad_geometry(field, values, message):
+    data = {"NX": 3, "X": [0.0, 1.0, 2.0], "R": [0.0, 0.5, 0.0],
+            "ZU": [0.0, 0.5, 0.0], "ZL": [0.0, -0.5, 0.0], "ITYPE": 1}
+    data[field] = values
+    with pytest.raises(ValidationError, match=message):
+        BODYArray(**data)
+
+
+def test_rejects_mismatched_station_count():
+    with pytest.raises(ValidationError, match="same length"):
+        BODYArray(NX=2, X=[0.0, 1.0], R=[0.0], ZU=[0.0, 0.1], ZL=[0.0, 0.0], ITYPE=1)
+    with pytest.raises(ValidationError, match="must match NX"):
+        BODYArray(NX=3, X=[0.0, 1.0], R=[0.0, 0.1], ZU=[0.0, 0.1], ZL=[0.0, 0.0], ITYPE=1)
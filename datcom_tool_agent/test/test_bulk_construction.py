@@ -0,0 +1,88 @@
+"""
+Tests for bulk / trusted DatcomInput construction
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from datcom_tool_agent.data_model import BODYArray, DatcomInput, derive_trusted, validate_columns, validate_many
+
+
+def test_validate_many_matches_per_object_validation(pc9_input):
+    data = pc9_input.model_dump()
+    assert validate_many([data, data]) == [DatcomInput(**data)] * 2
+
+    bad = pc9_input.model_dump()
+    bad["flight_conditions"]["NALPHA"] = 5  # 與 ALSCHD 長度不符
+    with pytest.raises(ValidationError) as exc_info:
+        validate_many([data, bad])
+    assert exc_info.value.errors()[0]["loc"][:3] == (1, "flight_conditions", "ALSCHD")
+
+
+def test_validate_columns_builds_variants(pc9_input):
+    variants = validate_columns(pc9_input, {
+        "synthesis.XCG": [11.0, 11.5, 12.0],
+        "wing_planform.NACA_W": ["6-63-415", "4-2412", "0012"],
+    })
+    assert [v.synthesis.XCG for v in variants] == [11.0, 11.5, 12.0]
+    assert variants[1].wing_planform.NACA_W == "4-2412"
+    assert variants[2].body == pc9_input.body
+
+    with pytest.raises(ValueError, match="same length"):
+        validate_columns(pc9_input, {"synthesis.XCG": [1.0], "synthesis.XW": [1.0, 2.0]})
+
+
+def test_derive_trusted_equals_validated_construction(pc9_input):
+    derived = derive_trusted(
+        pc9_input,
+        flight_conditions={"ALSCHD": [0.0, 5.0, 10.0], "WT": 5000.0},
+        synthesis={"XCG": 12.0},
+    )
+    assert derived.flight_conditions.NALPHA == 3
+    assert derived == DatcomInput.model_validate(derived.model_dump())
+    # base 不受影響
+    assert pc9_input.flight_conditions.NALPHA == 6
+    assert pc9_input.synthesis.XCG == 11.3907
+
+
+def test_validate_columns_only_validates_varied_cards(pc9_input):
+    """沒有變化的卡片沿用 base 的實例；有變化的卡片仍執行跨欄位檢查"""
+    variants = validate_columns(pc9_input, {
+        "flight_conditions.ALSCHD": [[0.0, 1.0, 2.0, 3.0, 4.0, 5.0], [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]],
+    })
+    assert variants[1] == pc9_input
+    assert all(v.body is pc9_input.body and v.synthesis is pc9_input.synthesis for v in variants)
+
+    with pytest.raises(ValidationError) as exc_info:
+        validate_columns(pc9_input, {"flight_conditions.ALSCHD": [[1.0] * 6, [1.0, 2.0]]})
+    assert exc_info.value.errors()[0]["loc"][:3] == (1, "flight_conditions", "ALSCHD")
+
+    with pytest.raises(ValueError, match="Unknown column"):
+        validate_columns(pc9_input, {"synthesis.XCGG": [1.0]})
+
+
+def test_validate_many_validates_shared_cards_once(pc9_input):
+    data = pc9_input.model_dump()
+    items = [{**data, "synthesis": {**data["synthesis"], "XCG": xcg}} for xcg in (11.0, 12.0)]
+
+    first, second = validate_many(items)
+
+    assert (first.synthesis.XCG, second.synthesis.XCG) == (11.0, 12.0)
+    assert first.body is second.body
+    assert first == DatcomInput(**items[0])
+
+
+def test_derive_trusted_repacks_body_stations(pc9_input):
+    """BODYArray 的站位更新後 stations 與 X / R / ZU / ZL 一致，NX 同步"""
+    base = pc9_input.model_copy(update={"body": BODYArray.model_validate(pc9_input.body)})
+    body = base.body
+
+    derived = derive_trusted(base, body={"X": [0.0, 5.0, 10.0], "R": [0.0, 1.0, 0.0],
+                                         "ZU": [0.0, 1.0, 0.0], "ZL": [0.0, -1.0, 0.0]})
+
+    assert derived.body.NX == 3
+    np.testing.assert_array_equal(derived.body.stations[0], [0.0, 5.0, 10.0])
+    np.testing.assert_array_equal(derived.body.X, derived.body.stations[0])
+    assert derived.body.fineness_ratio == pytest.approx(10.0 / 2.0)
+    # base 不受影響
+    assert body.NX == 9 and body.stations.shape == (4, 9)
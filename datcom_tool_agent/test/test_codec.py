@@ -0,0 +1,46 @@
+"""
+Tests for the binary DatcomInput encoding
+"""
+import json
+
+import pytest
+
+from datcom_tool_agent.codec import decode_datcom_input, encode_datcom_input, encode_datcom_input_text
+from datcom_tool_agent.data_model import BODYArray
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+
+def test_round_trip_is_lossless(pc9_input):
+    encoded = encode_datcom_input(pc9_input)
+    decoded = decode_datcom_input(encoded)
+
+    assert decoded == pc9_input
+    assert decoded.model_dump() == pc9_input.model_dump()
+    assert DatcomGenerator().render(decoded, "PC-9") == DatcomGenerator().render(pc9_input, "PC-9")
+    assert len(encoded) < len(pc9_input.model_dump_json())
+
+
+def test_array_backed_body_encodes_identically(pc9_input):
+    array_input = pc9_input.model_copy(update={"body": BODYArray.model_validate(pc9_input.body)})
+    assert encode_datcom_input(array_input) == encode_datcom_input(pc9_input)
+
+
+def test_rejects_foreign_truncated_or_outdated_data(pc9_input):
+    encoded = encode_datcom_input(pc9_input)
+    with pytest.raises(ValueError, match="not an encoded"):
+        decode_datcom_input(b"{" + encoded[1:])
+    with pytest.raises(ValueError, match="truncated"):
+        decode_datcom_input(encoded[:-4])
+    with pytest.raises(ValueError, match="trailing"):
+        decode_datcom_input(encoded + b"\0")
+    with pytest.raises(ValueError, match="version"):
+        decode_datcom_input(encoded[:4] + b"\xff" + encoded[5:])
+
+
+def test_text_encoding_is_json_serializable(pc9_input):
+    """state 中的 base64 文字可放入 JSON，decode_datcom_input 接受 bytes 或文字"""
+    text = encode_datcom_input_text(pc9_input)
+    assert json.loads(json.dumps({"datcom_input": text}))["datcom_input"] == text
+    assert decode_datcom_input(text) == decode_datcom_input(encode_datcom_input(pc9_input)) == pc9_input
+    with pytest.raises(ValueError, match="base64"):
+        decode_datcom_input("not base64!")
@@ -0,0 +1,54 @@
+"""
+Tests for cross-card geometric consistency checks
+"""
+import numpy as np
+
+from datcom_tool_agent.consistency import check_batch, check_consistency, valid_mask
+
+
+def _variant(base, **cards):
+    variant = base.model_copy(deep=True)
+    for card, fields in cards.items():
+        for name, value in fields.items():
+            setattr(getattr(variant, card), name, value)
+    return variant
+
+
+def test_pc9_is_consistent(pc9_input):
+    assert check_consistency(pc9_input) == []
+
+
+def test_each_rule_is_reported(pc9_input):
+    cases = [
+        (dict(wing_planform={"SSPNE": 17.0}), "wing.sspne_le_sspn"),
+        (dict(horizontal_tail_planform={"CHRDTP": 5.0}), "htail.chrdtp_le_chrdr"),
+        (dict(synthesis={"XCG": 40.0}), "xcg_within_body"),
+        (dict(synthesis={"XH": 10.0}), "xh_aft_of_xw"),
+        (dict(synthesis={"XV": 11.0}), "xv_aft_of_xw"),
+        (dict(synthesis={"ZW": -2.5}), "zw_within_body"),
+    ]
+    for cards, rule in cases:
+        violations = check_consistency(_variant(pc9_input, **cards))
+        assert [v.rule for v in violations] == [rule]
+
+
+def test_batch_reports_indices_and_values(pc9_input):
+    batch = [
+        pc9_input,
+        _variant(pc9_input, synthesis={"ZW": 3.0}, vertical_tail_planform={"SSPNE": 6.0}),
+        pc9_input,
+        _variant(pc9_input, synthesis={"XCG": -1.0}),
+    ]
+    violations = check_batch(batch)
+
+    assert [(v.index, v.rule) for v in violations] == [
+        (1, "vtail.sspne_le_sspn"), (1, "zw_within_body"), (3, "xcg_within_body"),
+    ]
+    zw = violations[1].values
+    assert zw["ZW"] == 3.0 and zw["ZL_at_XW"] < -1.9 and 2.5 < zw["ZU_at_XW"] < 2.6
+    np.testing.assert_array_equal(valid_mask(batch), [True, False, True, False])
+
+
+def test_wing_apex_outside_body_skips_zw_rule(pc9_input):
+    variant = _variant(pc9_input, synthesis={"XW": 35.0, "ZW": 10.0, "XH": 36.0, "XV": 36.0})
+    assert check_consistency(variant) == []
@@ -0,0 +1,63 @@
+"""
+Tests for the content-addressed DATCOM deck cache
+"""
+import os
+
+from datcom_tool_agent.deck_cache import DeckCache, datcom_input_key
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+
+def test_repeat_request_hits_cache(pc9_input, tmp_path):
+    """相同設定第二次產生時命中快取，輸出內容與直接產生相同"""
+    cache = DeckCache(root=str(tmp_path / "cache"))
+    dest = tmp_path / "for005.dat"
+
+    _, first_hit = cache.get_or_generate(pc9_input, "PC-9", str(dest))
+    _, second_hit = cache.get_or_generate(pc9_input, "PC-9", str(dest))
+
+    assert (first_hit, second_hit) == (False, True)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    reference = tmp_path / "reference.dat"
+    DatcomGenerator().generate_file(pc9_input, "PC-9", str(reference))
+    assert dest.read_text(encoding="utf-8") == reference.read_text(encoding="utf-8")
+
+
+def test_key_depends_on_content_and_case_id(pc9_input):
+    changed = pc9_input.model_copy(update={
+        "synthesis": pc9_input.synthesis.model_copy(update={"XCG": 11.5})
+    })
+    key = datcom_input_key(pc9_input, "PC-9")
+    assert key == datcom_input_key(pc9_input.model_copy(deep=True), "PC-9")
+    assert key != datcom_input_key(changed, "PC-9")
+    assert key != datcom_input_key(pc9_input, "PC-9B")
+
+
+def test_lru_eviction_respects_size_limit(tmp_path):
+    """超過大小上限時刪除最久未使用的 deck"""
+    cache = DeckCache(root=str(tmp_path / "cache"), max_bytes=250)
+    for key in ("aa01", "aa02", "aa03"):
+        cache.put(key, "x" * 100)
+
+    # aa01 被淘汰；aa02 因最近使用而保留，下一次寫入時改淘汰 aa03
+    assert cache.get("aa01") is None
+    assert cache.get("aa02") is not None
+    cache.put("aa04", "x" * 100)
+
+    assert os.path.exists(cache.path_for("aa02"))
+    assert not os.path.exists(cache.path_for("aa03"))
+    assert cache.stats()["total_bytes"] <= 250
+
+    # 重新載入時由 mtime 還原索引
+    reloaded = DeckCache(root=str(tmp_path / "cache"), max_bytes=250)
+    assert reloaded.stats()["entries"] == 2
+
+
+def test_materialize_leaves_no_temp_files(pc9_input, tmp_path):
+    """重複放到同一個輸出位置（已是同一檔案的 hardlink）時不留下暫存檔"""
+    cache = DeckCache(root=str(tmp_path / "cache"))
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    for _ in range(3):
+        cache.get_or_generate(pc9_input, "PC-9", str(out_dir / "for005.dat"))
+    assert os.listdir(out_dir) == ["for005.dat"]
@@ -0,0 +1,92 @@
+"""
+Tests for the for005.dat reader (deck → DatcomInput)
+"""
+import pytest
+
+from datcom_tool_agent.deck_reader import parse_deck, read_deck
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+
+def test_round_trip_single_case(pc9_input, tmp_path):
+    """DatcomGenerator 的輸出可以完整解析回相同的 DatcomInput"""
+    path = tmp_path / "for005.dat"
+    DatcomGenerator().generate_file(pc9_input, "PC-9", str(path))
+
+    cases = read_deck(str(path))
+
+    assert len(cases) == 1
+    assert cases[0].case_id == "PC-9"
+    assert cases[0].datcom_input == pc9_input
+    assert cases[0].ignored_keys == []
+
+
+def test_round_trip_multi_case_with_save(pc9_input):
+    """multi-case deck：SAVE 帶入的卡片與只寫入差異的卡片合併後與原始輸入相同"""
+    second = pc9_input.model_copy(update={
+        "flight_conditions": pc9_input.flight_conditions.model_copy(update={"MACH": [0.6], "WT": 5000.0})
+    })
+    third = second.model_copy(update={
+        "vertical_tail_planform": second.vertical_tail_planform.model_copy(update={"NACA_V": "4-0008"})
+    })
+    inputs = [pc9_input, second, third]
+    text = DatcomGenerator().render_multi_case(inputs, ["A", "B", "C"])
+
+    cases = parse_deck(text)
+
+    assert [c.case_id for c in cases] == ["A", "B", "C"]
+    assert [c.datcom_input for c in cases] == inputs
+
+
+def test_fortran_number_formats_and_multiline_namelists(pc9_input):
+    """Fortran 數字（e/D 指數、結尾小數點、n*value、索引起點）以及跨行 Namelist"""
+    text = DatcomGenerator().render(pc9_input, "PC-9")
+    text = text.replace(
+        "$FLTCON NALPHA=6.0,ALSCHD=1.0,2.0,3.0,4.0,5.0,6.0,",
+        "$FLTCON NALPHA=6.,ALSCHD=1.0D0, 2.0,\n   3*0.0, ALSCHD(3)=3.0,4.0,5.0,6.0,\n",
+    ).replace("X=0.0,2.2428,2.5098,8.4711,14.4619,16.8209,20.4396,29.731,", "X=0.0,2.2428,2.5098,8.4711,14.4619,16.8209,20.4396,2.97310e1,")
+
+    (case,) = parse_deck(text)
+
+    assert case.datcom_input == pc9_input
+
+
+def test_unknown_variables_are_reported_and_errors_have_line_numbers(pc9_input):
+    text = DatcomGenerator().render(pc9_input, "PC-9").replace("WT=5180.0$", "WT=5180.0,LOOP=2.0$")
+    (case,) = parse_deck(text)
+    assert case.ignored_keys == ["FLTCON.LOOP"]
+
+    with pytest.raises(ValueError, match="Line 2"):
+        parse_deck(text.replace("MACH=0.5489", "MACH=abc"))
+    with pytest.raises(ValueError, match="not terminated"):
+        parse_deck("CASEID X\n$FLTCON NALPHA=1.0,\n")
+
+
+def test_empty_scalar_assignment_is_a_value_error(pc9_input):
+    """WT= 沒有值時回報 Namelist 與欄位（ValueError，呼叫端可改用其他抽取方式）"""
+    text = DatcomGenerator().render(pc9_input, "PC-9").replace("WT=5180.0$", "WT=, $")
+    with pytest.raises(ValueError, match=r"\$FLTCON WT"):
+        parse_deck(text)
+
+
+def test_indexed_assignment_patches_saved_values(pc9_input):
+    """SAVE 帶入或重複的 Namelist 中 ALSCHD(3)=... 只覆寫指定的元素"""
+    text = DatcomGenerator().render(pc9_input, "A") + "SAVE\nNEXT CASE\nCASEID B\n $FLTCON ALSCHD(3)=9.0$\n"
+    cases = parse_deck(text)
+    assert cases[1].datcom_input.flight_conditions.ALSCHD == [1.0, 2.0, 9.0, 4.0, 5.0, 6.0]
+    assert cases[0].datcom_input.flight_conditions.ALSCHD == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+    (case,) = parse_deck(DatcomGenerator().render(pc9_input, "A") + " $FLTCON ALSCHD(2)=7.0,8.0$\n")
+    assert case.datcom_input.flight_conditions.ALSCHD == [1.0, 7.0, 8.0, 4.0, 5.0, 6.0]
+
+
+def test_airfoil_cards_with_spaces_and_unrecognized_lines(pc9_input):
+    text = DatcomGenerator().render(pc9_input, "PC-9")
+    (case,) = parse_deck(text.replace("NACA-H-4-0012", "NACA H 4 0012"))
+    assert case.datcom_input == pc9_input
+
+    (case,) = parse_deck("* comment\nDIM FT\nSREF=150.0\n" + text)
+    assert case.datcom_input == pc9_input
+    assert case.ignored_lines == ["Line 3: SREF=150.0"]
+
+    with pytest.raises(ValueError, match="airfoil card"):
+        parse_deck(text.replace("NACA-H-4-0012", "NACA-H"))
@@ -0,0 +1,187 @@
+"""
+Tests for deterministic (LLM-free) DATCOM extraction
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.codec import decode_datcom_input
+from datcom_tool_agent.extraction import extract_datcom_input, split_aircraft
+from datcom_tool_agent.extraction_cache import ExtractionCache
+from datcom_tool_agent.run_generator import DatcomGenerator
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+
+
+def test_structured_text_is_complete(pc9_input):
+    """PC-9 條列文字（KEY=value + 中文標籤）可完整抽取，不需要 LLM"""
+    result = extract_datcom_input(PC9_TEXT)
+    assert result.complete, (result.missing, result.ambiguous, result.error)
+    assert result.source == "text"
+    assert result.datcom_input == pc9_input
+
+
+def test_raw_deck_is_complete(pc9_input):
+    """原始 for005.dat 由 deck_reader 解析"""
+    result = extract_datcom_input(DatcomGenerator().render(pc9_input, "PC-9"))
+    assert result.complete
+    assert result.source == "deck"
+    assert result.case_id == "PC-9"
+    assert result.datcom_input == pc9_input
+
+
+def test_deck_assignments_outside_namelists_are_ambiguous(pc9_input):
+    """Namelist 外的 KEY=value 行不直接忽略；說明文字不影響完整性"""
+    deck = DatcomGenerator().render(pc9_input, "PC-9")
+    assert extract_datcom_input("以下是 for005.dat\n" + deck).complete
+
+    result = extract_datcom_input("SREF=150.0\n" + deck)
+    assert not result.complete
+    assert result.ambiguous == ["deck (Line 1: SREF=150.0)"]
+
+
+def test_prose_mentioning_a_card_is_not_a_heading(pc9_input):
+    """提到 wing / BODY 的說明文字不切換卡片；粗體與冒號結尾的行仍是標題"""
+    text = PC9_TEXT.replace("## 水平尾翼 (HTPLNF)\n", "## 水平尾翼 (HTPLNF)\nThe wing is mid-mounted, the BODY is round\n")
+    result = extract_datcom_input(text)
+    assert result.complete, (result.missing, result.ambiguous)
+    assert result.datcom_input == pc9_input
+
+    text = PC9_TEXT.replace("## 主翼 (WGPLNF)", "**主翼 (WGPLNF)**").replace("## 水平尾翼 (HTPLNF)", "Horizontal tail:")
+    assert extract_datcom_input(text).datcom_input == pc9_input
+
+
+def test_missing_fields_are_listed():
+    text = PC9_TEXT.replace("- CHRDTP=3.7402, SSPN=16.6076, SSPNE=15.0131", "- SSPN=16.6076, SSPNE=15.0131")
+    result = extract_datcom_input(text)
+    assert not result.complete
+    assert result.missing == ["wing_planform.CHRDTP"]
+    assert result.cards["wing_planform"]["SSPN"] == 16.6076
+
+
+def test_conflicting_and_unplaced_fields_are_ambiguous():
+    """數量與清單長度不符、以及無法判斷卡片的欄位都視為歧義"""
+    result = extract_datcom_input(PC9_TEXT.replace("- 攻角數量: 6", "- 攻角數量: 5"))
+    assert result.ambiguous == ["flight_conditions.NALPHA"]
+    assert not result.complete
+
+    result = extract_datcom_input("CHRDTP=3.0\n" + PC9_TEXT)
+    assert "?.CHRDTP" in result.ambiguous
+
+
+def test_agent_node_skips_llm_for_complete_file(tmp_path, monkeypatch):
+    """file_content 已完整時 agent_node 直接產生檔案，不呼叫 ReAct agent"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+
+    class NoLLM:
+        def invoke(self, state):
+            raise AssertionError("LLM should not be called")
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", NoLLM())
+    result = agent.agent_node({
+        "messages": [HumanMessage(content="請產生 DATCOM 輸入檔")],
+        "file_content": PC9_TEXT,
+        "parsed_file_data": {"has_datcom_data": True},
+        "conversation_id": "extraction-test",
+    })
+
+    assert result["messages"][0].content.startswith("✅")
+    assert result["latest_datcom"]["extraction"] == "deterministic"
+    assert result["latest_datcom"]["token_usage"] == {"prompt_tokens": 0, "completion_tokens": 0}
+
+
+def test_agent_node_applies_request_changes_to_complete_file(tmp_path, monkeypatch):
+    """檔案完整時請求中的 KEY=value 修改直接套用；無法確定解析的修改交給 LLM"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+    calls = []
+
+    class FakeAgent:
+        def invoke(self, state):
+            calls.append(state)
+            return {"messages": [*state["messages"], AIMessage(content="done")]}
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", FakeAgent())
+    monkeypatch.setitem(agent.__dict__, "_extraction_cache", ExtractionCache("fp", path=str(tmp_path / "x.sqlite3")))
+
+    def run(request):
+        return agent.agent_node({
+            "messages": [HumanMessage(content=request)],
+            "file_content": PC9_TEXT,
+            "parsed_file_data": {"has_datcom_data": True},
+            "conversation_id": "request-test",
+        })
+
+    result = run("請產生 DATCOM 檔案\nWT=6000")
+    assert result["latest_datcom"]["extraction"] == "deterministic"
+    assert decode_datcom_input(result["latest_datcom"]["datcom_input"]).flight_conditions.WT == 6000.0
+    assert calls == []
+
+    run("請產生 DATCOM 檔案，重量 WT 改成 6000")
+    assert len(calls) == 1
+    assert "apply every parameter change" in calls[0]["messages"][-1].content
+
+
+def test_agent_node_without_conversation_id_gets_own_session(tmp_path, monkeypatch):
+    """沒有 conversation_id 的呼叫各自產生 session id，不共用 anonymous 輸出目錄"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+    state = {
+        "messages": [HumanMessage(content="請產生 DATCOM 輸入檔")],
+        "file_content": PC9_TEXT,
+        "parsed_file_data": {"has_datcom_data": True},
+    }
+
+    first, second = agent.agent_node(state), agent.agent_node(state)
+
+    assert first["conversation_id"] != second["conversation_id"]
+    assert first["latest_datcom"]["output_path"] != second["latest_datcom"]["output_path"]
+    assert first["conversation_id"] in first["latest_datcom"]["output_path"]
+    assert not (tmp_path / "output" / "anonymous").exists()
+    assert None not in agent._last_datcom_summary
+
+
+def test_agent_node_falls_back_with_hint(monkeypatch):
+    """缺少欄位時交給 LLM，並附上已抽取的欄位；提示訊息不寫回對話"""
+    calls = []
+
+    class FakeAgent:
+        def invoke(self, state):
+            calls.append(state)
+            return {"messages": [*state["messages"], AIMessage(content="done")]}
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", FakeAgent())
+    user = HumanMessage(content="## 主翼 (WGPLNF)\n- SSPN=16.6076\n- NACA: 6-63-415", id="user-1")
+    result = agent.agent_node({"messages": [user], "conversation_id": "fallback-test"})
+
+    hint = calls[0]["messages"][-1]
+    assert "wing_planform.CHRDTP" in hint.content and '"SSPN": 16.6076' in hint.content
+    assert [m.content for m in result["messages"]] == [user.content, "done"]
+    assert "latest_datcom" not in result
+
+
+def test_split_aircraft_deck_cases_are_self_contained(pc9_input):
+    """多 case 的 deck：SAVE 帶到下一個 case 的卡片也會寫入該 case 的內容"""
+    deck = DatcomGenerator().render(pc9_input, "A") + "\nSAVE\nNEXT CASE\nCASEID B\n $SYNTHS XCG=11.0$\n"
+    items = split_aircraft(deck)
+
+    assert [case_id for case_id, _ in items] == ["A", "B"]
+    second = extract_datcom_input(items[1][1])
+    assert second.complete and second.case_id == "B"
+    assert second.datcom_input.synthesis.XCG == 11.0
+    assert second.datcom_input.body == pc9_input.body
+
+
+def test_split_aircraft_text_headings(pc9_input):
+    """文字：以第一層標題分段，說明加在每一段前面，標題成為 CASEID；章節標題不分段"""
+    text = "兩架飛機的規格\n# PC-9\n" + PC9_TEXT + "\n# PC-9 heavy\n" + PC9_TEXT.replace("重量: 5180.0", "重量: 5500.0")
+    items = split_aircraft(text)
+
+    assert [case_id for case_id, _ in items] == ["PC-9", "PC-9 heavy"]
+    assert all(content.startswith("兩架飛機的規格") for _, content in items)
+    heavy = extract_datcom_input(items[1][1])
+    assert heavy.complete and heavy.case_id == "PC-9 heavy"
+    assert heavy.datcom_input.flight_conditions.WT == 5500.0
+    assert extract_datcom_input(items[0][1]).datcom_input == pc9_input
+
+    single = PC9_TEXT.replace("## ", "# ")
+    assert split_aircraft(single) == [(None, single)]
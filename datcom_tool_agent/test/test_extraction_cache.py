@@ -0,0 +1,127 @@
+"""
+Tests for the persistent LLM extraction cache
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.codec import encode_datcom_input
+from datcom_tool_agent.extraction_cache import ExtractionCache, extraction_fingerprint
+from datcom_tool_agent.test.test_tool_schema import PC9_ARGS
+
+FREE_TEXT = "PC-9 教練機，主翼半翼展約 16.6 ft，其餘資料請依 PC-9 標準構型。"
+
+
+def test_round_trip_and_counters(pc9_input, tmp_path):
+    cache = ExtractionCache("fp", path=str(tmp_path / "cache.sqlite3"))
+    assert cache.get(FREE_TEXT) is None
+
+    cache.put(FREE_TEXT, encode_datcom_input(pc9_input), "PC-9")
+    datcom_input, case_id = cache.get(FREE_TEXT)
+
+    assert datcom_input == pc9_input and case_id == "PC-9"
+    assert cache.get(FREE_TEXT + " ") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+
+def test_fingerprint_change_invalidates(pc9_input, tmp_path):
+    """模型或 prompt 改變時舊資料不會命中，並在開啟時清除"""
+    path = str(tmp_path / "cache.sqlite3")
+    old = extraction_fingerprint("model-a", "prompt v1")
+    assert old != extraction_fingerprint("model-b", "prompt v1")
+    assert old != extraction_fingerprint("model-a", "prompt v2")
+
+    ExtractionCache(old, path=path).put(FREE_TEXT, encode_datcom_input(pc9_input), "PC-9")
+    cache = ExtractionCache(extraction_fingerprint("model-a", "prompt v2"), path=path)
+    assert cache.get(FREE_TEXT) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_agent_node_reuses_llm_extraction(tmp_path, monkeypatch):
+    """同一份 file_content 第二次送入時不呼叫 ReAct agent"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "decks")))
+    monkeypatch.setitem(agent.__dict__, "_extraction_cache", ExtractionCache("fp", path=str(tmp_path / "cache.sqlite3")))
+    calls = []
+
+    class FakeAgent:
+        """模擬 LLM 呼叫 write_datcom_file"""
+        def invoke(self, state):
+            calls.append(state)
+            reply = agent.write_datcom_file.func(**PC9_ARGS, state=state)
+            return {"messages": [*state["messages"], AIMessage(content=reply)]}
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", FakeAgent())
+
+    def run():
+        return agent.agent_node({
+            "messages": [HumanMessage(content="請產生 DATCOM 輸入檔")],
+            "file_content": FREE_TEXT,
+            "parsed_file_data": {"has_datcom_data": False},
+            "conversation_id": "cache-test",
+        })
+
+    first, second = run(), run()
+
+    assert len(calls) == 1
+    assert (first["latest_datcom"]["extraction"], second["latest_datcom"]["extraction"]) == ("llm", "cache")
+    assert second["latest_datcom"]["datcom_input"] == first["latest_datcom"]["datcom_input"]
+    assert agent._extraction_cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_request_is_part_of_the_key(pc9_input, tmp_path):
+    """同一份檔案但不同的指示是不同的抽取；空白與大小寫差異視為相同"""
+    cache = ExtractionCache("fp", path=str(tmp_path / "cache.sqlite3"))
+    cache.put(FREE_TEXT, encode_datcom_input(pc9_input), "PC-9", "請產生 DATCOM 輸入檔")
+
+    assert cache.get(FREE_TEXT, "請產生  DATCOM 輸入檔 ") is not None
+    assert cache.get(FREE_TEXT, "請產生 datcom 輸入檔") is not None
+    assert cache.get(FREE_TEXT, "請產生 DATCOM 輸入檔，MACH 改成 0.5") is None
+    assert cache.get(FREE_TEXT) is None
+
+
+def _run_with_fake_agent(tmp_path, monkeypatch, file_content, requests, has_datcom_data=False):
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "decks")))
+    monkeypatch.setitem(agent.__dict__, "_extraction_cache", ExtractionCache("fp", path=str(tmp_path / "cache.sqlite3")))
+    calls = []
+
+    class FakeAgent:
+        def invoke(self, state):
+            calls.append(state)
+            reply = agent.write_datcom_file.func(**PC9_ARGS, state=state)
+            return {"messages": [*state["messages"], AIMessage(content=reply)]}
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", FakeAgent())
+    results = [
+        agent.agent_node({
+            "messages": [HumanMessage(content=request)],
+            "file_content": file_content,
+            "parsed_file_data": {"has_datcom_data": has_datcom_data},
+            "conversation_id": "cache-test",
+        })
+        for request in requests
+    ]
+    return calls, results
+
+
+def test_agent_node_different_instruction_misses(tmp_path, monkeypatch):
+    """同一份檔案、不同的使用者指示時重新呼叫 ReAct agent"""
+    calls, results = _run_with_fake_agent(
+        tmp_path, monkeypatch, FREE_TEXT, ["請產生 DATCOM 輸入檔", "請產生 DATCOM 輸入檔，MACH 改成 0.5"],
+    )
+
+    assert len(calls) == 2
+    assert [r["latest_datcom"]["extraction"] for r in results] == ["llm", "llm"]
+    assert agent._extraction_cache.stats() == {"hits": 0, "misses": 2, "entries": 2}
+
+
+def test_agent_node_does_not_cache_partial_extraction(tmp_path, monkeypatch):
+    """依確定性抽取提示補齊（partial）的結果不寫入快取"""
+    partial = "## 主翼 (WGPLNF)\n- SSPN=16.6076\n" + FREE_TEXT
+    calls, results = _run_with_fake_agent(
+        tmp_path, monkeypatch, partial, ["請產生 DATCOM 輸入檔", "請產生 DATCOM 輸入檔"], has_datcom_data=True,
+    )
+
+    assert len(calls) == 2
+    assert [r["latest_datcom"]["extraction"] for r in results] == ["partial", "partial"]
+    assert agent._extraction_cache.stats()["entries"] == 0
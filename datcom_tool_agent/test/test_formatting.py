@@ -0,0 +1,48 @@
+"""
+Tests for the vectorized namelist number formatting
+"""
+import numpy as np
+import pytest
+
+from datcom_tool_agent.run_generator import (
+    _format_array_for_datcom, _format_single_number, _format_value_for_datcom
+)
+
+
+def _scalar(values) -> str:
+    return ",".join(_format_single_number(float(v)) for v in values)
+
+
+def test_vectorized_matches_scalar_on_random_values():
+    """大量隨機數值：向量化輸出需與逐一格式化完全一致"""
+    rng = np.random.default_rng(42)
+    values = np.concatenate([
+        rng.uniform(-50.0, 50.0, 20000),
+        np.round(rng.uniform(-1000.0, 1000.0, 20000), 4),
+        rng.integers(-10 ** 6, 10 ** 6, 5000).astype(float),
+        # 剛好落在第五位小數 .5 的值（捨入邊界）
+        (rng.integers(0, 20000, 5000) * 0.5 + 0.5) / 10000,
+        rng.standard_normal(5000) * 1e-5,
+        rng.uniform(-1e12, 1e12, 1000),
+    ])
+    assert _format_array_for_datcom(values) == _scalar(values)
+
+
+@pytest.mark.parametrize("value", [
+    0.0, -0.0, 1.0, -2.0, 0.5489, 10000.0, 2.97310e1, 0.03125, -0.03125,
+    0.00005, -0.00001, 9.99995, 0.99999, 1e-300, 2.0 ** 53, 2.0 ** 53 + 2, 1e20, -1e20,
+])
+def test_vectorized_matches_scalar_on_edge_values(value):
+    assert _format_array_for_datcom(np.array([value])) == _format_single_number(value)
+
+
+def test_format_value_dispatches_arrays():
+    """NumPy 陣列走向量化路徑，輸出與 list 相同"""
+    values = [0.0, 2.2428, 2.5098, 8.4711, 3.14337e1]
+    assert _format_value_for_datcom(np.array(values)) == _format_value_for_datcom(values)
+    assert _format_array_for_datcom(np.array([])) == ""
+
+
+def test_vectorized_rejects_non_finite_like_scalar():
+    with pytest.raises(ValueError):
+        _format_array_for_datcom(np.array([1.0, np.nan]))
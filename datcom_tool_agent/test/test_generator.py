@@ -0,0 +1,122 @@
+"""
+Tests for DatcomGenerator (for005.dat formatting and batch generation)
+"""
+import os
+
+from datcom_tool_agent.run_generator import DatcomGenerator
+
+
+PC9_DECK = """CASEID PC-9
+$FLTCON NALPHA=6.0,ALSCHD=1.0,2.0,3.0,4.0,5.0,6.0,NMACH=1.0,MACH=0.5489,NALT=1.0,ALT=10000.0,WT=5180.0$
+$SYNTHS XCG=11.3907,ZCG=0.0,XW=11.107,ZW=-1.6339,ALIW=1.0,XH=29.1178,ZH=0.794,ALIH=-2.0,XV=26.4633,ZV=1.3615$
+$BODY NX=9.0,X=0.0,2.2428,2.5098,8.4711,14.4619,16.8209,20.4396,29.731,31.4337,R=0.0,0.771,0.899,1.601,1.601,1.601,1.4797,0.5906,0.0,ZU=0.0,0.8629,0.9613,1.7028,3.6385,3.5531,2.4508,1.3519,1.3451,ZL=0.0,-0.7546,-1.3123,-1.9727,-1.9783,-1.7487,-1.3615,-0.2625,0.7054,ITYPE=2.0,METHOD=1.0$
+NACA-W-6-63-415
+$WGPLNF CHRDTP=3.7402,SSPN=16.6076,SSPNE=15.0131,CHRDR=6.2336,SAVSI=4.0,CHSTAT=0.0,TWISTA=-2.0,DHDADI=7.0,TYPE=1.0$
+NACA-H-4-0012
+$HTPLNF CHRDTP=2.1325,SSPN=6.0105,SSPNE=6.0105,CHRDR=4.2651,SAVSI=13.0,CHSTAT=0.0,TWISTA=-2.0,DHDADI=7.0,TYPE=1.0$
+NACA-V-4-0012
+$VTPLNF CHRDTP=2.3734,SSPN=5.3642,SSPNE=5.3642,CHRDR=4.6916,SAVSI=12.2,CHSTAT=0.0,TYPE=1.0$
+DAMP
+BUILD
+"""
+
+
+def test_generate_file_matches_reference(pc9_input, tmp_path):
+    """產生的 PC-9 for005.dat 應與參考內容完全一致"""
+    path = tmp_path / "for005.dat"
+    DatcomGenerator().generate_file(pc9_input, "PC-9", str(path))
+    assert path.read_text(encoding="utf-8") == PC9_DECK
+
+
+def test_generate_batch_streams_results_and_reports_failures(pc9_input, tmp_path):
+    """批次產生：每個 case 都有結果，失敗的 case 不會中斷批次"""
+    jobs = [
+        (pc9_input, f"CASE-{i}", str(tmp_path / f"case_{i}.dat"))
+        for i in range(10)
+    ]
+    # 寫到不存在的目錄 → 該 case 失敗
+    jobs.append((pc9_input, "BROKEN", str(tmp_path / "missing" / "for005.dat")))
+
+    results = list(DatcomGenerator().generate_batch(iter(jobs), max_workers=2, chunk_size=3))
+
+    assert len(results) == len(jobs)
+    by_case = {r.case_id: r for r in results}
+    assert not by_case["BROKEN"].ok
+    assert "FileNotFoundError" in by_case["BROKEN"].error
+
+    for i in range(10):
+        result = by_case[f"CASE-{i}"]
+        assert result.ok
+        content = open(result.path, encoding="utf-8").read()
+        assert content == PC9_DECK.replace("CASEID PC-9", f"CASEID CASE-{i}")
+        assert os.path.basename(result.path) == f"case_{i}.dat"
+
+
+def test_generate_multi_case_file_writes_only_changed_namelists(pc9_input, tmp_path):
+    """multi-case 寫檔：第一個 case 完整輸出，之後只輸出有變更的 Namelist"""
+    second = pc9_input.model_copy(update={
+        "flight_conditions": pc9_input.flight_conditions.model_copy(update={"MACH": [0.6]})
+    })
+    third = second.model_copy(update={
+        "wing_planform": second.wing_planform.model_copy(update={"NACA_W": "4-0012"})
+    })
+
+    path = tmp_path / "for005.dat"
+    DatcomGenerator().generate_multi_case_file(
+        [pc9_input, second, third], ["A", "B", "C"], str(path)
+    )
+    cases = path.read_text(encoding="utf-8").split("NEXT CASE\n")
+
+    assert len(cases) == 3
+    assert cases[0] == PC9_DECK.replace("CASEID PC-9", "CASEID A") + "SAVE\n"
+    assert cases[1] == (
+        "CASEID B\n"
+        "$FLTCON NALPHA=6.0,ALSCHD=1.0,2.0,3.0,4.0,5.0,6.0,NMACH=1.0,MACH=0.6,"
+        "NALT=1.0,ALT=10000.0,WT=5180.0$\n"
+        "DAMP\nBUILD\nSAVE\n"
+    )
+    # 翼型改變時 NACA 卡片與對應的 Planform 一起輸出；最後一個 case 不需要 SAVE
+    assert cases[2] == (
+        "CASEID C\n"
+        "NACA-W-4-0012\n"
+        "$WGPLNF CHRDTP=3.7402,SSPN=16.6076,SSPNE=15.0131,CHRDR=6.2336,SAVSI=4.0,"
+        "CHSTAT=0.0,TWISTA=-2.0,DHDADI=7.0,TYPE=1.0$\n"
+        "DAMP\nBUILD\n"
+    )
+
+
+def test_namelist_plan_matches_model_dump(pc9_input):
+    """寫入計畫的輸出需與 model_dump 逐欄位格式化的結果相同，且每個 class 只建立一次"""
+    from datcom_tool_agent.run_generator import _format_value_for_datcom, _get_namelist_plan
+
+    wing = pc9_input.wing_planform
+    plan = _get_namelist_plan(type(wing), "WGPLNF", frozenset({"NACA_W"}))
+    assert plan is _get_namelist_plan(type(wing), "WGPLNF", frozenset({"NACA_W"}))
+
+    data = wing.model_dump(exclude={"NACA_W"}, exclude_none=True)
+    expected = "$WGPLNF " + ",".join(
+        f"{key.upper()}={_format_value_for_datcom(value)}" for key, value in data.items()
+    ) + "$\n"
+    assert plan.render(wing) == expected
+
+
+def test_render_api_matches_generate_file(pc9_input, tmp_path, capsys):
+    """render / render_bytes / write_to 與 generate_file 的輸出相同，且不輸出到 console"""
+    import io
+
+    generator = DatcomGenerator()
+    assert generator.render(pc9_input, "PC-9") == PC9_DECK
+    assert generator.render_bytes(pc9_input, "PC-9") == PC9_DECK.encode("utf-8")
+
+    text_stream, binary_stream = io.StringIO(), io.BytesIO()
+    generator.write_to(text_stream, pc9_input, "PC-9")
+    generator.write_to(binary_stream, pc9_input, "PC-9")
+    assert text_stream.getvalue() == PC9_DECK
+    assert binary_stream.getvalue() == PC9_DECK.encode("utf-8")
+
+    with open(tmp_path / "deck.dat", "wb") as f:
+        generator.write_to(f, pc9_input, "PC-9")
+    assert (tmp_path / "deck.dat").read_text(encoding="utf-8") == PC9_DECK
+
+    generator.generate_file(pc9_input, "PC-9", str(tmp_path / "for005.dat"))
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,80 @@
+"""
+Tests for derived planform / body metrics
+"""
+import numpy as np
+import pytest
+
+from datcom_tool_agent.data_model import BODYArray, derive_trusted
+from datcom_tool_agent.metrics import compute_metrics
+
+
+def test_pc9_wing_and_body_metrics(pc9_input):
+    wing = pc9_input.wing_planform
+    # S = (Cr + Ct) * SSPN，b = 2 * SSPN
+    assert wing.area == pytest.approx((6.2336 + 3.7402) * 16.6076)
+    assert wing.span == pytest.approx(2 * 16.6076)
+    assert wing.aspect_ratio == pytest.approx(wing.span ** 2 / wing.area)
+    assert wing.taper_ratio == pytest.approx(3.7402 / 6.2336)
+    assert wing.mac == pytest.approx(2 / 3 * 6.2336 * (1 + 0.6 + 0.36) / 1.6, rel=1e-4)
+
+    # 垂直尾只有一個翼面
+    vtail = pc9_input.vertical_tail_planform
+    assert vtail.area == pytest.approx(0.5 * (4.6916 + 2.3734) * 5.3642)
+    assert vtail.span == pytest.approx(5.3642)
+
+    body = pc9_input.body
+    assert body.length == pytest.approx(31.4337)
+    assert body.fineness_ratio == pytest.approx(31.4337 / body.body_metrics["max_equivalent_diameter"])
+
+    assert 0.5 < pc9_input.horizontal_tail_volume < 1.0
+    assert 0.02 < pc9_input.vertical_tail_volume < 0.1
+
+
+def test_metrics_are_cached_and_invalidated(pc9_input):
+    wing = pc9_input.wing_planform
+    assert wing.planform_metrics is wing.planform_metrics
+
+    area = wing.area
+    wing.SSPN = 20.0
+    assert wing.area == pytest.approx(area * 20.0 / 16.6076)
+
+    derived = derive_trusted(pc9_input, wing_planform={"CHRDR": 7.0})
+    assert derived.metrics["wing.area"] == pytest.approx((7.0 + 3.7402) * 20.0)
+    # 快取值不是欄位，不影響相等比較與序列化
+    assert "metrics" not in pc9_input.model_dump()
+
+
+def test_nested_mutation_and_deep_copy_update_input_metrics(pc9_input):
+    """修改卡片欄位（包含 deep copy 之後）時 DatcomInput.metrics 跟著更新"""
+    area = pc9_input.metrics["wing.area"]
+    pc9_input.wing_planform.SSPN = 20.0
+    assert pc9_input.metrics["wing.area"] == pytest.approx(area * 20.0 / 16.6076)
+    assert pc9_input.metrics["wing.area"] == pc9_input.wing_planform.area
+
+    volume = pc9_input.horizontal_tail_volume
+    copied = pc9_input.model_copy(deep=True)
+    assert copied.horizontal_tail_volume == pytest.approx(volume)
+    copied.synthesis.XH += 5.0
+    assert copied.horizontal_tail_volume > volume
+    assert copied.horizontal_tail_volume == pytest.approx(compute_metrics([copied])["horizontal_tail_volume"][0])
+    assert pc9_input.horizontal_tail_volume == pytest.approx(volume)
+
+    copied.horizontal_tail_planform.SSPN = 8.0
+    assert copied.metrics["htail.area"] == copied.horizontal_tail_planform.area
+
+
+def test_batch_matches_per_model_metrics(pc9_input):
+    shorter_body = BODYArray.from_stations(
+        np.array([[0.0, 5.0, 20.0], [0.0, 1.5, 0.0], [0.0, 1.0, 0.5], [0.0, -1.0, -0.5]]), ITYPE=1
+    )
+    batch = [
+        pc9_input,
+        derive_trusted(pc9_input, synthesis={"XCG": 12.5}, horizontal_tail_planform={"SSPN": 7.0}),
+        pc9_input.model_copy(update={"body": shorter_body}),
+    ]
+    metrics = compute_metrics(batch)
+
+    assert set(metrics) == set(pc9_input.metrics)
+    for name, values in metrics.items():
+        np.testing.assert_allclose(values, [d.metrics[name] for d in batch], err_msg=name)
+    assert compute_metrics([])["wing.area"].shape == (0,)
@@ -0,0 +1,135 @@
+"""
+Tests for the DATCOM for006.dat output reader
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from langchain_core.messages import HumanMessage
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.output_reader import attach_results, iter_coefficient_tables, read_for006
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+
+# 節錄自 DATCOM 輸出的格式（第一欄為 Fortran 換頁控制字元）
+FOR006 = """1                         THE FOLLOWING IS A LIST OF ALL INPUT CARDS FOR THIS CASE.
+0
+ CASEID PC-9
+ $FLTCON NALPHA=3.0,ALSCHD=1.0,2.0,3.0,NMACH=2.0,MACH=0.5,0.6,NALT=2.0,ALT=0.0,10000.0$
+1         AUTOMATED STABILITY AND CONTROL METHODS PER APRIL 1976 VERSION OF DATCOM
+                                     WING-BODY-VERTICAL TAIL-HORIZONTAL TAIL CONFIGURATION
+                                                         PC-9
+ 
+                          ----------------------- FLIGHT CONDITIONS ------------------------
+  MACH    ALTITUDE   VELOCITY    PRESSURE    TEMPERATURE     REYNOLDS
+ NUMBER                                                      NUMBER
+              FT      FT/SEC     LB/FT**2       DEG R         1/FT
+0 0.500       0.00    558.05  2.1162E+03      518.67      3.5500E+06
+0                                                               -----------------DERIVATIVE (PER DEGREE)-----------------
+0 ALPHA     CD       CL       CM       CN       CA       XCP        CLA          CMA          CYB          CNB          CLB
+0
+     1.0    0.026    0.264   -0.0123    0.265    0.021   -0.046    8.005E-02   -3.065E-03   -1.083E-02    1.652E-03   -1.683E-03
+     2.0    0.030    0.344   -0.0154    0.345    0.018   -0.045    8.025E-02   -3.111E-03                                       -1.778E-03
+     3.0    0.035    0.424   -0.0186      NDM    0.013   -0.044    8.046E-02   -3.158E-03
+0
+1         AUTOMATED STABILITY AND CONTROL METHODS PER APRIL 1976 VERSION OF DATCOM
+                                     WING-BODY-VERTICAL TAIL-HORIZONTAL TAIL CONFIGURATION
+  MACH    ALTITUDE   VELOCITY    PRESSURE    TEMPERATURE     REYNOLDS
+ NUMBER                                                      NUMBER
+0 0.600   10000.00    645.60  1.4556E+03      483.04      3.1064E+06
+0 ALPHA     CD       CL       CM       CN       CA       XCP        CLA          CMA          CYB          CNB          CLB
+0
+     1.0    0.027    0.270   -0.0130    0.271    0.022   -0.048    8.105E-02   -3.165E-03   -1.093E-02    1.662E-03   -1.693E-03
+     2.0    0.031    0.351   -0.0162    0.352    0.019   -0.046    8.125E-02   -3.211E-03
+     3.0    0.036    0.432   -0.0195    0.433    0.014   -0.045    8.146E-02   -3.258E-03
+1                                        DYNAMIC DERIVATIVES
+                                     WING-BODY-VERTICAL TAIL-HORIZONTAL TAIL CONFIGURATION
+  MACH    ALTITUDE   VELOCITY    PRESSURE    TEMPERATURE     REYNOLDS
+0 0.600   10000.00    645.60  1.4556E+03      483.04      3.1064E+06
+0 ALPHA       CLQ          CMQ           CLAD         CMAD
+0
+     1.0    8.101E-02   -2.500E-01    1.234E-02   -5.678E-02
+     2.0
+     3.0
+0                                 END OF JOB.
+"""
+
+
+@pytest.fixture
+def for006_path(tmp_path):
+    path = tmp_path / "for006.dat"
+    path.write_text(FOR006)
+    return str(path)
+
+
+def test_reads_tables_keyed_by_case_mach_and_altitude(for006_path):
+    results = read_for006(for006_path)
+
+    assert len(results.tables) == 2
+    low = results.get("PC-9", 0.5, 0.0)
+    np.testing.assert_array_equal(low.alpha, [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(low["CL"], [0.264, 0.344, 0.424])
+    # NDM 與空白欄位為 NaN，且空白不會讓後面的欄位錯位
+    assert np.isnan(low["CN"][2])
+    assert np.isnan(low["CYB"][1]) and np.isnan(low["CNB"][1])
+    assert low["CLB"][1] == pytest.approx(-1.778e-3)
+
+    high = results.get("PC-9", 0.6, 10000.0)
+    assert high["CMA"][2] == pytest.approx(-3.258e-3)
+    # DAMP 動態導數表合併到同一飛行條件
+    assert high["CMQ"][0] == pytest.approx(-0.25)
+    assert np.isnan(high["CLQ"][1])
+
+
+def test_streams_one_table_at_a_time(for006_path):
+    keys = [key for key, _ in iter_coefficient_tables(for006_path)]
+    configuration = "WING-BODY-VERTICAL TAIL-HORIZONTAL TAIL CONFIGURATION"
+    assert keys == [
+        ("PC-9", configuration, 0.5, 0.0),
+        ("PC-9", configuration, 0.6, 10000.0),
+        ("PC-9", configuration, 0.6, 10000.0),
+    ]
+
+
+def test_attach_results_links_to_latest_datcom(for006_path, tmp_path):
+    latest = {"case_id": "PC-9", "output_path": str(tmp_path / "for005.dat")}
+    linked = attach_results(latest)
+
+    assert linked["results"]["for006_path"] == for006_path
+    assert [t["mach"] for t in linked["results"]["tables"]] == [0.5, 0.6]
+    assert "CMQ" in linked["results"]["tables"][1]["columns"]
+    assert "results" not in latest
+
+
+def test_tables_with_different_alpha_schedules_are_kept(tmp_path):
+    """同一條件但攻角不同的表不合併，也不讓整個檔案讀取失敗"""
+    path = tmp_path / "for006.dat"
+    path.write_text(FOR006.replace("     3.0\n0                                 END", "     4.0\n0                                 END"))
+
+    results = read_for006(str(path))
+
+    assert len(results.tables) == 2 and len(results.unmerged) == 1
+    assert [t["n_alpha"] for t in results.summary("PC-9")] == [3, 3, 3]
+    (key, damp), = results.unmerged
+    assert list(damp.alpha) == [1.0, 2.0, 4.0] and "CMQ" in damp.columns
+    assert "CMQ" not in results.tables[key].columns
+
+
+def test_agent_node_attaches_existing_for006(tmp_path, monkeypatch):
+    """輸出目錄中有 for006.dat 時，agent_node 回傳的 latest_datcom 附上係數表摘要"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+    state = {
+        "messages": [HumanMessage(content="請產生 DATCOM 輸入檔")],
+        "file_content": PC9_TEXT,
+        "parsed_file_data": {"has_datcom_data": True},
+        "conversation_id": "for006-test",
+    }
+
+    first = agent.agent_node(state)["latest_datcom"]
+    assert "results" not in first
+    (Path(first["output_path"]).parent / "for006.dat").write_text(FOR006)
+
+    second = agent.agent_node(state)["latest_datcom"]
+    assert [t["mach"] for t in second["results"]["tables"]] == [0.5, 0.6]
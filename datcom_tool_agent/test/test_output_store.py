@@ -0,0 +1,60 @@
+"""
+Tests for per-session DATCOM output storage
+"""
+import os
+import stat
+import time
+
+from datcom_tool_agent.output_store import (
+    atomic_write_text, collect_garbage, session_output_path
+)
+
+
+def test_sessions_and_cases_get_separate_paths(tmp_path):
+    root = str(tmp_path)
+    a = session_output_path("session-a", "0123456789abcdef" * 4, root=root)
+    b = session_output_path("session-b", "0123456789abcdef" * 4, root=root)
+    c = session_output_path("session-a", "fedcba9876543210" * 4, root=root)
+
+    assert len({a, b, c}) == 3
+    assert all(os.path.isdir(os.path.dirname(p)) for p in (a, b, c))
+    # 不安全的字元不會跳出輸出目錄
+    unsafe = session_output_path("../../etc", "ab" * 32, root=root)
+    assert os.path.abspath(unsafe).startswith(os.path.abspath(root))
+    assert "anonymous" in session_output_path(None, "ab" * 32, root=root)
+    # 清理後相同或截斷後相同的 ID 仍是不同的目錄
+    assert session_output_path("a/b", "ab" * 32, root=root) != session_output_path("a_b", "ab" * 32, root=root)
+    long_a, long_b = "x" * 64 + "a", "x" * 64 + "b"
+    assert session_output_path(long_a, "ab" * 32, root=root) != session_output_path(long_b, "ab" * 32, root=root)
+
+
+def test_atomic_write_replaces_without_temp_leftovers(tmp_path):
+    path = tmp_path / "for005.dat"
+    atomic_write_text(str(path), "first\n")
+    atomic_write_text(str(path), "second\n")
+    assert path.read_text() == "second\n"
+    assert os.listdir(tmp_path) == ["for005.dat"]
+
+
+def test_atomic_write_uses_umask_permissions(tmp_path):
+    """與 open(..., "w") 相同的權限，而不是 mkstemp 的 0600"""
+    baseline = tmp_path / "baseline"
+    baseline.write_text("x")
+    path = tmp_path / "for005.dat"
+    atomic_write_text(str(path), "x\n")
+    assert stat.S_IMODE(os.stat(path).st_mode) == stat.S_IMODE(os.stat(baseline).st_mode)
+
+
+def test_collect_garbage_removes_expired_sessions(tmp_path):
+    root = str(tmp_path)
+    old = session_output_path("old", "ab" * 32, root=root)
+    new = session_output_path("new", "ab" * 32, root=root)
+    atomic_write_text(old, "x")
+    atomic_write_text(new, "x")
+    old_session = os.path.dirname(os.path.dirname(old))
+    stale = time.time() - 3600
+    os.utime(old_session, (stale, stale))
+
+    assert collect_garbage(root=root, retention_seconds=600) == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
@@ -0,0 +1,166 @@
+"""
+Tests for section-parallel LLM extraction
+"""
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.extraction_cache import ExtractionCache
+from datcom_tool_agent.section_extraction import extract_by_sections, repair_cards, split_sections
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+from datcom_tool_agent.test.test_tool_schema import PC9_ARGS
+
+
+class FakeModel:
+    """每次 structured output 呼叫回傳 PC-9 的對應卡片"""
+
+    def __init__(self, cards=PC9_ARGS, barrier=None):
+        self.cards = cards
+        self.barrier = barrier
+        self.calls = []
+        self.texts = {}
+        self.instructions = {}
+
+    def with_structured_output(self, schema, **kwargs):
+        model = self
+
+        class Structured:
+            def invoke(self, messages):
+                attribute = schema["title"]
+                model.calls.append(attribute)
+                model.texts[attribute] = messages[-1].content
+                model.instructions[attribute] = messages[0].content
+                if model.barrier is not None:
+                    model.barrier.wait()
+                raw = AIMessage(content="", usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+                return {"raw": raw, "parsed": model.cards.get(attribute), "parsing_error": None}
+
+        return Structured()
+
+
+def test_split_sections_keeps_preamble():
+    sections = split_sections("PC-9 trainer specification\n" + PC9_TEXT)
+    body = sections["body"]
+    assert body.startswith("PC-9 trainer specification")
+    assert "NX=9" in body and "WGPLNF" not in body
+    assert "NACA: 4-0012" in sections["vertical_tail_planform"]
+    # 找不到標題的文件，每張卡片都使用整份內容
+    assert split_sections("XCG=1.0")["synthesis"] == "XCG=1.0"
+
+
+def test_cards_are_extracted_concurrently(pc9_input):
+    """六張卡片的呼叫同時進行（barrier 需要六個呼叫同時等待才會放行）"""
+    model = FakeModel(barrier=threading.Barrier(6, timeout=5))
+    result = extract_by_sections(model, PC9_TEXT)
+
+    assert sorted(model.calls) == sorted(PC9_ARGS)
+    assert result.failed == [] and result.error is None
+    assert result.datcom_input == pc9_input
+    assert result.token_usage == {"prompt_tokens": 600, "completion_tokens": 120}
+
+
+def test_known_cards_and_failures():
+    model = FakeModel(cards={**PC9_ARGS, "wing_planform": None})
+    known = {"body": PC9_ARGS["body"], "synthesis": PC9_ARGS["synthesis"]}
+    result = extract_by_sections(model, PC9_TEXT, known_cards=known)
+
+    assert "body" not in model.calls and "synthesis" not in model.calls
+    assert result.failed == ["wing_planform"]
+    assert result.datcom_input is None
+
+
+def test_agent_node_uses_sections_for_long_files(tmp_path, monkeypatch):
+    """長文件：只有確定性抽取不完整的卡片交給 LLM，不呼叫 ReAct agent"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATCOM_SECTION_EXTRACTION_MIN_CHARS", "100")
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "decks")))
+    monkeypatch.setitem(agent.__dict__, "_extraction_cache", ExtractionCache("fp", path=str(tmp_path / "cache.sqlite3")))
+    model = FakeModel()
+    monkeypatch.setitem(agent.__dict__, "model", model)
+
+    class NoLLM:
+        def invoke(self, state):
+            raise AssertionError("ReAct agent should not be called")
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", NoLLM())
+    content = PC9_TEXT.replace("- CHRDTP=3.7402, SSPN=16.6076, SSPNE=15.0131", "- 翼尖弦長約 3.74 ft")
+    result = agent.agent_node({
+        "messages": [HumanMessage(content="請產生 DATCOM 輸入檔")],
+        "file_content": content,
+        "parsed_file_data": {"has_datcom_data": True},
+        "conversation_id": "sections-test",
+    })
+
+    assert model.calls == ["wing_planform"]
+    assert "翼尖弦長" in model.texts["wing_planform"] and "HTPLNF" not in model.texts["wing_planform"]
+    assert result["latest_datcom"]["extraction"] == "sections"
+    assert result["latest_datcom"]["token_usage"] == {"prompt_tokens": 100, "completion_tokens": 20}
+    assert agent._extraction_cache.stats()["entries"] == 1
+
+
+def test_repair_reprompts_only_failing_card(pc9_input):
+    """NALPHA 與 ALSCHD 長度不符：只重新抽取 flight_conditions，並附上 Pydantic 錯誤"""
+    bad = {**PC9_ARGS, "flight_conditions": {**PC9_ARGS["flight_conditions"], "NALPHA": 5}}
+    model = FakeModel()
+    result = repair_cards(model, bad, source=PC9_TEXT)
+
+    assert model.calls == ["flight_conditions"]
+    assert (result.attempts, result.repaired, result.errors) == (1, ["flight_conditions"], {})
+    assert result.datcom_input == pc9_input
+    assert result.token_usage == {"prompt_tokens": 100, "completion_tokens": 20}
+    # prompt 附上原本的值與 Pydantic 錯誤原文，來源只有該卡片的區段
+    assert '"NALPHA": 5' in model.instructions["flight_conditions"]
+    assert "must match NALPHA (5)" in model.instructions["flight_conditions"]
+    assert "攻角值" in model.texts["flight_conditions"] and "WGPLNF" not in model.texts["flight_conditions"]
+
+
+def test_repair_retries_are_capped():
+    """LLM 一直回傳錯誤的卡片時，最多重試 max_retries 輪"""
+    bad_body = {**PC9_ARGS["body"], "R": PC9_ARGS["body"]["R"][:-1]}
+    model = FakeModel(cards={"body": bad_body})
+    result = repair_cards(model, {**PC9_ARGS, "body": bad_body}, max_retries=2)
+
+    assert model.calls == ["body", "body"]
+    assert result.attempts == 2
+    assert list(result.errors) == ["body"]
+    assert result.datcom_input is None
+
+
+def test_tool_repairs_failing_card(tmp_path, monkeypatch, pc9_input):
+    """write_datcom_file 驗證失敗時在 tool 內修復，不回到 ReAct 重新產生全部參數"""
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "decks")))
+    model = FakeModel()
+    monkeypatch.setitem(agent.__dict__, "model", model)
+
+    bad_body = {**PC9_ARGS["body"], "NX": 8}
+    reply = agent.write_datcom_file.func(
+        **{**PC9_ARGS, "body": bad_body}, state={"conversation_id": "repair-test", "file_content": PC9_TEXT}
+    )
+
+    assert reply.startswith("✅"), reply
+    assert model.calls == ["body"]
+    summary = agent._last_datcom_summary.pop("repair-test")
+    assert summary["repair"] == {
+        "attempts": 1, "cards": ["body"], "token_usage": {"prompt_tokens": 100, "completion_tokens": 20},
+    }
+
+
+def test_tool_reports_failed_repair_calls(tmp_path, monkeypatch):
+    """修復的 LLM 呼叫失敗時，tool 回覆說明已嘗試修復以及失敗原因"""
+    class FailingModel:
+        def with_structured_output(self, schema, **kwargs):
+            class Structured:
+                def invoke(self, messages):
+                    raise ConnectionError("endpoint unreachable")
+            return Structured()
+
+    monkeypatch.setitem(agent.__dict__, "model", FailingModel())
+    monkeypatch.setenv("DATCOM_REPAIR_MAX_RETRIES", "1")
+    bad_body = {**PC9_ARGS["body"], "NX": 8}
+
+    reply = agent.write_datcom_file.func(**{**PC9_ARGS, "body": bad_body}, state={"conversation_id": "repair-fail"})
+
+    assert reply.startswith("❌ Validation failed for body after 1 repair attempt(s)"), reply
+    assert "repair call for body failed: ConnectionError: endpoint unreachable" in reply
@@ -0,0 +1,67 @@
+"""
+Tests for the flight envelope sweep planner
+"""
+import numpy as np
+import pytest
+
+from datcom_tool_agent.deck_reader import parse_deck
+from datcom_tool_agent.output_reader import CoefficientTable, For006Results
+from datcom_tool_agent.sweep import plan_sweep
+
+
+def test_paired_sweep_uses_minimum_number_of_legal_cases(pc9_input):
+    alpha = np.linspace(-10.0, 20.0, 45)
+    mach = np.linspace(0.2, 0.6, 25)
+    plan = plan_sweep(pc9_input, alpha, mach, [10000.0])
+
+    # ceil(45/20) × ceil(25/20) = 3 × 2
+    assert len(plan.cases) == 6
+    for case in plan.cases:
+        fc = case.datcom_input.flight_conditions
+        assert fc.NALPHA <= 20 and fc.NMACH <= 20 and fc.NALT == fc.NMACH
+        assert case.datcom_input.body == pc9_input.body
+    # 每個 (alpha, 條件) 網格點剛好出現一次
+    covered = sorted((a, c) for case in plan.cases for a in case.alpha_index for c in case.condition_index)
+    assert covered == [(a, c) for a in range(45) for c in range(25)]
+
+
+def test_multi_case_deck_round_trips(pc9_input):
+    plan = plan_sweep(pc9_input, range(30), [0.3, 0.5], [0.0, 5000.0], cartesian=True)
+    cases = parse_deck(plan.render())
+
+    assert [c.case_id for c in cases] == plan.case_ids
+    for parsed, case in zip(cases, plan.cases):
+        assert parsed.datcom_input == case.datcom_input
+
+
+def test_stitch_rebuilds_envelope_grid(pc9_input):
+    alpha = [float(a) for a in range(25)]
+    plan = plan_sweep(pc9_input, alpha, [0.3, 0.5], [0.0, 5000.0], cartesian=True)
+
+    # 模擬 DATCOM 輸出：CL = alpha + 10 * Mach + altitude / 1e4
+    tables = {}
+    for case in plan.cases:
+        case_alpha = np.array([alpha[i] for i in case.alpha_index])
+        for c in case.condition_index:
+            mach, alt = plan.mach[c], plan.altitude[c]
+            tables[(case.case_id, "CONFIGURATION", mach, alt)] = CoefficientTable(
+                case_alpha, {"CL": case_alpha + 10 * mach + alt / 1e4}
+            )
+
+    grid = plan.stitch(For006Results(tables), "CL")
+    assert grid.shape == (25, 2, 2)
+    expected = (np.array(alpha)[:, None, None] + 10 * np.array([0.3, 0.5])[None, :, None]
+                + np.array([0.0, 0.5])[None, None, :])
+    np.testing.assert_allclose(grid, expected)
+
+
+def test_write_decks(pc9_input, tmp_path):
+    plan = plan_sweep(pc9_input, range(21), [0.5], [0.0])
+    paths = plan.write_decks(str(tmp_path))
+    assert len(paths) == 2
+    assert [parse_deck(open(p).read())[0].case_id for p in paths] == plan.case_ids
+
+
+def test_rejects_mismatched_paired_schedules(pc9_input):
+    with pytest.raises(ValueError, match="cartesian=True"):
+        plan_sweep(pc9_input, [0.0], [0.3, 0.5], [0.0, 1.0, 2.0])
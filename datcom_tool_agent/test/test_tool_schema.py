@@ -0,0 +1,137 @@
+"""
+Tests for the nested write_datcom_file tool schema
+"""
+import json
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from datcom_tool_agent import deck_cache
+from datcom_tool_agent.codec import decode_datcom_input
+from datcom_tool_agent.data_model import BODYArray
+from datcom_tool_agent.test.conftest import make_pc9_input
+from datcom_tool_agent.tool_schema import build_datcom_input, datcom_tool_schema
+
+PC9_ARGS = {
+    "flight_conditions": {
+        "ALSCHD": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0], "MACH": [0.5489], "ALT": [10000.0], "WT": 5180.0,
+    },
+    "synthesis": {
+        "XCG": 11.3907, "ZCG": 0.0, "XW": 11.1070, "ZW": -1.6339, "ALIW": 1.0,
+        "XH": 29.1178, "ZH": 0.7940, "ALIH": -2.0, "XV": 26.4633, "ZV": 1.3615,
+    },
+    "body": {
+        "X": [0.0, 2.2428, 2.5098, 8.4711, 14.4619, 16.8209, 20.4396, 29.7310, 31.4337],
+        "R": [0.0, 0.7710, 0.8990, 1.6010, 1.6010, 1.6010, 1.4797, 0.5906, 0.0000],
+        "ZU": [0.0, 0.8629, 0.9613, 1.7028, 3.6385, 3.5531, 2.4508, 1.3519, 1.3451],
+        "ZL": [0.0, -0.7546, -1.3123, -1.9727, -1.9783, -1.7487, -1.3615, -0.2625, 0.7054],
+        "ITYPE": 2, "METHOD": 1,
+    },
+    "wing_planform": {
+        "NACA_W": "6-63-415", "CHRDTP": 3.7402, "SSPN": 16.6076, "SSPNE": 15.0131,
+        "CHRDR": 6.2336, "SAVSI": 4.0, "CHSTAT": 0.0, "TWISTA": -2.0, "DHDADI": 7.0,
+    },
+    "horizontal_tail_planform": {
+        "NACA_H": "4-0012", "CHRDTP": 2.1325, "SSPN": 6.0105, "SSPNE": 6.0105,
+        "CHRDR": 4.2651, "SAVSI": 13.0, "CHSTAT": 0.0, "TWISTA": -2.0, "DHDADI": 7.0,
+    },
+    "vertical_tail_planform": {
+        "NACA_V": "4-0012", "CHRDTP": 2.3734, "SSPN": 5.3642, "SSPNE": 5.3642,
+        "CHRDR": 4.6916, "SAVSI": 12.2, "CHSTAT": 0.0,
+    },
+}
+
+
+def test_schema_is_generated_once():
+    """schema 只產生一次，之後回傳同一個物件"""
+    assert datcom_tool_schema() is datcom_tool_schema()
+
+
+def test_schema_omits_derived_fields():
+    """數量欄位與只有一個合法值的 TYPE 不出現在 schema 中"""
+    properties = datcom_tool_schema()["properties"]
+    flight_conditions = properties["flight_conditions"]["properties"]
+    assert not {"NALPHA", "NMACH", "NALT"} & set(flight_conditions)
+    assert "NX" not in properties["body"]["properties"]
+    assert "TYPE" not in properties["wing_planform"]["properties"]
+
+    # 清單欄位是 number array，而不是逗號分隔字串
+    assert flight_conditions["ALSCHD"] == {
+        "type": "array", "items": {"type": "number"}, "maxItems": 20,
+        "description": flight_conditions["ALSCHD"]["description"],
+    }
+    assert properties["body"]["properties"]["ITYPE"]["enum"] == [1, 2]
+    assert "翼" not in str(datcom_tool_schema())
+
+
+def test_build_datcom_input_fills_counts():
+    """由巢狀參數建立的 DatcomInput 與 PC-9 範例相同"""
+    datcom_input = build_datcom_input(PC9_ARGS)
+    assert datcom_input == make_pc9_input()
+    assert datcom_input.flight_conditions.NALPHA == 6
+    assert datcom_input.body.NX == 9
+    assert isinstance(datcom_input.body, BODYArray)
+
+
+def test_build_datcom_input_rejects_bad_body():
+    """機身站位幾何錯誤時由 BODYArray 報錯"""
+    args = {**PC9_ARGS, "body": {**PC9_ARGS["body"], "X": list(reversed(PC9_ARGS["body"]["X"]))}}
+    with pytest.raises(ValidationError, match="station"):
+        build_datcom_input(args)
+
+
+def test_write_datcom_file_tool(tmp_path, monkeypatch):
+    """直接呼叫 tool：寫出 for005.dat 並記錄 summary"""
+    from datcom_tool_agent import agent
+
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+
+    reply = agent.write_datcom_file.func(**PC9_ARGS, state={"conversation_id": "schema-test"})
+    assert reply.startswith("✅"), reply
+
+    summary = agent._last_datcom_summary.pop("schema-test")
+    assert os.path.exists(summary["output_path"])
+    assert decode_datcom_input(summary["datcom_input"]) == make_pc9_input()
+    # summary 放入 state 後需可 JSON 序列化（checkpoint、LangGraph API、WebUI）
+    assert json.loads(json.dumps(summary))["parameters"]["flight_conditions"]["alschd"] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert summary["parameters"]["wing"]["naca"] == "6-63-415"
+
+    # 錯誤以訊息回傳給 LLM，而不是拋出例外（不做卡片修復）
+    monkeypatch.setenv("DATCOM_REPAIR_MAX_RETRIES", "0")
+    bad = {**PC9_ARGS, "wing_planform": {**PC9_ARGS["wing_planform"], "CHRDR": "wide"}}
+    reply = agent.write_datcom_file.func(**bad, state={"conversation_id": "schema-test"})
+    assert reply.startswith("❌ Validation failed for wing_planform"), reply
+
+
+def test_tool_runs_through_react_agent_without_file_content(tmp_path, monkeypatch):
+    """經由 create_react_agent 的 ToolNode 呼叫（state 注入）：只有對話、沒有 file_content 時也能寫檔"""
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    from datcom_tool_agent import agent
+
+    class ToolCallingModel(GenericFakeChatModel):
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "cache")))
+    model = ToolCallingModel(messages=iter([
+        AIMessage(content="", tool_calls=[{"name": "write_datcom_file", "args": PC9_ARGS, "id": "call-1"}]),
+        AIMessage(content="done"),
+    ]))
+    # 以 fake model 建立真正的 ReAct agent（直接寫入模組 globals，不觸發 lazy factory）
+    monkeypatch.setitem(agent.__dict__, "model", model)
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", agent._build_base_agent())
+
+    result = agent.app.invoke({
+        "messages": [HumanMessage(content="請產生 PC-9 的 DATCOM 檔案")],
+        "conversation_id": "react-test",
+    })
+
+    tool_reply = next(message for message in result["messages"] if message.type == "tool")
+    assert tool_reply.content.startswith("✅"), tool_reply.content
+    assert result["latest_datcom"]["extraction"] == "llm"
+    assert decode_datcom_input(result["latest_datcom"]["datcom_input"]) == make_pc9_input()
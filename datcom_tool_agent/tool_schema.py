@@ -0,0 +1,132 @@
+"""
+Structured tool schema for write_datcom_file
+直接由 data_model 的 Pydantic models 產生巢狀的 tool 參數 schema：
+每張卡片一個 object、清單欄位是真正的 number array，而不是 57 個平面參數與逗號分隔字串。
+
+- 數量欄位（NALPHA、NMACH、NALT、NX）由清單長度自動填入，不需要 LLM 提供
+- 只有一個合法值的欄位（TYPE）不列入 schema
+- 描述只保留英文部分；三張翼面卡片共用的欄位描述只在第一次出現時列出，
+  以減少每次呼叫的 token
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, get_args, get_origin
+
+from pydantic import ValidationError
+
+from datcom_tool_agent.data_model import COUNT_FIELDS, BODYArray, DatcomInput
+
+# FLTCON / BODY 清單欄位的最大長度（對應數量欄位的 le=20）
+MAX_LIST_LENGTH = 20
+
+# 描述中的中文註解，例如 "Tip chord (翼尖弦長)" → "Tip chord"
+_CJK_NOTE = re.compile(r"\s*\([^)]*[一-鿿][^)]*\)")
+
+
+def _short_description(text: str) -> str:
+    return _CJK_NOTE.sub("", text or "").strip()
+
+
+def _field_schema(annotation) -> Dict[str, Any]:
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        return {"type": "array", "items": {"type": "number"}, "maxItems": MAX_LIST_LENGTH}
+    if origin is Literal:
+        return {"enum": list(get_args(annotation))}
+    if annotation is int:
+        return {"type": "integer"}
+    if annotation is str:
+        return {"type": "string"}
+    return {"type": "number"}
+
+
+def _card_schema(attribute: str, model_class, seen: set) -> Dict[str, Any]:
+    derived = set(COUNT_FIELDS.get(attribute, {}).values())
+    properties, required = {}, []
+    for name, field in model_class.model_fields.items():
+        if name in derived:
+            continue
+        if get_origin(field.annotation) is Literal and len(get_args(field.annotation)) == 1:
+            continue
+        schema = _field_schema(field.annotation)
+        description = _short_description(field.description)
+        if description and (name, description) not in seen:
+            schema["description"] = description
+            seen.add((name, description))
+        if field.is_required():
+            required.append(name)
+        else:
+            schema["default"] = field.default
+        properties[name] = schema
+    schema = {"type": "object", "properties": properties, "required": required}
+    description = _short_description((model_class.__doc__ or "").strip().splitlines()[0].split(" - ")[0])
+    if description:
+        schema["description"] = description
+    return schema
+
+
+@lru_cache(maxsize=None)
+def _cached_schema() -> Dict[str, Any]:
+    seen = set()
+    properties = {
+        attribute: _card_schema(attribute, field.annotation, seen)
+        for attribute, field in DatcomInput.model_fields.items()
+    }
+    properties["case_id"] = {"type": "string", "default": "PC-9", "description": "Case identifier"}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(DatcomInput.model_fields),
+    }
+
+
+def datcom_tool_schema() -> Dict[str, Any]:
+    """write_datcom_file 的 JSON schema（只在第一次呼叫時產生）"""
+    return _cached_schema()
+
+
+@lru_cache(maxsize=None)
+def card_tool_schema(attribute: str) -> Dict[str, Any]:
+    """單一卡片的 JSON schema（分段抽取時每張卡片各自一次 structured output 呼叫）"""
+    schema = _card_schema(attribute, DatcomInput.model_fields[attribute].annotation, set())
+    return {"title": attribute, **schema}
+
+
+def _card_data(attribute: str, card: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """複製一張卡片的參數並由清單長度填入數量欄位"""
+    card = dict(card or {})
+    for list_field, count_field in COUNT_FIELDS.get(attribute, {}).items():
+        if list_field in card and count_field not in card:
+            card[count_field] = len(card[list_field])
+    return card
+
+
+def card_errors(cards: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    逐卡片驗證 tool 參數
+
+    Returns:
+        {DatcomInput 屬性: Pydantic 錯誤訊息}；全部通過時為空 dict
+    """
+    errors = {}
+    for attribute, field in DatcomInput.model_fields.items():
+        model_class = BODYArray if attribute == "body" else field.annotation
+        try:
+            model_class.model_validate(_card_data(attribute, cards.get(attribute)))
+        except ValidationError as e:
+            errors[attribute] = str(e)
+    return errors
+
+
+def build_datcom_input(cards: Dict[str, Dict[str, Any]]) -> DatcomInput:
+    """
+    將 tool 參數（每張卡片一個 dict）組成 DatcomInput
+
+    數量欄位由清單長度填入；BODY 以 BODYArray 建立，一併檢查站位幾何。
+
+    Raises:
+        pydantic.ValidationError: 參數不符合 data_model 的規則
+    """
+    data = {attribute: _card_data(attribute, cards.get(attribute)) for attribute in DatcomInput.model_fields}
+    data["body"] = BODYArray.model_validate(data["body"])
+    return DatcomInput.model_validate(data)
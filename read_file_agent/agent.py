@@ -10,9 +10,13 @@ from langgraph.graph import StateGraph, START, END
 # Use SupervisorState to include parsed_file_data field
 from supervisor_agent.utils.state import SupervisorState
 from langchain_core.messages import AIMessage
+from supervisor_agent.utils.lazy import LazyAttributes
 
+# 預設讀取的文件
+MSG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'msg.txt')
 
-def _parse_file_content(content: str) -> Dict[str, Any]:
+
+def parse_file_content(content: str) -> Dict[str, Any]:
     """
     解析檔案內容，提取結構化資料
 
@@ -71,10 +75,8 @@ def read_file_node(state: SupervisorState) -> dict:
     讀取 msg.txt 文件並存到 state
     這個 node 不使用 LLM，直接讀檔
     """
-    # 計算文件路徑 - 正確路徑應該是 my_agent/data/msg.txt
-    current_file_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(current_file_dir, 'data')
-    file_path = os.path.join(data_dir, 'msg.txt')
+    # 文件路徑 - read_file_agent/data/msg.txt
+    file_path = MSG_FILE_PATH
 
     print(f"\n📂 正在讀取文件: {file_path}")
 
@@ -88,7 +90,7 @@ def read_file_node(state: SupervisorState) -> dict:
         print("=" * 60)
 
         # 📝 解析檔案內容，提取結構化資料
-        parsed_data = _parse_file_content(content)
+        parsed_data = parse_file_content(content)
 
         # 創建 AI 回應訊息（用於 supervisor 溝通）
         response = AIMessage(
@@ -117,21 +119,25 @@ def read_file_node(state: SupervisorState) -> dict:
             "file_content": error_msg
         }
 
-# 構建最簡單的 graph: START → read_file → END
-graph_builder = StateGraph(SupervisorState)
+def _build_graph():
+    """構建最簡單的 graph: START → read_file → END"""
+    graph_builder = StateGraph(SupervisorState)
+
+    # 添加讀檔節點
+    graph_builder.add_node("read_file", read_file_node)
 
-# 添加讀檔節點
-graph_builder.add_node("read_file", read_file_node)
+    # 設置流程: START → read_file → END
+    graph_builder.add_edge(START, "read_file")
+    graph_builder.add_edge("read_file", END)
 
-# 設置流程: START → read_file → END
-graph_builder.add_edge(START, "read_file")
-graph_builder.add_edge("read_file", END)
+    # 編譯
+    graph = graph_builder.compile()
 
-# 編譯
-graph = graph_builder.compile()
+    # 設定 graph 名稱，這樣可以被 supervisor 識別
+    graph.name = "read_file_agent"
+    return graph
 
-# 設定 graph 名稱，這樣可以被 supervisor 識別
-graph.name = "read_file_agent"
 
-# Export as app
-app = graph
+# graph 在第一次使用時才編譯；Export as app（同一個 graph）
+_lazy = LazyAttributes(globals(), graph=_build_graph, app=lambda: _lazy.get("graph"))
+__getattr__ = _lazy.module_getattr
@@ -1,11 +1,13 @@
-from langchain_openai import ChatOpenAI
 from read_file_agent.utils.tools import tools
-import os
-
-# Initialize model with your custom config
-model = ChatOpenAI(
-    model="openai/gpt-oss-20b",
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE_URL", "http://172.16.120.65:8087/v1"),
-    api_key=os.getenv("OPENAI_API_KEY") # type: ignore
-)
\ No newline at end of file
+from supervisor_agent.utils.lazy import LazyAttributes
+
+
+def _build_model():
+    """Initialize model with your custom config（與其他 agent 共用同一 endpoint 的連線池）"""
+    from supervisor_agent.utils.llm_client import get_chat_model
+    return get_chat_model("read_file_agent", model="openai/gpt-oss-20b")
+
+
+# model 在第一次使用時才建立
+_lazy = LazyAttributes(globals(), model=_build_model)
+__getattr__ = _lazy.module_getattr
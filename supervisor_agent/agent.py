@@ -3,59 +3,12 @@ Supervisor Multi-Agent System
 Coordinates between read_file_agent, tool_agent, and datcom_tool_agent using supervisor pattern
 Note: tool_agent is kept for system stability, though not actively used
 """
-import os
-from langchain_openai import ChatOpenAI
-from langgraph_supervisor import create_supervisor
-from dotenv import load_dotenv
-
 # 導入自訂的 SupervisorState
+from supervisor_agent.utils.intent_router import build_routed_graph
+from supervisor_agent.utils.lazy import LazyAttributes
 from supervisor_agent.utils.state import SupervisorState
 
-# 方式 1: 從 subgraphs/ 資料夾導入（wrapper）
-# from supervisor_agent.subgraphs.read_file_subgraph import read_file_subgraph
-
-# 方式 2: 直接從 read_file_agent/ 資料夾導入原始 graph（推薦）
-from read_file_agent.agent import graph as read_file_agent
-
-from supervisor_agent.agents.tool_agent import tool_agent  # Kept for stability
-
-# 導入 DATCOM tool agent
-from datcom_tool_agent.agent import datcom_tool_agent
-
-# Load environment
-env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "read_file_agent", ".env")
-load_dotenv(env_path)
-
-# Custom ChatOpenAI that doesn't send parallel_tool_calls parameter
-class CustomChatOpenAI(ChatOpenAI):
-    """Custom ChatOpenAI that doesn't send parallel_tool_calls parameter"""
-
-    def bind_tools(self, tools, **kwargs):
-        # Override to not set parallel_tool_calls
-        kwargs.pop("parallel_tool_calls", None)
-        return super().bind_tools(tools, **kwargs)
-
-
-# Initialize supervisor model
-supervisor_model = CustomChatOpenAI(
-    model=os.getenv("DEFAULT_LLM_MODEL", "openai/gpt-oss-20b"),
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE_URL", "http://172.16.120.65:8089/v1"),
-    api_key=os.getenv("OPENAI_API_KEY")  # type: ignore
-)
-
-# Create supervisor that coordinates all agents
-# 注意：這裡直接使用原始的 read_file_agent（從 read_file_agent/ 資料夾導入）
-# 使用自訂的 SupervisorState 以支援 file_content 欄位
-supervisor = create_supervisor(
-    agents=[read_file_agent, tool_agent, datcom_tool_agent],
-    model=supervisor_model,
-    state_schema=SupervisorState,  # ✅ 使用自訂 state schema
-    parallel_tool_calls=False,  # Disable parallel tool calls for custom OpenAI endpoint
-    # 暫時恢復 handoff_back_messages 以確保多步驟工作流程正常
-    # add_handoff_back_messages=False,  # 這個會導致多步驟流程中斷
-    # output_mode='last_message',  # 這個可能讓 Supervisor 看不到完整歷史
-    prompt="""You are a supervisor managing two main specialized agents:
+SUPERVISOR_PROMPT = """You are a supervisor managing two main specialized agents:
 
 NOTE: tool_agent exists but is NOT actively used - ignore it for routing decisions
 
@@ -107,7 +60,64 @@ YOUR DECISION PROCESS:
 
 REMEMBER: "並"/"and" means DO BOTH STEPS!
 """
-)
 
+
+def _build_supervisor_model():
+    """Initialize supervisor model（共用連線池；supervisor 預設使用 8089 endpoint）"""
+    from supervisor_agent.utils.llm_client import get_chat_model
+    return get_chat_model("supervisor", default_base_url="http://172.16.120.65:8089/v1")
+
+
+def _build_supervisor():
+    """Create supervisor that coordinates all agents"""
+    from langgraph_supervisor import create_supervisor
+
+    # 方式 1: 從 subgraphs/ 資料夾導入（wrapper）
+    # from supervisor_agent.subgraphs.read_file_subgraph import read_file_subgraph
+
+    # 方式 2: 直接從 read_file_agent/ 資料夾導入原始 graph（推薦）
+    from read_file_agent.agent import graph as read_file_agent
+
+    from supervisor_agent.agents.tool_agent import tool_agent  # Kept for stability
+
+    # 導入 DATCOM tool agent
+    from datcom_tool_agent.agent import datcom_tool_agent
+
+    # 注意：這裡直接使用原始的 read_file_agent（從 read_file_agent/ 資料夾導入）
+    # 使用自訂的 SupervisorState 以支援 file_content 欄位
+    return create_supervisor(
+        agents=[read_file_agent, tool_agent, datcom_tool_agent],
+        model=_lazy.get("supervisor_model"),
+        state_schema=SupervisorState,  # ✅ 使用自訂 state schema
+        parallel_tool_calls=False,  # Disable parallel tool calls for custom OpenAI endpoint
+        # 暫時恢復 handoff_back_messages 以確保多步驟工作流程正常
+        # add_handoff_back_messages=False,  # 這個會導致多步驟流程中斷
+        # output_mode='last_message',  # 這個可能讓 Supervisor 看不到完整歷史
+        prompt=SUPERVISOR_PROMPT,
+    )
+
+
+def _build_app():
+    """
+    預先路由 + supervisor：常見請求（讀檔 / 產生 DATCOM / 讀檔並產生）直接依固定順序
+    執行 agents，只有無法辨識的請求才由 supervisor LLM 路由（見 utils/intent_router.py）
+    """
+    from read_file_agent.agent import graph as read_file_agent
+    from datcom_tool_agent.agent import datcom_tool_agent
+
+    graph = build_routed_graph(
+        _lazy.get("supervisor").compile(),
+        {"read_file_agent": read_file_agent, "datcom_tool_agent": datcom_tool_agent},
+    )
+    return graph.compile()
+
+
+# model、子 agent 與 graph 都在第一次使用 app 時才建立並編譯（import 本模組很快）
 # Export as app for LangGraph deployment
-app = supervisor.compile()
+_lazy = LazyAttributes(
+    globals(),
+    supervisor_model=_build_supervisor_model,
+    supervisor=_build_supervisor,
+    app=_build_app,
+)
+__getattr__ = _lazy.module_getattr
@@ -4,14 +4,10 @@ Uses create_react_agent for simple tool-calling workflow
 """
 import os
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from dotenv import load_dotenv
 from functools import wraps
 
-# Load environment from read_file_agent directory
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "read_file_agent", ".env")
-load_dotenv(env_path)
+from supervisor_agent.utils.lazy import LazyAttributes
 
 
 @tool
@@ -35,28 +31,25 @@ def read_msg_file() -> str:
         return error_msg
 
 
-# Initialize model
-# Note: Custom OpenAI endpoint may not support all OpenAI parameters
-class CustomChatOpenAI(ChatOpenAI):
-    """Custom ChatOpenAI that doesn't send parallel_tool_calls parameter"""
+def _build_model():
+    """
+    Initialize model
+    Note: Custom OpenAI endpoint may not support all OpenAI parameters
+    """
+    from supervisor_agent.utils.llm_client import get_chat_model
+    return get_chat_model("read_file_agent")
 
-    def bind_tools(self, tools, **kwargs):
-        # Override to not set parallel_tool_calls
-        kwargs.pop("parallel_tool_calls", None)
-        return super().bind_tools(tools, **kwargs)
 
+def _build_read_file_agent():
+    """Create read_file_agent using prebuilt component"""
+    return create_react_agent(
+        model=_lazy.get("model"),
+        tools=[read_msg_file],
+        prompt="You are a file reading specialist. Your job is to read files when requested. Use the read_msg_file tool to read the msg.txt file.",
+        name="read_file_agent"
+    )
 
-model = CustomChatOpenAI(
-    model=os.getenv("DEFAULT_LLM_MODEL", "openai/gpt-oss-20b"),
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE_URL", "http://172.16.120.65:8087/v1"),
-    api_key=os.getenv("OPENAI_API_KEY")  # type: ignore
-)
 
-# Create read_file_agent using prebuilt component
-read_file_agent = create_react_agent(
-    model=model,
-    tools=[read_msg_file],
-    prompt="You are a file reading specialist. Your job is to read files when requested. Use the read_msg_file tool to read the msg.txt file.",
-    name="read_file_agent"
-)
+# model / read_file_agent 在第一次使用時才建立
+_lazy = LazyAttributes(globals(), model=_build_model, read_file_agent=_build_read_file_agent)
+__getattr__ = _lazy.module_getattr
@@ -2,16 +2,11 @@
 Tool Agent - Handles general tool operations
 Uses create_react_agent with basic utility tools
 """
-import os
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from dotenv import load_dotenv
 from datetime import datetime
 
-# Load environment from read_file_agent directory
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "read_file_agent", ".env")
-load_dotenv(env_path)
+from supervisor_agent.utils.lazy import LazyAttributes
 
 
 @tool
@@ -45,27 +40,22 @@ def reverse_string(text: str) -> str:
     return f"Reversed: {text[::-1]}"
 
 
-# Initialize model
-class CustomChatOpenAI(ChatOpenAI):
-    """Custom ChatOpenAI that doesn't send parallel_tool_calls parameter"""
+def _build_model():
+    """Initialize model"""
+    from supervisor_agent.utils.llm_client import get_chat_model
+    return get_chat_model("tool_agent")
 
-    def bind_tools(self, tools, **kwargs):
-        # Override to not set parallel_tool_calls
-        kwargs.pop("parallel_tool_calls", None)
-        return super().bind_tools(tools, **kwargs)
 
+def _build_tool_agent():
+    """Create tool_agent using prebuilt component"""
+    return create_react_agent(
+        model=_lazy.get("model"),
+        tools=[get_current_time, calculate, reverse_string],
+        prompt="You are a general utility assistant. You can get the current time, perform calculations, and reverse strings. Use these tools to help users with their requests.",
+        name="tool_agent"
+    )
 
-model = CustomChatOpenAI(
-    model=os.getenv("DEFAULT_LLM_MODEL", "openai/gpt-oss-20b"),
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE_URL", "http://172.16.120.65:8087/v1"),
-    api_key=os.getenv("OPENAI_API_KEY")  # type: ignore
-)
 
-# Create tool_agent using prebuilt component
-tool_agent = create_react_agent(
-    model=model,
-    tools=[get_current_time, calculate, reverse_string],
-    prompt="You are a general utility assistant. You can get the current time, perform calculations, and reverse strings. Use these tools to help users with their requests.",
-    name="tool_agent"
-)
+# model / tool_agent 在第一次使用時才建立
+_lazy = LazyAttributes(globals(), model=_build_model, tool_agent=_build_tool_agent)
+__getattr__ = _lazy.module_getattr
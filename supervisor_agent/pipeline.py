@@ -0,0 +1,211 @@
+"""
+Fixed DATCOM pipeline graph for batch and API callers
+非對話的呼叫者每次都做同樣的事：讀取輸入 → 抽取參數 → 寫出 for005.dat。
+經過 create_supervisor 會多出 supervisor 的路由 LLM 呼叫、handoff 訊息與
+remaining_steps 的計數，這裡改用固定的邊：
+
+    START → read_file → generate → END
+
+- read_file: 沒有傳入 file_content 時讀取 msg.txt（read_file_node）；有傳入時只解析內容
+- generate: datcom_tool_agent 的 agent_node（先做確定性抽取 / 快取 / 分段抽取，
+  必要時才呼叫 ReAct agent）
+
+使用與 supervisor 相同的 SupervisorState：
+
+    from supervisor_agent.pipeline import pipeline
+    result = pipeline.invoke({"file_content": text, "conversation_id": "batch-001"})
+    result["latest_datcom"]["output_path"]
+
+    pipeline.batch([{"file_content": a}, {"file_content": b}])
+
+fanout_pipeline 一次處理多個檔案，或描述多架飛機的單一檔案（extraction.split_aircraft），
+以 LangGraph 的 Send 為每個項目建立平行的 read → generate 分支：
+
+    START ─Send─→ read_item（每個檔案）─Send─→ generate_item（每架飛機）→ summarize → END
+
+每個分支的結果以 reducer 合併到 state["datcom_results"]（{item_id: 結果}）：
+
+    result = fanout_pipeline.invoke(
+        {"input_files": ["a.txt", "b.dat"], "conversation_id": "batch-001"},
+        {"max_concurrency": 16},  # 同時執行的分支數（LLM 請求另受連線池上限限制）
+    )
+    result["datcom_results"]["a.txt"]["latest_datcom"]["output_path"]
+"""
+import os
+from typing import List, Optional, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, Send
+
+from datcom_tool_agent.extraction import split_aircraft
+from read_file_agent.agent import MSG_FILE_PATH, parse_file_content, read_file_node
+from supervisor_agent.utils.lazy import LazyAttributes, load_environment
+from supervisor_agent.utils.memory_manager import SessionManager
+from supervisor_agent.utils.state import SupervisorState
+
+# 沒有使用者訊息時（API 只傳入 file_content）給 datcom agent 的請求
+PIPELINE_REQUEST = "請根據檔案內容產生 DATCOM 輸入檔"
+
+
+def read_input_node(state: SupervisorState) -> dict:
+    """讀取輸入：有 file_content 時只解析，否則讀取 msg.txt"""
+    content = state.get("file_content")
+    if content:
+        update = {} if state.get("parsed_file_data") is not None else {"parsed_file_data": parse_file_content(content)}
+    else:
+        update = read_file_node(state)
+    if not any(getattr(message, "type", None) == "human" for message in state.get("messages") or []):
+        update["messages"] = [HumanMessage(content=PIPELINE_REQUEST), *update.get("messages", [])]
+    return update
+
+
+def generate_node(state: SupervisorState) -> dict:
+    """抽取參數並寫出 for005.dat（datcom_tool_agent 的 agent_node）"""
+    from datcom_tool_agent import agent
+    return agent.agent_node(state)
+
+
+def _build_pipeline():
+    """Build the static read → generate graph"""
+    load_environment()
+    graph_builder = StateGraph(SupervisorState)
+    graph_builder.add_node("read_file", read_input_node)
+    graph_builder.add_node("generate", generate_node)
+    graph_builder.add_edge(START, "read_file")
+    graph_builder.add_edge("read_file", "generate")
+    graph_builder.add_edge("generate", END)
+
+    graph = graph_builder.compile()
+    graph.name = "datcom_pipeline"
+    return graph
+
+
+# ----------------------------------------------------------------------
+# Fan-out over multiple files / aircraft
+# ----------------------------------------------------------------------
+class DatcomItem(TypedDict, total=False):
+    """扇出的一個分支（Send 的輸入）"""
+    item_id: str
+    path: Optional[str]
+    content: Optional[str]
+    conversation_id: str
+    error: str  # 讀取失敗的原因（generate_item 直接記錄為失敗）
+
+
+def _unique(names: List[str], start: int = 0) -> List[str]:
+    """重複的名稱加上序號"""
+    return [
+        name if names.count(name) == 1 else f"{name}[{i}]"
+        for i, name in enumerate(names, start)
+    ]
+
+
+def _item_ids(paths: List[str]) -> List[str]:
+    """以檔名作為 item_id，重複的檔名加上序號"""
+    return _unique([os.path.basename(path) or path for path in paths])
+
+
+def dispatch_inputs(state: SupervisorState) -> List[Send]:
+    """每個輸入檔案一個 read_item 分支；沒有 input_files 時處理 file_content（或 msg.txt）"""
+    # 沒有 conversation_id 時每次呼叫各自一個 session（與 agent_node 相同），
+    # 同時執行的 fan-out 處理同名檔案時不共用 _last_datcom_summary 與輸出目錄
+    base = state.get("conversation_id") or SessionManager.generate_session_id()
+    paths = state.get("input_files") or []
+    if paths:
+        items = [DatcomItem(item_id=item_id, path=path) for item_id, path in zip(_item_ids(paths), paths)]
+    elif state.get("file_content"):
+        items = [DatcomItem(item_id="file_content", content=state["file_content"])]
+    else:
+        items = [DatcomItem(item_id=os.path.basename(MSG_FILE_PATH), path=MSG_FILE_PATH)]
+    return [Send("read_item", {**item, "conversation_id": f"{base}-{item['item_id']}"}) for item in items]
+
+
+def read_item_node(item: DatcomItem) -> Command:
+    """讀取一個檔案，每架飛機（case）一個 generate_item 分支"""
+    content = item.get("content")
+    if content is None:
+        try:
+            with open(item["path"], "r", encoding="utf-8") as f:
+                content = f.read()
+        except OSError as e:
+            return Command(goto=[Send("generate_item", {**item, "error": f"無法讀取文件 - {e}"})])
+
+    aircraft = split_aircraft(content)
+    # 同名的飛機（兩個 `# PC-9`）各自保留一個結果，不在 datcom_results 中互相覆蓋
+    case_ids = _unique([case_id or str(i) for i, (case_id, _) in enumerate(aircraft, 1)], start=1)
+    sends = []
+    for i, (case_id, (_, text)) in enumerate(zip(case_ids, aircraft), 1):
+        item_id = item["item_id"] if len(aircraft) == 1 else f"{item['item_id']}#{case_id}"
+        conversation_id = item["conversation_id"] if len(aircraft) == 1 else f"{item['conversation_id']}-{i}"
+        sends.append(Send("generate_item", DatcomItem(
+            item_id=item_id, path=item.get("path"), content=text, conversation_id=conversation_id,
+        )))
+    return Command(goto=sends)
+
+
+def generate_item_node(item: DatcomItem) -> dict:
+    """對一架飛機執行 datcom agent_node，結果寫入 datcom_results[item_id]"""
+    from datcom_tool_agent import agent
+
+    if item.get("error"):
+        return {"datcom_results": {item["item_id"]: {"status": "error", "path": item.get("path"), "error": item["error"]}}}
+
+    content = item["content"]
+    try:
+        result = agent.agent_node({
+            "messages": [HumanMessage(content=PIPELINE_REQUEST)],
+            "file_content": content,
+            "parsed_file_data": parse_file_content(content),
+            "conversation_id": item["conversation_id"],
+        })
+    except Exception as e:
+        entry = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    else:
+        latest = result.get("latest_datcom")
+        entry = {"status": "ok" if latest is not None else "error", "message": result["messages"][-1].content}
+        if latest is not None:
+            entry["latest_datcom"] = latest
+    if item.get("path"):
+        entry["path"] = item["path"]
+    return {"datcom_results": {item["item_id"]: entry}}
+
+
+def summarize_node(state: SupervisorState) -> dict:
+    """所有分支完成後（defer）整理一則摘要訊息"""
+    results = state.get("datcom_results") or {}
+    ok = {item_id: r for item_id, r in results.items() if r["status"] == "ok"}
+    lines = [f"📦 Generated {len(ok)}/{len(results)} DATCOM file(s)"]
+    for item_id, r in sorted(results.items()):
+        if r["status"] == "ok":
+            lines.append(f"✅ {item_id}: {r['latest_datcom']['output_path']}")
+        else:
+            lines.append(f"❌ {item_id}: {r.get('error') or r.get('message')}")
+    return {"messages": [AIMessage(content="\n".join(lines), name="datcom_pipeline")]}
+
+
+def _build_fanout_pipeline():
+    """Build the Send-based fan-out graph"""
+    load_environment()
+    graph_builder = StateGraph(SupervisorState)
+    graph_builder.add_node("read_item", read_item_node, destinations=("generate_item",))
+    graph_builder.add_node("generate_item", generate_item_node)
+    # defer：等所有 generate_item 分支都完成後只執行一次
+    graph_builder.add_node("summarize", summarize_node, defer=True)
+    graph_builder.add_conditional_edges(START, dispatch_inputs, ["read_item"])
+    graph_builder.add_edge("generate_item", "summarize")
+    graph_builder.add_edge("summarize", END)
+
+    graph = graph_builder.compile()
+    graph.name = "datcom_fanout_pipeline"
+    return graph
+
+
+# 第一次使用時才編譯；Export as app（同一個 graph）
+_lazy = LazyAttributes(
+    globals(),
+    pipeline=_build_pipeline,
+    app=lambda: _lazy.get("pipeline"),
+    fanout_pipeline=_build_fanout_pipeline,
+)
+__getattr__ = _lazy.module_getattr
@@ -0,0 +1,74 @@
+"""
+Benchmark: fan-out pipeline vs 逐一執行 pipeline
+N 個 PC-9 變化（不同重量 / 重心）寫在同一個檔案（每架一個 `# 標題`），比較：
+
+- sequential   每個變化呼叫一次 pipeline.invoke
+- fan-out      fanout_pipeline.invoke 一次，每架飛機一個平行分支（Send）
+
+確定性抽取不需要 LLM，因此以 agent_node 前的 sleep 模擬一次 LLM 抽取的延遲
+（預設 0.5 s，可用第二個參數調整；0 表示只比較確定性路徑）。
+
+    python -m supervisor_agent.test.bench_fanout [variants] [latency_seconds]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+
+
+def _variants(n: int):
+    return [
+        (f"PC-9 v{i}", PC9_TEXT.replace("重量: 5180.0", f"重量: {5000.0 + 10 * i}")
+         .replace("XCG=11.3907", f"XCG={11.0 + 0.01 * i:.4f}"))
+        for i in range(n)
+    ]
+
+
+def run_benchmark(n: int = 40, latency: float = 0.5):
+    from supervisor_agent.pipeline import fanout_pipeline, pipeline
+
+    workdir = tempfile.mkdtemp(prefix="bench_fanout_")
+    os.environ["DATCOM_OUTPUT_DIR"] = os.path.join(workdir, "output")
+    deck_cache._default_cache = deck_cache.DeckCache(root=os.path.join(workdir, "decks"))
+
+    agent_node = agent.agent_node
+
+    def slow_agent_node(state):
+        time.sleep(latency)  # 模擬 LLM 抽取
+        return agent_node(state)
+
+    agent.agent_node = slow_agent_node
+    variants = _variants(n)
+    try:
+        start = time.perf_counter()
+        sequential = [
+            pipeline.invoke({"file_content": f"CASEID {name}\n{text}", "conversation_id": f"seq-{i}"})
+            for i, (name, text) in enumerate(variants)
+        ]
+        sequential_s = time.perf_counter() - start
+
+        fleet = "\n".join(f"# {name}\n{text}" for name, text in variants)
+        start = time.perf_counter()
+        fanout = fanout_pipeline.invoke({"file_content": fleet, "conversation_id": "fanout"}, {"max_concurrency": n})
+        fanout_s = time.perf_counter() - start
+    finally:
+        agent.agent_node = agent_node
+
+    generated = sum(1 for r in fanout["datcom_results"].values() if r["status"] == "ok")
+    assert sum(1 for r in sequential if r.get("latest_datcom")) == n and generated == n
+
+    print("=" * 80)
+    print(f"📊 Fan-out benchmark ({n} aircraft, simulated LLM latency {latency:.2f} s)")
+    print("=" * 80)
+    print(f"  {'sequential pipeline':22s} {sequential_s:8.2f} s")
+    print(f"  {'fan-out (Send)':22s} {fanout_s:8.2f} s   ({sequential_s / fanout_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.5,
+    )
@@ -0,0 +1,39 @@
+"""
+Benchmark: 各模組冷啟動 import 時間
+每個模組在新的 interpreter 中單獨 import，取 RUNS 次中最快的一次，與參考上限比較。
+上限可用 IMPORT_TIME_BUDGET_SCALE 放大（較慢的機器）；超過上限時 exit code 為 1。
+
+    python -m supervisor_agent.test.bench_import_time [runs]
+"""
+import os
+import sys
+
+from supervisor_agent.test.test_import_time import cold_import
+
+# (模組, 冷啟動 import 秒數上限)；原本 eager 建立時 run_generator 約 3.6 s、supervisor 約 2.7 s
+BUDGETS = [
+    ("datcom_tool_agent.run_generator", 1.0),
+    ("datcom_tool_agent.agent", 2.0),
+    ("read_file_agent.agent", 2.0),
+    ("supervisor_agent.agent", 2.0),
+    ("supervisor_agent.pipeline", 2.0),
+    ("supervisor_agent.webui_integration", 2.0),
+]
+
+
+def run_benchmark(runs: int = 3) -> bool:
+    scale = float(os.getenv("IMPORT_TIME_BUDGET_SCALE", "1"))
+    print("=" * 80)
+    print(f"📊 Cold import time (best of {runs}, budget scale {scale:g})")
+    print("=" * 80)
+    ok = True
+    for module, budget in BUDGETS:
+        seconds = min(cold_import([module])[0]["seconds"] for _ in range(runs))
+        within = seconds < budget * scale
+        ok = ok and within
+        print(f"  {'✅' if within else '❌'} {module:36s} {seconds:6.3f} s   (budget {budget * scale:.1f} s)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3) else 1)
@@ -0,0 +1,86 @@
+"""
+Benchmark: 固定 pipeline graph vs supervisor app
+以 PC-9 結構化資料（確定性抽取可完整解析）比較每次請求的延遲與訊息數：
+
+- pipeline                 START → read_file → generate → END
+- app (pre-routed)         supervisor app，常見請求由預先路由直接交給 datcom_tool_agent
+- app (supervisor LLM)     PRE_ROUTER_ENABLED=0，每次 handoff 前由 supervisor LLM 決定
+                           （需要 LLM endpoint；連不上時顯示錯誤）
+
+    python -m supervisor_agent.test.bench_pipeline [runs]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from datcom_tool_agent import deck_cache
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+
+REQUEST = "請根據檔案內容產生 DATCOM 檔案"
+
+
+def _measure(graph, make_input, runs: int):
+    """回傳 (延遲中位數 ms, 最後一次的結果)"""
+    timings, result = [], None
+    for i in range(runs):
+        start = time.perf_counter()
+        result = graph.invoke(make_input(i))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def _message_stats(result) -> dict:
+    messages = result["messages"]
+    return {
+        "messages": len(messages),
+        "handoffs": sum(1 for m in messages if m.type == "tool" and str(m.name or "").startswith("transfer_")),
+        "llm_calls": sum(1 for m in messages if m.type == "ai" and getattr(m, "usage_metadata", None)),
+    }
+
+
+def run_benchmark(runs: int = 20):
+    from supervisor_agent.agent import app
+    from supervisor_agent.pipeline import pipeline
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.environ["DATCOM_OUTPUT_DIR"] = os.path.join(workdir, "output")
+    deck_cache._default_cache = deck_cache.DeckCache(root=os.path.join(workdir, "decks"))
+
+    def pipeline_input(i):
+        return {"file_content": PC9_TEXT, "conversation_id": f"bench-pipeline-{i}"}
+
+    def app_input(i):
+        return {"messages": [{"role": "user", "content": REQUEST}],
+                "file_content": PC9_TEXT, "conversation_id": f"bench-app-{i}"}
+
+    rows = []
+    for label, graph, make_input, pre_router in (
+        ("pipeline", pipeline, pipeline_input, "1"),
+        ("app (pre-routed)", app, app_input, "1"),
+        ("app (supervisor LLM)", app, app_input, "0"),
+    ):
+        os.environ["PRE_ROUTER_ENABLED"] = pre_router
+        try:
+            graph.invoke(make_input(-1))  # warm-up（編譯、import、deck cache）
+            latency, result = _measure(graph, make_input, runs if pre_router == "1" else min(runs, 3))
+            rows.append((label, latency, _message_stats(result), result.get("latest_datcom") is not None))
+        except Exception as e:
+            rows.append((label, None, {"error": f"{type(e).__name__}: {str(e)[:60]}"}, False))
+    os.environ.pop("PRE_ROUTER_ENABLED")
+
+    print("=" * 80)
+    print(f"📊 pipeline vs supervisor app (PC-9 structured input, median of {runs} runs)")
+    print("=" * 80)
+    print(f"  {'graph':22s} {'latency':>10s} {'messages':>9s} {'handoffs':>9s} {'LLM calls':>10s} {'deck':>5s}")
+    for label, latency, stats, generated in rows:
+        if latency is None:
+            print(f"  {label:22s} unavailable - {stats['error']}")
+            continue
+        print(f"  {label:22s} {latency:8.1f}ms {stats['messages']:9d} {stats['handoffs']:9d} "
+              f"{stats['llm_calls']:10d} {'✅' if generated else '❌':>5s}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,15 @@
+"""
+Shared fixtures for supervisor_agent tests
+"""
+import os
+
+import pytest
+
+
+@pytest.fixture
+def llm_credentials(monkeypatch):
+    """
+    建立（但不呼叫）ChatOpenAI 的測試需要 API key；沒有設定時使用假的 key，
+    讓這些不連線的測試在乾淨的環境中也能執行
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY") or "test-key")
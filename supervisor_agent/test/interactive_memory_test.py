@@ -132,8 +132,8 @@ def format_response(result, verbose=False, elapsed_time=None):
         print(f"  ⏱️  執行時間: {elapsed_time:.2f} 秒")
 
     # 檢查是否產生 DATCOM 檔案
-    datcom_file = "datcom_tool_agent/output/for005.dat"
-    if os.path.exists(datcom_file):
+    datcom_file = (result.get("latest_datcom") or {}).get("output_path")
+    if datcom_file and os.path.exists(datcom_file):
         mtime = os.path.getmtime(datcom_file)
         age = time.time() - mtime
         if age < 10:  # 10 秒內修改
@@ -42,8 +42,8 @@ def format_response(result, verbose=False, elapsed_time=None):
         print(f"  file_content: {len(result['file_content'])} 字元")
 
     # 檢查是否產生 DATCOM 檔案
-    datcom_file = "datcom_tool_agent/output/for005.dat"
-    if os.path.exists(datcom_file):
+    datcom_file = (result.get("latest_datcom") or {}).get("output_path")
+    if datcom_file and os.path.exists(datcom_file):
         mtime = os.path.getmtime(datcom_file)
         age = time.time() - mtime
         if age < 10:  # 10 秒內修改
@@ -61,9 +61,11 @@ def format_response(result, verbose=False, elapsed_time=None):
     # 分析工作流程執行情況
     if result.get("messages"):
         messages = result["messages"]
-        agent_transfers = []
+        # 預先路由時 routed_agents 即為執行順序（沒有 transfer_to_* 訊息）
+        routed = result.get("routed_agents")
+        agent_transfers = list(routed) if routed else []
         for msg in messages:
-            if hasattr(msg, 'name') and 'transfer_to_' in str(msg.name):
+            if not routed and hasattr(msg, 'name') and 'transfer_to_' in str(msg.name):
                 agent_name = msg.name.replace('transfer_to_', '')
                 agent_transfers.append(agent_name)
 
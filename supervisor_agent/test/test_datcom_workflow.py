@@ -58,14 +58,11 @@ def test_read_and_generate_datcom():
     print("✅ Test completed!")
     print("=" * 80)
 
-    # Check if output file was created
+    # Check if output file was created（每個 session 各自的輸出路徑記錄在 latest_datcom）
     import os
-    output_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        "datcom_tool_agent", "output", "for005.dat"
-    )
+    output_path = (result.get("latest_datcom") or {}).get("output_path")
 
-    if os.path.exists(output_path):
+    if output_path and os.path.exists(output_path):
         print(f"\n🎉 SUCCESS! DATCOM file created at: {output_path}")
         print("\n📄 File preview:")
         with open(output_path, 'r') as f:
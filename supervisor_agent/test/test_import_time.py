@@ -0,0 +1,62 @@
+"""
+Import-time check: importing agent modules must not build models or graphs
+在新的 interpreter 中依序 import 各模組（冷啟動），檢查沒有載入 LLM client。
+冷啟動時間的量測在 bench_import_time（不以 wall-clock 上限作為測試）。
+
+    python -m pytest -q supervisor_agent/test/test_import_time.py
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 只在建立 model / supervisor 時才需要的套件
+HEAVY_MODULES = ["langchain_openai", "openai", "langgraph_supervisor"]
+
+MODULES = [
+    "datcom_tool_agent.run_generator",
+    "datcom_tool_agent.agent",
+    "read_file_agent.agent",
+    "supervisor_agent.agent",
+    "supervisor_agent.pipeline",
+    "supervisor_agent.webui_integration",
+]
+
+# 每個模組 import 後記錄時間與已載入的 heavy 模組（第一個出現的模組即為載入者）
+_PROBE = """
+import importlib, json, sys, time
+for module in {modules!r}:
+    start = time.perf_counter()
+    importlib.import_module(module)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({{"module": module, "seconds": elapsed,
+                      "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(modules: List[str]) -> List[dict]:
+    """在一個新的 interpreter 中依序 import modules，回傳每個模組的結果"""
+    env = {**os.environ, "PYTHONPATH": ROOT, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test-key")}
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return [json.loads(line) for line in output.strip().splitlines()[-len(modules):]]
+
+
+def test_import_does_not_load_llm_clients():
+    for run in cold_import(MODULES):
+        assert run["loaded"] == [], f"{run['module']} imports {run['loaded']} at import time"
+
+
+def test_app_is_built_once_on_first_access(llm_credentials):
+    """第一次存取 app 時才編譯，之後回傳同一個物件（仍可用 from ... import app）"""
+    from datcom_tool_agent import agent
+
+    from datcom_tool_agent import app
+    assert app is agent.app is agent.datcom_tool_agent
+    assert app.name == "datcom_tool_agent"
+    assert agent._base_datcom_agent is agent._base_datcom_agent
@@ -0,0 +1,145 @@
+"""
+Tests for the deterministic intent pre-router
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from supervisor_agent.utils.intent_router import TRAINING_QUERIES, build_routed_graph, classify_intent
+
+READ, DATCOM = "read_file_agent", "datcom_tool_agent"
+
+
+@pytest.mark.parametrize("query,agents", [
+    # test_stability.py 的查詢
+    ("請讀取 msg.txt 並產生 DATCOM 檔案", [READ, DATCOM]),
+    ("Read msg.txt and generate a DATCOM input file", [READ, DATCOM]),
+    ("can you read the file then write it to datcom file", [READ, DATCOM]),
+    ("讀取檔案然後產生 DATCOM", [READ, DATCOM]),
+    ("請讀取 msg.txt", [READ]),
+    # 其他測試中的查詢
+    ("請讀取 msg.txt 文件並根據內容產生 DATCOM 檔案", [READ, DATCOM]),
+    ("請讀取 msg.txt 文件", [READ]),
+    ("請產生 PC-9 的 DATCOM 檔案：\n\n飛行條件:\nNALPHA=6", [DATCOM]),
+    ("請根據 msg.txt 的資料建立 for005.dat", [READ, DATCOM]),
+])
+def test_common_requests_are_pre_routed(query, agents):
+    assert classify_intent(query).agents == agents
+
+
+@pytest.mark.parametrize("query", [
+    "What's the current time?",
+    "Calculate 123 * 456",
+    "檔案裡有幾個章節？",
+    "如何產生 DATCOM 檔案？",
+    "把 NALPHA 改成 8",
+    "",
+])
+def test_other_requests_fall_through(query):
+    """問句、其他工具或修改要求交給 supervisor LLM"""
+    decision = classify_intent(query)
+    assert decision.agents == [] and decision.source == "supervisor"
+
+
+# 不在 TRAINING_QUERIES 中的改寫
+HELD_OUT = [
+    ("Please read msg.txt, then generate the DATCOM deck", [READ, DATCOM]),
+    ("幫我讀取 msg.txt 然後生成 for005.dat", [READ, DATCOM]),
+    ("load msg.txt and create the for005.dat deck", [READ, DATCOM]),
+    ("生成 DATCOM 輸入檔", [DATCOM]),
+    ("build a DATCOM input file from the data above", [DATCOM]),
+    ("分別產生兩架飛機的 DATCOM 檔案", [DATCOM]),
+    ("open msg.txt", [READ]),
+    ("請開啟 msg.txt 並顯示內容", [READ]),
+    ("讀取檔案後產生 DATCOM 檔案", [READ, DATCOM]),
+    ("請產生 DATCOM 檔案，謝謝", [DATCOM]),
+]
+
+# 否定、含有其他動作、或產出不是輸入檔的請求
+NEGATIVES = [
+    "don't generate DATCOM yet, just read msg.txt",
+    "請不要產生 DATCOM 檔案",
+    "別讀取檔案",
+    "讀取 msg.txt 並計算展弦比",
+    "read msg.txt and email it to me",
+    "讀取檔案然後翻譯成英文",
+    "write a summary of the datcom output",
+    "make a plot of the DATCOM output",
+    "產生 DATCOM 結果的摘要報告",
+    "summarize the datcom output file",
+    # 以「後/再/逗號」接上的其他動作
+    "產生 DATCOM 檔案後執行 DATCOM",
+    "產生 DATCOM 檔案，再幫我算展弦比",
+    "請用 msg.txt 產生 DATCOM 後比較兩架飛機",
+    "generate the DATCOM file, also plot CL",
+    # read_file_agent 只讀取 msg.txt
+    "讀取 for006.dat 的結果",
+    "read notes.txt and generate the DATCOM deck",
+]
+
+
+def test_evaluation_queries_are_held_out():
+    training = {query for query, _ in TRAINING_QUERIES}
+    assert not training & ({query for query, _ in HELD_OUT} | set(NEGATIVES))
+
+
+@pytest.mark.parametrize("query,agents", HELD_OUT)
+def test_held_out_paraphrases_are_pre_routed(query, agents):
+    assert classify_intent(query).agents == agents
+
+
+@pytest.mark.parametrize("query", NEGATIVES)
+def test_negated_or_other_actions_fall_through(query):
+    """「不要產生」「並計算…」「write a summary of …」不能當成讀檔 / 產生請求"""
+    decision = classify_intent(query)
+    assert decision.agents == [] and decision.source == "supervisor"
+
+
+def test_classifier_covers_requests_without_rule_keywords(monkeypatch):
+    decision = classify_intent("把檔案轉成 DATCOM")
+    assert (decision.agents, decision.source) == ([READ, DATCOM], "classifier")
+    assert decision.confidence >= 0.8
+
+    monkeypatch.setenv("PRE_ROUTER_MIN_CONFIDENCE", "0.99")
+    assert classify_intent("把檔案轉成 DATCOM").agents == []
+
+
+def _fake_graph(calls):
+    def node(name):
+        def run(state):
+            calls.append(name)
+            return {"messages": [AIMessage(content=f"{name} done", name=name)]}
+        return run
+
+    return build_routed_graph(node("supervisor"), {READ: node(READ), DATCOM: node(DATCOM)}).compile()
+
+
+def test_routed_graph_skips_supervisor():
+    calls = []
+    result = _fake_graph(calls).invoke({"messages": [HumanMessage(content="請讀取 msg.txt 並產生 DATCOM 檔案")]})
+
+    assert calls == [READ, DATCOM]
+    assert result["routed_agents"] == [READ, DATCOM]
+    assert result["messages"][-1].content == f"{DATCOM} done"
+
+
+def test_unrecognized_request_goes_to_supervisor(monkeypatch):
+    calls = []
+    graph = _fake_graph(calls)
+    graph.invoke({"messages": [HumanMessage(content="What's the current time?")]})
+
+    monkeypatch.setenv("PRE_ROUTER_ENABLED", "0")
+    result = graph.invoke({"messages": [HumanMessage(content="請讀取 msg.txt")]})
+
+    assert calls == ["supervisor", "supervisor"]
+    assert result["routed_agents"] is None
+
+
+def test_app_reads_file_without_supervisor_llm(llm_credentials):
+    """實際的 app：讀檔請求直接交給 read_file_agent，不經 supervisor（不需要 LLM endpoint）"""
+    from supervisor_agent.agent import app
+
+    result = app.invoke({"messages": [HumanMessage(content="請讀取 msg.txt")]})
+
+    assert result["routed_agents"] == [READ]
+    assert result["messages"][-1].name == READ
+    assert result["file_content"] is not None
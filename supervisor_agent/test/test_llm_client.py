@@ -0,0 +1,101 @@
+"""
+Tests for the shared pooled LLM client factory
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from supervisor_agent.utils import llm_client
+from supervisor_agent.utils.llm_client import get_chat_model, get_http_clients
+
+
+@pytest.fixture
+def fresh_pools(monkeypatch):
+    """每個測試使用新的連線池（不影響其他模組已建立的 model）"""
+    monkeypatch.setattr(llm_client, "_endpoints", {})
+    monkeypatch.setattr(llm_client, "load_environment", lambda: None)
+    monkeypatch.delenv("OPENAI_API_BASE_URL", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+
+@pytest.fixture
+def chat_server():
+    """最小的 OpenAI 相容 endpoint，記錄每個請求使用的客戶端連線（port）"""
+    ports = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            ports.append(self.client_address[1])
+            body = json.dumps({
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "test-model",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "ok"}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1", ports
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_pool_per_endpoint(fresh_pools):
+    a = get_chat_model("datcom_tool_agent", default_base_url="http://llm-a/v1")
+    b = get_chat_model("tool_agent", default_base_url="http://llm-a/v1/")
+    c = get_chat_model("supervisor", default_base_url="http://llm-b/v1")
+
+    assert a.http_client is b.http_client and a.http_async_client is b.http_async_client
+    assert a.http_client is not c.http_client
+    assert get_http_clients("http://llm-a/v1")[0] is a.http_client
+
+
+def test_node_overrides(fresh_pools, monkeypatch):
+    """<NODE>_LLM_* 覆寫優先於參數與全域設定"""
+    monkeypatch.setenv("DEFAULT_LLM_MODEL", "global-model")
+    monkeypatch.setenv("DATCOM_TOOL_AGENT_LLM_MODEL", "datcom-model")
+    monkeypatch.setenv("DATCOM_TOOL_AGENT_LLM_TIMEOUT", "30")
+
+    datcom = get_chat_model("datcom_tool_agent", model="code-model")
+    other = get_chat_model("tool_agent")
+    pinned = get_chat_model("read_file_agent", model="code-model", timeout=5)
+
+    assert (datcom.model_name, datcom.request_timeout) == ("datcom-model", 30.0)
+    assert (other.model_name, other.request_timeout) == ("global-model", None)
+    assert (pinned.model_name, pinned.request_timeout) == ("code-model", 5.0)
+
+
+def test_pool_limits_from_environment(fresh_pools, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONNECTIONS", "3")
+    monkeypatch.setenv("LLM_MAX_REQUESTS_PER_SECOND", "2")
+    model = get_chat_model("tool_agent", default_base_url="http://llm-c/v1")
+
+    assert model.http_client._transport._pool._max_connections == 3
+    assert model.rate_limiter is not None
+    assert get_chat_model("supervisor", default_base_url="http://llm-c/v1").rate_limiter is model.rate_limiter
+
+
+def test_agents_reuse_keep_alive_connection(fresh_pools, chat_server):
+    """不同 agent 的 model 依序呼叫同一 endpoint 時重用同一條 TCP 連線"""
+    base_url, ports = chat_server
+    models = [get_chat_model(node, default_base_url=base_url) for node in ("supervisor", "datcom_tool_agent", "tool_agent")]
+
+    for model in models * 2:
+        assert model.invoke("hi").content == "ok"
+
+    assert len(ports) == 6
+    assert len(set(ports)) == 1
@@ -4,6 +4,7 @@
 2. 對話記憶管理
 """
 from supervisor_agent.agent import app
+from datcom_tool_agent.codec import decode_datcom_input
 from supervisor_agent.utils.memory_manager import ConversationMemoryManager, SessionManager
 from langchain_core.messages import HumanMessage
 
@@ -26,8 +27,9 @@ def test_latest_datcom_state():
         print(f"   Case ID: {latest['case_id']}")
         print(f"   Output: {latest['output_path']}")
         print(f"   Generated at: {latest['generated_at']}")
-        print(f"   Wing NACA: {latest['parameters']['wing']['naca']}")
-        print(f"   NALPHA: {latest['parameters']['flight_conditions']['nalpha']}")
+        datcom_input = decode_datcom_input(latest['datcom_input'])
+        print(f"   Wing NACA: {datcom_input.wing_planform.NACA_W}")
+        print(f"   NALPHA: {datcom_input.flight_conditions.NALPHA}")
     else:
         print("\n❌ latest_datcom 未設定")
 
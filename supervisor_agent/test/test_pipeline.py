@@ -0,0 +1,132 @@
+"""
+Tests for the fixed pipeline graph and the Send-based fan-out graph
+"""
+import json
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from datcom_tool_agent import agent, deck_cache
+from datcom_tool_agent.codec import decode_datcom_input
+from datcom_tool_agent.test.test_agent import test_input as PC9_TEXT
+from supervisor_agent import pipeline as pipeline_module
+from supervisor_agent.pipeline import PIPELINE_REQUEST, fanout_pipeline, pipeline
+from supervisor_agent.utils.state import merge_datcom_results
+
+
+@pytest.fixture
+def output_dirs(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATCOM_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(deck_cache, "_default_cache", deck_cache.DeckCache(root=str(tmp_path / "decks")))
+
+
+def test_structured_input_runs_without_llm(tmp_path, output_dirs):
+    """完整的結構化輸入：兩個節點、確定性抽取，沒有 supervisor / handoff 訊息"""
+    result = pipeline.invoke({"file_content": PC9_TEXT, "conversation_id": "pipeline-test"})
+
+    assert [message.type for message in result["messages"]] == ["human", "ai"]
+    assert result["messages"][0].content == PIPELINE_REQUEST
+    assert result["messages"][-1].content.startswith("✅")
+    assert result["parsed_file_data"]["has_datcom_data"] is True
+    latest = result["latest_datcom"]
+    assert latest["extraction"] == "deterministic"
+    assert decode_datcom_input(latest["datcom_input"]).body.NX == 9
+    assert json.loads(json.dumps(latest))["parameters"]["flight_conditions"]["nalpha"] == 6
+    assert (tmp_path / "output").exists()
+
+
+def test_read_node_keeps_caller_request_and_parsed_data():
+    state = {
+        "messages": [HumanMessage(content="產生 DATCOM")],
+        "file_content": PC9_TEXT,
+        "parsed_file_data": {"has_datcom_data": True},
+    }
+    assert pipeline_module.read_input_node(state) == {}
+
+
+def test_pipeline_is_exported_as_app():
+    assert pipeline_module.app is pipeline
+    assert set(pipeline.get_graph().nodes) == {"__start__", "read_file", "generate", "__end__"}
+
+
+def test_merge_datcom_results():
+    assert merge_datcom_results(None, {"a": {"status": "ok"}}) == {"a": {"status": "ok"}}
+    assert merge_datcom_results({"a": {"status": "ok"}}, {"b": {"status": "error"}}) == {
+        "a": {"status": "ok"}, "b": {"status": "error"},
+    }
+
+
+def test_fanout_over_files_and_aircraft(tmp_path, output_dirs):
+    """每個檔案、檔案中的每架飛機各一個分支，結果合併到 datcom_results"""
+    (tmp_path / "pc9.txt").write_text(PC9_TEXT, encoding="utf-8")
+    (tmp_path / "fleet.txt").write_text(
+        "# PC-9\n" + PC9_TEXT + "\n# PC-9 heavy\n" + PC9_TEXT.replace("重量: 5180.0", "重量: 5500.0"),
+        encoding="utf-8",
+    )
+    files = [str(tmp_path / name) for name in ("pc9.txt", "fleet.txt", "missing.txt")]
+
+    result = fanout_pipeline.invoke({"input_files": files, "conversation_id": "fleet"})
+
+    results = result["datcom_results"]
+    assert sorted(results) == ["fleet.txt#PC-9", "fleet.txt#PC-9 heavy", "missing.txt", "pc9.txt"]
+    assert results["missing.txt"]["status"] == "error"
+    heavy = results["fleet.txt#PC-9 heavy"]["latest_datcom"]
+    assert heavy["case_id"] == "PC-9 heavy" and heavy["extraction"] == "deterministic"
+    assert decode_datcom_input(heavy["datcom_input"]).flight_conditions.WT == 5500.0
+    # 每個分支各自的輸出目錄
+    paths = {r["latest_datcom"]["output_path"] for r in results.values() if r["status"] == "ok"}
+    assert len(paths) == 3
+    # summarize 在所有分支完成後只執行一次
+    assert len(result["messages"]) == 1
+    assert result["messages"][0].content.startswith("📦 Generated 3/4")
+
+
+def test_fanout_duplicate_aircraft_names_are_kept(tmp_path, output_dirs):
+    """同一檔案中重複的 `# PC-9` 標題各自有一個結果，不互相覆蓋"""
+    fleet = "# PC-9\n" + PC9_TEXT + "\n# PC-9\n" + PC9_TEXT.replace("重量: 5180.0", "重量: 5500.0")
+
+    result = fanout_pipeline.invoke({"file_content": fleet, "conversation_id": "dupes"})
+
+    results = result["datcom_results"]
+    assert sorted(results) == ["file_content#PC-9[1]", "file_content#PC-9[2]"]
+    weights = [decode_datcom_input(results[item_id]["latest_datcom"]["datcom_input"]).flight_conditions.WT
+               for item_id in sorted(results)]
+    assert weights == [5180.0, 5500.0]
+    assert result["messages"][0].content.startswith("📦 Generated 2/2")
+
+
+def test_fanout_without_conversation_id_gets_own_sessions(tmp_path):
+    """沒有 conversation_id 的兩次呼叫處理同名檔案時，分支的 session 不重複"""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    paths = [str(tmp_path / "a" / "msg.txt"), str(tmp_path / "b" / "msg.txt")]
+
+    def sessions(state):
+        return [send.arg["conversation_id"] for send in pipeline_module.dispatch_inputs(state)]
+
+    first, second = sessions({"input_files": paths}), sessions({"input_files": paths})
+    assert len(set(first + second)) == 4
+    assert not any(session.startswith("fanout-") for session in first + second)
+    assert sessions({"input_files": paths, "conversation_id": "batch"}) == ["batch-msg.txt[0]", "batch-msg.txt[1]"]
+
+
+def test_fanout_branches_run_in_parallel(monkeypatch):
+    """所有分支同時執行（barrier 需要所有分支同時等待才會放行）"""
+    n = 8
+    barrier = threading.Barrier(n, timeout=5)
+    seen = []
+
+    def fake_agent_node(state):
+        barrier.wait()
+        seen.append(state["conversation_id"])
+        latest = {"case_id": state["conversation_id"], "output_path": f"/tmp/{state['conversation_id']}"}
+        return {"messages": [AIMessage(content="✅")], "latest_datcom": latest}
+
+    monkeypatch.setattr(agent, "agent_node", fake_agent_node)
+    content = "\n".join(f"CASEID V{i}\nXCG={10 + i}" for i in range(n))
+
+    result = fanout_pipeline.invoke({"file_content": content, "conversation_id": "sweep"}, {"max_concurrency": n})
+
+    assert len(seen) == n
+    assert sorted(result["datcom_results"]) == sorted(f"file_content#V{i}" for i in range(n))
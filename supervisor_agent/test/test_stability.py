@@ -18,10 +18,12 @@ def test_query(query: str, expected_agents: int = 2):
     messages = result["messages"]
     total_messages = len(messages)
 
-    # 分析 agent 路由
-    agent_transfers = []
+    # 分析 agent 路由：預先路由時直接依序執行 routed_agents（不經 supervisor LLM），
+    # 否則從 supervisor 的 transfer_to_* 訊息取得
+    routed = result.get("routed_agents")
+    agent_transfers = list(routed) if routed else []
     for msg in messages:
-        if hasattr(msg, 'name') and 'transfer_to_' in str(msg.name):
+        if not routed and hasattr(msg, 'name') and 'transfer_to_' in str(msg.name):
             agent_name = msg.name.replace('transfer_to_', '')
             agent_transfers.append(agent_name)
 
@@ -32,6 +34,7 @@ def test_query(query: str, expected_agents: int = 2):
     # 顯示結果
     print(f"\n📊 結果:")
     print(f"  Messages: {total_messages}")
+    print(f"  路由方式: {'預先路由' if routed else 'supervisor LLM'}")
     print(f"  Agent 執行順序: {' → '.join(agent_transfers) if agent_transfers else 'None'}")
     print(f"  執行的 agents 數量: {len(agent_transfers)}")
     print(f"  最終回應: {'✅ 有' if has_response else '❌ 無'}")
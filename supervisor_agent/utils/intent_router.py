@@ -0,0 +1,302 @@
+"""
+Deterministic intent pre-router
+supervisor 每次 handoff 前都要呼叫一次 LLM 決定下一步，而且依賴很長的「並/and/then」
+規則 prompt，結果不穩定（見 test_stability.py）。常見的請求在這裡先分類：
+
+    read            讀取 msg.txt                      → read_file_agent
+    generate        產生 DATCOM 檔案                   → datcom_tool_agent
+    read_generate   讀取 msg.txt 並產生 DATCOM 檔案     → read_file_agent → datcom_tool_agent
+
+先用規則（動詞 + 對象的關鍵字），規則判斷不出來時再用小型的本地 naive Bayes 分類器
+（以測試中的查詢與改寫訓練）；信心不足、問句、否定、含有其他動作、提到 msg.txt
+以外的檔案或其他意圖才交給 supervisor LLM。
+辨識出的意圖直接依固定順序執行 agents，每個常見請求省下兩次以上的 LLM 呼叫。
+
+環境變數：
+    PRE_ROUTER_ENABLED          設為 0 時所有請求都交給 supervisor LLM（預設啟用）
+    PRE_ROUTER_MIN_CONFIDENCE   分類器的最低後驗機率（預設 0.8）
+"""
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel
+
+from supervisor_agent.utils.state import SupervisorState
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+# 意圖 → 依序執行的 agents
+INTENT_AGENTS: Dict[str, List[str]] = {
+    "read": ["read_file_agent"],
+    "generate": ["datcom_tool_agent"],
+    "read_generate": ["read_file_agent", "datcom_tool_agent"],
+}
+
+# 只看請求的第一行（之後通常是貼上的資料）
+_MAX_REQUEST_CHARS = 200
+
+_READ_VERB = re.compile(r"讀取|讀入|讀|打開|開啟|\b(read|open|load)\b", re.IGNORECASE)
+_READ_OBJECT = re.compile(r"msg\.txt|檔案|文件|\bfile\b", re.IGNORECASE)
+# read_file_agent 只讀取 msg.txt；請求中提到其他檔案（「讀取 for006.dat 的結果」）時交給 LLM，
+# for005.dat 是產生的目標
+_FILE_NAME = re.compile(r"[\w\-]+\.[A-Za-z][A-Za-z0-9]{1,4}\b")
+_ROUTABLE_FILES = {"msg.txt", "for005.dat"}
+# 「產生」類動詞的對象只要提到 DATCOM；write / make 等泛用動詞的對象必須是輸入檔本身
+# （「write a summary of the datcom output」不是產生請求）
+_GENERATE_VERB = re.compile(r"產生|生成|\bgenerate\b", re.IGNORECASE)
+_GENERATE_OBJECT = re.compile(r"datcom|for005", re.IGNORECASE)
+_WRITE_VERB = re.compile(r"建立|寫成|寫入|輸出|\b(create|write|make|build)\b", re.IGNORECASE)
+_DECK_OBJECT = re.compile(
+    r"for005|datcom\s*(input\s*)?(file|deck)|datcom\s*(輸入)?(檔|文件)|輸入檔", re.IGNORECASE
+)
+# 要產出的是 DATCOM 輸入檔以外的東西（「產生 DATCOM 結果的摘要」）
+_OTHER_OUTPUT = re.compile(r"摘要|報告|總結|圖表|\b(summary|summaries|report|plot|chart|graph)\b", re.IGNORECASE)
+# 讀檔後顯示內容是 read_file_agent 的工作
+_DISPLAY_VERB = re.compile(r"顯示|列出|印出|\b(show|display|print)\b", re.IGNORECASE)
+# 產生請求中提到來源檔（「根據 msg.txt 建立 for005.dat」）時需要先讀檔
+_SOURCE_FILE = re.compile(r"msg\.txt", re.IGNORECASE)
+# 詢問如何做 / 問內容的問句交給 LLM 回答
+_QUESTION = re.compile(r"怎麼|如何|為什麼|什麼|幾個|多少|是否|\b(how|why|what|which|explain)\b", re.IGNORECASE)
+# 否定（「不要產生」「don't generate ... yet」）交給 LLM 判斷實際要做的事
+_NEGATION = re.compile(
+    r"不要|不用|不必|(?<![分特區個類識級性差])別|勿|先不|暫不|\b(don'?t|do not|not|never|without|skip)\b|n't\b", re.IGNORECASE
+)
+# 多個動作以「並/然後/後/再/還/and/then/also」或逗號連接時逐一檢查，每一段都必須是已知的動作
+_CONJUNCTION = re.compile(
+    r"並且|並|然後|接著|之後|(?<![最前背])後(?![面掠])|再|還|[,，;；]|\b(?:and|then|also)\b", re.IGNORECASE
+)
+# 只有客套話的一段（「…，謝謝」）不算其他動作
+_FILLER = re.compile(r"^\s*(謝謝|感謝|麻煩你?|thanks|thank you|please)?[\s!！.。~]*$", re.IGNORECASE)
+
+# 分類器的訓練資料：測試中的查詢（test_stability / test_supervisor / test_datcom_workflow /
+# test_new_features）加上常見的改寫；"other" 代表交給 supervisor LLM（其他工具、
+# 摘要 / 報告等非輸入檔的產出）。test_intent_router 另以不在這裡的改寫與反例檢查
+TRAINING_QUERIES: List[Tuple[str, str]] = [
+    ("請讀取 msg.txt 並產生 DATCOM 檔案", "read_generate"),
+    ("Read msg.txt and generate a DATCOM input file", "read_generate"),
+    ("can you read the file then write it to datcom file", "read_generate"),
+    ("讀取檔案然後產生 DATCOM", "read_generate"),
+    ("請讀取 msg.txt 文件並根據內容產生 DATCOM 檔案", "read_generate"),
+    ("把 msg.txt 轉成 for005.dat", "read_generate"),
+    ("convert msg.txt into a DATCOM deck", "read_generate"),
+    ("load the spec file and build the for005 deck", "read_generate"),
+    ("請讀取 msg.txt", "read"),
+    ("請讀取 msg.txt 文件", "read"),
+    ("讀取檔案", "read"),
+    ("read msg.txt", "read"),
+    ("open the file and show me the content", "read"),
+    ("顯示 msg.txt 的內容", "read"),
+    ("show msg.txt", "read"),
+    ("請產生 PC-9 的 DATCOM 檔案", "generate"),
+    ("產生 DATCOM 檔案", "generate"),
+    ("generate DATCOM", "generate"),
+    ("write the for005.dat input file", "generate"),
+    ("用上面的資料建立 DATCOM 輸入檔", "generate"),
+    ("make a DATCOM deck from this data", "generate"),
+    ("生成 for005 輸入檔", "generate"),
+    ("What's the current time?", "other"),
+    ("Calculate 123 * 456", "other"),
+    ("檔案裡有幾個章節？", "other"),
+    ("把 NALPHA 改成 8", "other"),
+    ("主翼的展弦比是多少", "other"),
+    ("how does DATCOM compute the lift slope", "other"),
+    ("reverse the string hello", "other"),
+    ("謝謝", "other"),
+    ("hello", "other"),
+    ("summarize the DATCOM results", "other"),
+    ("write a report about the output", "other"),
+    ("整理 DATCOM 輸出的結果", "other"),
+    ("plot the lift curve", "other"),
+    ("compare the two aircraft", "other"),
+    ("email the file to me", "other"),
+    ("計算主翼面積", "other"),
+    ("翻譯這份文件", "other"),
+]
+
+
+class IntentDecision(BaseModel):
+    """預先路由的結果；agents 為空時交給 supervisor LLM"""
+    intent: Optional[str] = None
+    agents: List[str] = []
+    source: str = "supervisor"  # "rule" / "classifier" / "supervisor"
+    confidence: float = 0.0
+
+
+def pre_router_enabled() -> bool:
+    return os.getenv("PRE_ROUTER_ENABLED", "1") not in ("0", "false", "False")
+
+
+def min_confidence() -> float:
+    return float(os.getenv("PRE_ROUTER_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+
+
+def _request_line(text: str) -> str:
+    for line in text.splitlines():
+        if line.strip():
+            return line.strip()[:_MAX_REQUEST_CHARS]
+    return ""
+
+
+def tokenize(text: str) -> List[str]:
+    """英文取單字，中文取單字與相鄰兩字（bigram）"""
+    text = text.lower()
+    tokens = re.findall(r"[a-z0-9][a-z0-9._]*", text)
+    for run in re.findall(r"[一-鿿]+", text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class NaiveBayesIntentClassifier:
+    """Multinomial naive Bayes（Laplace smoothing）"""
+
+    def __init__(self, examples: Sequence[Tuple[str, str]]):
+        self.class_counts = Counter(label for _, label in examples)
+        self.token_counts: Dict[str, Counter] = {label: Counter() for label in self.class_counts}
+        for text, label in examples:
+            self.token_counts[label].update(tokenize(text))
+        self.vocabulary = set().union(*self.token_counts.values())
+        self.totals = {label: sum(counts.values()) for label, counts in self.token_counts.items()}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """回傳 (意圖, 後驗機率)"""
+        tokens = [token for token in tokenize(text) if token in self.vocabulary]
+        n_examples = sum(self.class_counts.values())
+        scores = {}
+        for label, count in self.class_counts.items():
+            denominator = self.totals[label] + len(self.vocabulary)
+            scores[label] = math.log(count / n_examples) + sum(
+                math.log((self.token_counts[label][token] + 1) / denominator) for token in tokens
+            )
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+
+@lru_cache(maxsize=1)
+def _classifier() -> NaiveBayesIntentClassifier:
+    return NaiveBayesIntentClassifier(TRAINING_QUERIES)
+
+
+def _clause_intent(clause: str) -> Optional[str]:
+    """一段請求的動作："read" / "generate" / "display"，不是已知的動作時為 None"""
+    if (_GENERATE_VERB.search(clause) and _GENERATE_OBJECT.search(clause)) or (
+        _WRITE_VERB.search(clause) and _DECK_OBJECT.search(clause)
+    ):
+        return "generate"
+    if _READ_VERB.search(clause) and _READ_OBJECT.search(clause):
+        return "read"
+    if _DISPLAY_VERB.search(clause):
+        # 「顯示 msg.txt」需要先讀檔
+        return "read" if _SOURCE_FILE.search(clause) else "display"
+    return None
+
+
+def _clauses(line: str) -> List[str]:
+    return [clause for clause in _CONJUNCTION.split(line) if not _FILLER.match(clause)]
+
+
+def _rule_intent(line: str) -> Optional[str]:
+    actions = [_clause_intent(clause) for clause in _clauses(line)]
+    read = "read" in actions
+    generate = "generate" in actions
+    if generate and (read or _SOURCE_FILE.search(line)):
+        return "read_generate"
+    if read:
+        return "read"
+    if generate:
+        return "generate"
+    return None
+
+
+def _names_other_file(line: str) -> bool:
+    return any(name.lower() not in _ROUTABLE_FILES for name in _FILE_NAME.findall(line))
+
+
+def _has_uncovered_action(line: str) -> bool:
+    """以「並/後/再/and/then」等連接的某一段不是讀檔 / 產生 / 顯示（例如「並計算展弦比」）"""
+    clauses = _clauses(line)
+    return len(clauses) > 1 and any(_clause_intent(clause) is None for clause in clauses)
+
+
+def classify_intent(text: str) -> IntentDecision:
+    """
+    分類使用者請求
+
+    問句、否定、含有其他動作（「讀取 msg.txt 並計算展弦比」）、要產出摘要 / 報告，
+    或提到 msg.txt 以外的檔案時交給 supervisor；
+    規則命中時直接採用；其餘由分類器判斷，
+    後驗機率低於 PRE_ROUTER_MIN_CONFIDENCE 或判為 "other" 時交給 supervisor。
+    """
+    line = _request_line(text or "")
+    if not line or any(pattern.search(line) for pattern in (_QUESTION, _NEGATION, _OTHER_OUTPUT)):
+        return IntentDecision()
+    if _has_uncovered_action(line) or _names_other_file(line):
+        return IntentDecision()
+
+    intent = _rule_intent(line)
+    if intent is not None:
+        return IntentDecision(intent=intent, agents=INTENT_AGENTS[intent], source="rule", confidence=1.0)
+
+    intent, confidence = _classifier().predict(line)
+    if intent in INTENT_AGENTS and confidence >= min_confidence():
+        return IntentDecision(intent=intent, agents=INTENT_AGENTS[intent], source="classifier", confidence=confidence)
+    return IntentDecision(confidence=confidence)
+
+
+def _last_user_text(messages: list) -> Optional[str]:
+    for message in reversed(messages or []):
+        if getattr(message, "type", None) == "human":
+            return message.content if isinstance(message.content, str) else None
+    return None
+
+
+def pre_route_node(state) -> dict:
+    """
+    Graph 的第一個節點：分類最後一則使用者訊息，決定 routed_agents
+    （None 表示交給 supervisor LLM）
+    """
+    if not pre_router_enabled():
+        return {"routed_agents": None}
+    decision = classify_intent(_last_user_text(state.get("messages")))
+    return {"routed_agents": decision.agents or None}
+
+
+def build_routed_graph(supervisor, agents: Dict[str, object]):
+    """
+    在 supervisor 前面加上預先路由節點
+
+        START → pre_router ─┬─ routed_agents 依序執行（例如 read_file_agent → datcom_tool_agent）→ END
+                            └─ 無法辨識 → supervisor（LLM 路由）→ END
+
+    Args:
+        supervisor: 已編譯的 supervisor graph
+        agents: {agent 名稱: graph 或 node 函數}，必須包含 INTENT_AGENTS 用到的 agents
+
+    Returns:
+        未編譯的 StateGraph
+    """
+    def next_agent(current: Optional[str]):
+        def route(state) -> str:
+            sequence = state.get("routed_agents") or []
+            if current is None:
+                return sequence[0] if sequence else "supervisor"
+            position = sequence.index(current) + 1 if current in sequence else len(sequence)
+            return sequence[position] if position < len(sequence) else END
+        return route
+
+    graph = StateGraph(SupervisorState)
+    graph.add_node("pre_router", pre_route_node)
+    graph.add_node("supervisor", supervisor)
+    graph.add_edge(START, "pre_router")
+    graph.add_conditional_edges("pre_router", next_agent(None), ["supervisor", *agents])
+    graph.add_edge("supervisor", END)
+    for name, agent in agents.items():
+        graph.add_node(name, agent)
+        graph.add_conditional_edges(name, next_agent(name), [*agents, END])
+    return graph
@@ -0,0 +1,56 @@
+"""
+Lazy module attributes and environment loading
+chat model 與 graph 改為第一次使用時才建立：只 import 模組（例如只用 run_generator、
+pytest 收集測試）時不會載入 langchain_openai、建立 model 或編譯 graph。
+
+用法（模組層級）：
+
+    _lazy = LazyAttributes(globals(), model=_build_model, app=_build_app)
+    __getattr__ = _lazy.module_getattr
+
+`module.app` / `from module import app` 會在第一次存取時呼叫 factory，結果寫回
+模組的 globals，之後就是一般的模組屬性。
+
+測試中替換 lazy 屬性時直接寫入模組的 globals，不要用 monkeypatch.setattr
+（setattr 會先讀取原本的值而呼叫 factory，例如建立需要 API key 的 ChatOpenAI）：
+
+    monkeypatch.setitem(agent.__dict__, "_base_datcom_agent", FakeAgent())
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "read_file_agent", ".env")
+
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """載入 read_file_agent/.env（整個 process 只載入一次，不覆寫已設定的環境變數）"""
+    from dotenv import load_dotenv
+    load_dotenv(ENV_PATH)
+
+
+class LazyAttributes:
+    """以 factory 延遲建立的模組屬性"""
+
+    def __init__(self, module_globals: Dict[str, Any], **factories: Callable[[], Any]):
+        self._globals = module_globals
+        self._factories = factories
+        # factory 之間可以互相依賴（例如 agent 需要 model），所以用 RLock
+        self._lock = threading.RLock()
+
+    def get(self, name: str) -> Any:
+        """取得屬性，第一次使用時呼叫 factory 建立"""
+        if name in self._globals:
+            return self._globals[name]
+        with self._lock:
+            if name not in self._globals:
+                self._globals[name] = self._factories[name]()
+            return self._globals[name]
+
+    def module_getattr(self, name: str) -> Any:
+        """作為模組的 __getattr__（只有模組中找不到的名稱才會呼叫）"""
+        if name in self._factories:
+            return self.get(name)
+        raise AttributeError(f"module {self._globals['__name__']!r} has no attribute {name!r}")
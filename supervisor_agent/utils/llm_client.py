@@ -0,0 +1,140 @@
+"""
+Shared LLM client factory
+所有 agent 的 chat model 都由這裡建立：同一個 endpoint 共用一組 keep-alive
+連線池（httpx.Client / httpx.AsyncClient），不再每個 agent 各自建立 HTTP client，
+高負載時可以重用連線，省去每次新的 TCP / TLS 連線建立。
+
+環境變數：
+    DEFAULT_LLM_MODEL / OPENAI_API_BASE_URL / OPENAI_API_KEY   全域預設
+    LLM_TIMEOUT                     單次請求逾時秒數（預設使用 openai SDK 的設定）
+    LLM_MAX_CONNECTIONS             每個 endpoint 同時進行的請求（連線）上限（預設 20）
+    LLM_MAX_KEEPALIVE_CONNECTIONS   每個 endpoint 保留的閒置連線數（預設 10）
+    LLM_KEEPALIVE_EXPIRY            閒置連線保留秒數（預設 60）
+    LLM_MAX_REQUESTS_PER_SECOND     每個 endpoint 的請求速率上限（預設不限制）
+
+    <NODE>_LLM_MODEL / <NODE>_LLM_BASE_URL / <NODE>_LLM_TIMEOUT
+        個別節點的覆寫，例如 DATCOM_TOOL_AGENT_LLM_MODEL
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_openai import ChatOpenAI
+
+from supervisor_agent.utils.lazy import load_environment
+
+DEFAULT_MODEL = "openai/gpt-oss-20b"
+DEFAULT_BASE_URL = "http://172.16.120.65:8087/v1"
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+class CustomChatOpenAI(ChatOpenAI):
+    """Custom ChatOpenAI that doesn't send parallel_tool_calls parameter"""
+
+    def bind_tools(self, tools, **kwargs):
+        # Override to not set parallel_tool_calls
+        kwargs.pop("parallel_tool_calls", None)
+        return super().bind_tools(tools, **kwargs)
+
+
+class _Endpoint:
+    """一個 endpoint 共用的連線池與速率限制"""
+
+    __slots__ = ("client", "async_client", "rate_limiter")
+
+    def __init__(self, client: httpx.Client, async_client: httpx.AsyncClient, rate_limiter):
+        self.client = client
+        self.async_client = async_client
+        self.rate_limiter = rate_limiter
+
+
+_endpoints: Dict[str, _Endpoint] = {}
+_lock = threading.Lock()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+
+
+def _endpoint(base_url: str) -> _Endpoint:
+    key = base_url.rstrip("/")
+    with _lock:
+        endpoint = _endpoints.get(key)
+        if endpoint is None:
+            limits = _pool_limits()
+            # 每次請求的逾時由 ChatOpenAI 的 timeout 設定（openai SDK 逐一請求傳入）
+            timeout = httpx.Timeout(None)
+            rate = os.getenv("LLM_MAX_REQUESTS_PER_SECOND")
+            endpoint = _Endpoint(
+                client=httpx.Client(limits=limits, timeout=timeout),
+                async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+                rate_limiter=InMemoryRateLimiter(requests_per_second=float(rate)) if rate else None,
+            )
+            _endpoints[key] = endpoint
+        return endpoint
+
+
+def get_http_clients(base_url: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """取得 base_url 共用的 (sync, async) HTTP client"""
+    endpoint = _endpoint(base_url)
+    return endpoint.client, endpoint.async_client
+
+
+def _node_setting(node: Optional[str], name: str) -> Optional[str]:
+    if not node:
+        return None
+    return os.getenv(f"{node.upper().replace('-', '_')}_LLM_{name}")
+
+
+def get_chat_model(
+    node: Optional[str] = None,
+    *,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    default_base_url: Optional[str] = None,
+    **kwargs,
+) -> CustomChatOpenAI:
+    """
+    建立使用共用連線池的 chat model
+
+    Args:
+        node: 節點名稱（例如 "datcom_tool_agent"），用來讀取 <NODE>_LLM_* 覆寫
+        model, timeout: 此節點使用的模型與逾時（省略時使用 DEFAULT_LLM_MODEL / LLM_TIMEOUT）
+        default_base_url: OPENAI_API_BASE_URL 未設定時此節點使用的 endpoint
+        **kwargs: 其他 ChatOpenAI 參數（預設 temperature=0）
+
+    優先順序：<NODE>_LLM_* 環境變數 > 參數 > 全域環境變數 > 預設值（base_url 為
+    <NODE>_LLM_BASE_URL > OPENAI_API_BASE_URL > default_base_url）。
+    同一個 base_url 的所有 model 共用同一組 httpx client 與速率限制。
+    """
+    load_environment()
+    model = _node_setting(node, "MODEL") or model or os.getenv("DEFAULT_LLM_MODEL", DEFAULT_MODEL)
+    base_url = (
+        _node_setting(node, "BASE_URL")
+        or os.getenv("OPENAI_API_BASE_URL")
+        or default_base_url
+        or DEFAULT_BASE_URL
+    )
+    timeout = _node_setting(node, "TIMEOUT") or timeout or os.getenv("LLM_TIMEOUT")
+
+    endpoint = _endpoint(base_url)
+    kwargs.setdefault("temperature", 0)
+    if endpoint.rate_limiter is not None:
+        kwargs.setdefault("rate_limiter", endpoint.rate_limiter)
+    return CustomChatOpenAI(
+        model=model,
+        base_url=base_url,
+        api_key=os.getenv("OPENAI_API_KEY"),  # type: ignore
+        timeout=float(timeout) if timeout else None,
+        http_client=endpoint.client,
+        http_async_client=endpoint.async_client,
+        **kwargs,
+    )
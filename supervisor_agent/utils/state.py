@@ -2,10 +2,18 @@
 Shared state definition for supervisor multi-agent system
 """
 from langgraph.graph import MessagesState
-from typing import Optional, Dict, Any
+from typing import Annotated, Optional, Dict, Any, List
 from datetime import datetime
 
 
+def merge_datcom_results(
+    left: Optional[Dict[str, Dict[str, Any]]],
+    right: Optional[Dict[str, Dict[str, Any]]],
+) -> Dict[str, Dict[str, Any]]:
+    """datcom_results 的 reducer：平行分支各自回傳 {item_id: 結果}，合併成一個 dict"""
+    return {**(left or {}), **(right or {})}
+
+
 class SupervisorState(MessagesState):
     """
     State shared across all agents in supervisor pattern.
@@ -15,6 +23,7 @@ class SupervisorState(MessagesState):
     file_content: Optional[str] = None  # type: ignore # For read_file_agent results
     next: Optional[str] = None  # type: ignore # For supervisor routing decisions
     remaining_steps: int = 25  # type: ignore # Required by create_supervisor (max steps)
+    routed_agents: Optional[List[str]] = None  # type: ignore # 預先路由（不經 supervisor LLM）依序執行的 agents
 
     # New fields for DATCOM workflow
     latest_datcom: Optional[Dict[str, Any]] = None  # type: ignore # 最新產生的 DATCOM 內容
@@ -23,3 +32,7 @@ class SupervisorState(MessagesState):
     # Conversation context
     conversation_id: Optional[str] = None  # type: ignore # 對話 session ID
     conversation_history_summary: Optional[str] = None  # type: ignore # 對話歷史摘要（節省 token）
+
+    # Fan-out（supervisor_agent.pipeline.fanout_pipeline）
+    input_files: Optional[List[str]] = None  # type: ignore # 每個檔案一個平行分支
+    datcom_results: Annotated[Optional[Dict[str, Dict[str, Any]]], merge_datcom_results] = None  # type: ignore # 每個項目（檔案 / 飛機）的結果
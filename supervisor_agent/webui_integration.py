@@ -4,7 +4,7 @@ Open WebUI 整合模組
 """
 from typing import Iterator, Dict, Any, Optional
 from langchain_core.messages import HumanMessage
-from supervisor_agent.agent import app
+from supervisor_agent import agent as supervisor_agent
 from supervisor_agent.utils.memory_manager import ConversationMemoryManager, SessionManager
 
 
@@ -33,7 +33,7 @@ class OpenWebUIAdapter:
             max_recent_messages: 保留最近幾條完整訊息
             compression_threshold: 超過幾條訊息開始壓縮
         """
-        self.graph = app
+        self.graph = supervisor_agent.app  # 第一次建立 adapter 時才編譯 graph
         self.enable_memory = enable_memory
 
         if enable_memory: